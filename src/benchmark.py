@@ -0,0 +1,89 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from inference.features import batch_hand_features
+from benchmark_src.cases import SUITES, load_hands
+from benchmark_src.reference import REFERENCES
+from benchmark_src.runner import BenchmarkRunner, compare
+from benchmark_src.synthetic import synthetic_frames, to_slots, to_sorted_slots
+
+# microbenchmarks for the hot paths (features, sequence window, mirroring, file loading, inference)
+# run from repo root:
+#   python src/benchmark.py --json bench/baseline.json
+#   python src/benchmark.py --compare bench/baseline.json --threshold 10     (exit code 1 on regressions)
+# no camera, model or dataset needed: inputs are synthetic and a numpy stand-in replaces the model
+# unless --model is given
+
+
+def check_equivalence(hands, package, n=2000, seed=0, atol=1e-6):
+    # live extract_all_hand_features (and the batch kernel on the same slots) against the per-hand
+    # path of that package; the two packages fill the slots differently (Left / Right vs sorted by label)
+    landmarks, labels, results = synthetic_frames(n, seed)
+    reference = np.array([REFERENCES[package](hands, r) for r in results])
+
+    live = np.array([hands.extract_all_hand_features(r, None) for r in results])
+    if package == 'data_collection':
+        slots, is_left, present = to_sorted_slots(landmarks, labels)
+        batch = batch_hand_features(slots, is_left, present)
+        # the raw landmarks collection stores (float32) use the same slots
+        raw = [hands.extract_raw_landmarks(r) for r in results]
+        raw_landmarks = np.stack([raw_landmarks for raw_landmarks, _ in raw])
+        handedness = np.stack([handedness for _, handedness in raw])
+        assert np.array_equal(handedness > 0, present) and np.array_equal(handedness == 1, is_left), f"{package}: raw handedness differs"
+        assert np.allclose(raw_landmarks, slots, rtol=0, atol=1e-6), f"{package}: raw landmarks differ by {np.abs(raw_landmarks - slots).max()}"
+    else:
+        slots, present = to_slots(landmarks, labels)
+        batch = batch_hand_features(slots, hands.SLOT_IS_LEFT, present)
+
+    assert live.shape == batch.shape == (n, 146), f"{package}: feature shape invalid: {live.shape}, {batch.shape}"
+    assert np.allclose(reference, live, rtol=0, atol=atol), f"{package}: live features differ by {np.abs(reference - live).max()}"
+    assert np.allclose(reference, batch, rtol=0, atol=atol), f"{package}: batch features differ by {np.abs(reference - batch).max()}"
+    print(f"Equivalence OK for {package} Hands on {n} frames (max abs diff {np.abs(reference - batch).max():.2e})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Microbenchmarks for the feature, sequence, mirroring and inference hot paths")
+    parser.add_argument('--suite', nargs='+', choices=sorted(SUITES), default=list(SUITES), help="suites to run, default all")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs per case, the best one is reported")
+    parser.add_argument('--min-time', type=float, default=0.2, help="seconds per timed run, small cases are looped until they take this long")
+    parser.add_argument('--model', default=None, help="benchmark this .tflite model instead of the numpy stand-in (needs TensorFlow)")
+    parser.add_argument('--json', default=None, help="write the results (+ machine / commit info) to this JSON file")
+    parser.add_argument('--compare', default=None, help="baseline JSON from an earlier --json run")
+    parser.add_argument('--threshold', type=float, default=10.0, help="percent slowdown vs --compare that counts as a regression")
+    parser.add_argument('--check', action='store_true', help="also check both Hands classes against their per-hand reference (needs mediapipe)")
+    args = parser.parse_args()
+
+    if args.check:
+        for package in REFERENCES:
+            hands, error = load_hands(package)
+            if hands is None:
+                print(f"Equivalence check skipped for {package} Hands: {error}")
+            else:
+                check_equivalence(hands, package)
+
+    runner = BenchmarkRunner(args.repeat, args.min_time)
+    print("===== BENCHMARKS =====")
+    for suite in args.suite:
+        if suite == 'inference':
+            SUITES[suite](runner, model_path=args.model)
+        else:
+            SUITES[suite](runner)
+    print("===== END =====")
+
+    if args.json:
+        runner.export(args.json)
+        print(f"Results saved: {args.json}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, runner.to_dict(), args.threshold)
+        if regressions:
+            out_text = f"{len(regressions)} regression/s: {', '.join(regressions)}"
+            print("-" * (len(out_text) + 4))
+            print(f"| {out_text} |")
+            print("-" * (len(out_text) + 4))
+            sys.exit(1)
@@ -0,0 +1,166 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from inference.features import batch_hand_features, frame_hand_features
+from inference.sequence import Sequence
+from inference.stream_state import StreamState
+from benchmark_src.reference import REFERENCES
+from benchmark_src.runner import BenchmarkRunner
+from benchmark_src.synthetic import synthetic_frames, synthetic_sequences, to_slots, write_sequence_dir
+from benchmark_src.stand_in import StandInEngine
+
+# benchmark cases, one function per suite, each adds its results to the runner
+# names are "<suite>/<case>" and must stay stable, --compare matches runs by name
+
+DATA_AUGMENTATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data_augmentation')
+
+
+def _data_augmentation_imports():
+    # the data_augmentation scripts use flat imports (from hand_mirror import HandMirror)
+    if DATA_AUGMENTATION_DIR not in sys.path:
+        sys.path.append(DATA_AUGMENTATION_DIR)
+
+
+def load_hands(package: str = 'inference'):
+    # Hands needs mediapipe, the kernel cases still run without it
+    try:
+        if package == 'data_collection':
+            from data_collection_src.hands import Hands
+        else:
+            from inference.hands import Hands
+    except ImportError as e:
+        return None, str(e)
+    return Hands(), None
+
+
+def _speedup(runner: BenchmarkRunner, name: str, before: str):
+    # the before / after line of the old feature benchmark
+    if name in runner.results and before in runner.results:
+        speedup = runner.results[name]['ops_per_s'] / runner.results[before]['ops_per_s']
+        print(f"{'':<40} {speedup:.1f}x vs {before}")
+
+
+def bench_features(runner: BenchmarkRunner, n: int = 2000):
+    landmarks, labels, _ = synthetic_frames(n, seed=1)
+    slots, present = to_slots(landmarks, labels)
+    slot_is_left = np.array([True, False])
+    runner.run("features/batch_kernel", lambda: batch_hand_features(slots, slot_is_left, present), n, "frame")
+    # one call per frame, what the live paths do; the batch kernel only wins when given many frames
+    runner.run("features/frame_kernel", lambda: [frame_hand_features(s, slot_is_left, p) for s, p in zip(slots, present)], n, "frame")
+
+    # per package and hand count: the per-hand path used before features.py, then the live one
+    for package, before_case, case in (('inference', "per_hand_reference", "extract_all_hand_features"),
+                                       ('data_collection', "collection_per_hand", "collection_extract")):
+        hands, error = load_hands(package)
+        for hand_count in (0, 1, 2):
+            before = f"features/{before_case}_{hand_count}h"
+            name = f"features/{case}_{hand_count}h"
+            if hands is None:
+                runner.skip(before, error)
+                runner.skip(name, error)
+                continue
+            _, _, results = synthetic_frames(n, seed=2 + hand_count, hands=hand_count)
+            runner.run(before, lambda: [REFERENCES[package](hands, r) for r in results], n, "frame")
+            runner.run(name, lambda: [hands.extract_all_hand_features(r, None) for r in results], n, "frame")
+            _speedup(runner, name, before)
+
+
+def bench_sequence(runner: BenchmarkRunner, n: int = 2000):
+    frames = synthetic_sequences(-(-n // 20), seed=3).reshape(-1, 146)[:n]
+
+    def append_only():
+        sequence = Sequence(stride=4)
+        for frame in frames:
+            sequence.append(frame)
+
+    def sliding_window():
+        # Inference.update's per-frame bookkeeping without the interpreter
+        sequence = Sequence(stride=4)
+        for frame in frames:
+            sequence.append(frame)
+            if sequence.is_ready():
+                sequence.get_sequence()[np.newaxis]
+                sequence.slide()
+
+    runner.run("sequence/append", append_only, n, "frame")
+    runner.run("sequence/sliding_window", sliding_window, n, "frame")
+
+
+def bench_mirroring(runner: BenchmarkRunner, n: int = 512):
+    _data_augmentation_imports()
+    from hand_mirror import HandMirror
+
+    hand_mirror = HandMirror()
+    sequences = synthetic_sequences(n, seed=4)
+    runner.run("mirroring/safe_sequence_mirroring", lambda: [hand_mirror.safe_sequence_mirroring(s) for s in sequences], n, "sequence")
+    runner.run("mirroring/batch_sequence_mirroring", lambda: hand_mirror.batch_sequence_mirroring(sequences), n, "sequence")
+
+
+def bench_files(runner: BenchmarkRunner, n: int = 300):
+    _data_augmentation_imports()
+    from numpy_file_procs import NumpyFileProcs
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = write_sequence_dir(os.path.join(tmp, 'landmark_sequences'), n, seed=5)
+        quiet = io.StringIO()
+        with contextlib.redirect_stdout(quiet), contextlib.redirect_stderr(quiet):
+            procs = NumpyFileProcs(data_dir)
+
+        def create_file_objs():
+            with contextlib.redirect_stdout(quiet), contextlib.redirect_stderr(quiet):
+                procs.create_file_objs()
+            quiet.seek(0)
+            quiet.truncate()
+
+        runner.run("files/create_file_objs", create_file_objs, n, "file")
+
+
+def make_engine(model_path=None, batch_size: int = 1):
+    # the real TFLite model when a path is given, the numpy stand-in otherwise
+    if model_path:
+        from inference.engine import InterpreterEngine
+        engine = InterpreterEngine(model_path, warmup=0, batch_size=batch_size)
+    else:
+        engine = StandInEngine(batch_size=batch_size)
+    engine.allocate()
+    return engine
+
+
+def bench_inference(runner: BenchmarkRunner, n: int = 400, model_path=None, batch_size: int = 8):
+    engine = make_engine(model_path)
+    print(f"engine: {engine.describe()}")
+    window = synthetic_sequences(1, seed=6)
+    runner.run("inference/invoke_batch1", lambda: engine.invoke(window), 1, "window")
+
+    batched = make_engine(model_path, batch_size)
+    if batched.batch_size == batch_size:
+        windows = synthetic_sequences(batch_size, seed=7)
+        runner.run(f"inference/invoke_batch{batch_size}", lambda: batched.invoke(windows), batch_size, "window")
+    else:
+        runner.skip(f"inference/invoke_batch{batch_size}", "model cannot be resized")
+
+    frames = synthetic_sequences(-(-n // 20), seed=8).reshape(-1, 146)[:n]
+
+    def update_loop():
+        # per-frame classify path: window bookkeeping, invoke every STRIDE frames, smoothing
+        state = StreamState("bench", stride=4)
+        for frame in frames:
+            window = state.push(frame)
+            if window is not None:
+                state.apply(engine.invoke(window)[0])
+
+    runner.run("inference/update_stride4", update_loop, n, "frame")
+
+
+SUITES = {
+    'features': bench_features,
+    'sequence': bench_sequence,
+    'mirroring': bench_mirroring,
+    'files': bench_files,
+    'inference': bench_inference,
+}
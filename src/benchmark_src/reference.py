@@ -0,0 +1,56 @@
+import numpy as np
+
+# the per-hand extract_all_hand_features paths both Hands classes used before features.py,
+# kept as the "before" of the features benchmark and as the reference of benchmark.py --check
+
+
+def reference_extract_all_hand_features(hands, results):
+    # inference.hands: Left hand in the first block, Right hand in the second
+    left_hand = np.zeros(73, dtype=np.float32)
+    right_hand = np.zeros(73, dtype=np.float32)
+
+    if not results.multi_hand_landmarks:
+        return np.concatenate([left_hand, right_hand])
+
+    for idx, lm in enumerate(results.multi_hand_landmarks):
+        landmarks = np.array([[l.x, l.y, l.z] for l in lm.landmark])
+        label = results.multi_handedness[idx].classification[0].label
+        features = hands._extract_hand_features(landmarks, label)
+
+        if label == "Left":
+            left_hand = features
+        elif label == "Right":
+            right_hand = features
+
+    return np.concatenate([left_hand, right_hand])
+
+
+def reference_collection_hand_features(hands, results):
+    # data_collection_src.hands: hands sorted by label, so a lone right hand is in the first block
+    frame_vector = []
+
+    if not results.multi_hand_landmarks:
+        return np.zeros(146, dtype=np.float32)
+
+    hands_data = []
+    for idx, lm in enumerate(results.multi_hand_landmarks):
+        landmarks = np.array([[l.x, l.y, l.z] for l in lm.landmark])
+        label = results.multi_handedness[idx].classification[0].label
+        hands_data.append((label, landmarks))
+
+    sorted_hands_data = sorted(hands_data, key=lambda x: x[0])
+
+    for label, landmarks in sorted_hands_data:
+        features = hands._extract_hand_features(landmarks, label)
+        frame_vector.append(features)
+
+    while len(frame_vector) < 2:
+        frame_vector.append(np.zeros_like(frame_vector[0]))
+
+    return np.concatenate(frame_vector)
+
+
+REFERENCES = {
+    'inference': reference_extract_all_hand_features,
+    'data_collection': reference_collection_hand_features,
+}
@@ -0,0 +1,101 @@
+import json
+import os
+import platform
+import subprocess
+import time
+
+import numpy as np
+
+# timing, JSON export and run-to-run comparison for the benchmark suite
+#
+# every case is a callable doing `ops` units of work (frames, sequences, invokes, ...). it is first
+# calibrated so one timed run takes at least min_time seconds, then timed `repeat` times; the best
+# run gives ops/s (least disturbed by other processes), the median is kept to show the noise
+
+
+class BenchmarkRunner:
+    def __init__(self, repeat: int = 5, min_time: float = 0.2):
+        self.repeat = repeat
+        self.min_time = min_time
+        self.results: dict[str, dict] = {}
+
+    def run(self, name: str, fn, ops: int, unit: str):
+        loops = 1
+        while True:
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.min_time or loops >= 1 << 20:
+                break
+            loops = max(loops * 2, int(loops * self.min_time / max(elapsed, 1e-9)))
+
+        times = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            for _ in range(loops):
+                fn()
+            times.append((time.perf_counter() - start) / (loops * ops))
+
+        best, median = min(times), float(np.median(times))
+        self.results[name] = {
+            'unit': unit,
+            'ops_per_s': round(1.0 / best, 2),
+            'us_per_op': round(best * 1e6, 4),
+            'median_us_per_op': round(median * 1e6, 4),
+            'spread_pct': round((median / best - 1.0) * 100.0, 2),
+            'ops': ops * loops,
+            'repeat': self.repeat,
+        }
+        print(f"{name:<40} {1.0 / best:>14,.0f} {unit}/s  {best * 1e6:>10.2f} us/{unit}  (median +{(median / best - 1.0) * 100.0:.1f}%)")
+
+    def skip(self, name: str, reason: str):
+        print(f"{name:<40} skipped: {reason}")
+
+    def to_dict(self) -> dict:
+        return {'meta': run_metadata(), 'results': self.results}
+
+    def export(self, path: str):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+def run_metadata() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(baseline: dict, current: dict, threshold_pct: float = 10.0) -> list[str]:
+    # prints current vs baseline ops/s per case, returns the names of cases slower by more than threshold_pct
+    regressions = []
+    print(f"===== COMPARISON (regression = more than {threshold_pct:.1f}% slower) =====")
+    base_results = baseline.get('results', {})
+    for name, result in current.get('results', {}).items():
+        base = base_results.get(name)
+        if base is None:
+            print(f"{name:<40} new")
+            continue
+        change = (result['ops_per_s'] / base['ops_per_s'] - 1.0) * 100.0
+        flag = ""
+        if change < -threshold_pct:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<40} {base['ops_per_s']:>14,.0f} -> {result['ops_per_s']:>14,.0f} {result['unit']}/s  ({change:+.1f}%){flag}")
+    for name in sorted(base_results.keys() - current.get('results', {}).keys()):
+        print(f"{name:<40} missing from this run")
+    print("===== END =====")
+    return regressions
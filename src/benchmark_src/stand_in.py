@@ -0,0 +1,55 @@
+import time
+
+import numpy as np
+
+from inference.metrics import LatencyHistogram
+
+# numpy stand-in for InterpreterEngine, so the inference benchmarks run without TensorFlow or the model
+#
+# a single LSTM layer + dense softmax over the (batch, 20, 146) window, roughly the shape of the
+# shipped model, with fixed random weights: the outputs are meaningless, the cost profile is what matters
+
+
+class StandInEngine:
+    def __init__(self, hidden: int = 64, labels: int = 33, batch_size: int = 1, seed: int = 0,
+                 input_shape: tuple[int, int] = (20, 146)):
+        rng = np.random.default_rng(seed)
+        self.input_shape = input_shape
+        self.batch_size = batch_size
+        self.hidden = hidden
+        self.w_x = (rng.standard_normal((input_shape[1], 4 * hidden)) * 0.05).astype(np.float32)
+        self.w_h = (rng.standard_normal((hidden, 4 * hidden)) * 0.05).astype(np.float32)
+        self.b = np.zeros(4 * hidden, dtype=np.float32)
+        self.w_out = (rng.standard_normal((hidden, labels)) * 0.05).astype(np.float32)
+        self.input_details = [{'index': 0, 'shape': np.array([batch_size, *input_shape]), 'dtype': np.float32}]
+        self.latency = LatencyHistogram()
+        self.allocated = False
+        self.model_path = "stand-in"
+
+    def allocate(self):
+        self.allocated = True
+
+    def invoke(self, input_data: np.ndarray) -> np.ndarray:
+        # (batch, 20, 146) -> (batch, labels)
+        start = time.perf_counter()
+        x = np.asarray(input_data, dtype=np.float32)
+        gates_x = x @ self.w_x + self.b # (batch, 20, 4 * hidden), input projection for all steps at once
+        h = np.zeros((x.shape[0], self.hidden), dtype=np.float32)
+        c = np.zeros_like(h)
+        for t in range(x.shape[1]):
+            gates = gates_x[:, t] + h @ self.w_h
+            i, f, g, o = np.split(gates, 4, axis=1)
+            c = _sigmoid(f) * c + _sigmoid(i) * np.tanh(g)
+            h = _sigmoid(o) * np.tanh(c)
+        logits = h @ self.w_out
+        e = np.exp(logits - logits.max(axis=1, keepdims=True))
+        output = e / e.sum(axis=1, keepdims=True)
+        self.latency.record((time.perf_counter() - start) * 1000.0)
+        return output
+
+    def describe(self) -> str:
+        return f"numpy LSTM stand-in (hidden={self.hidden}, batch={self.batch_size})"
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
@@ -0,0 +1,83 @@
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+from inference.features import batch_hand_features
+
+# synthetic inputs for the benchmarks, no camera / MediaPipe / dataset needed
+
+HAND_CHOICES = [[], ['Left'], ['Right'], ['Left', 'Right'], ['Right', 'Left']]
+
+
+def make_results(landmarks, labels):
+    # mediapipe-like results object from (hands, 21, 3) landmarks and hand labels
+    if len(labels) == 0:
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+
+    multi_hand_landmarks = [
+        SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in hand.tolist()])
+        for hand in landmarks[:len(labels)]
+    ]
+    multi_handedness = [
+        SimpleNamespace(classification=[SimpleNamespace(label=label)])
+        for label in labels
+    ]
+    return SimpleNamespace(multi_hand_landmarks=multi_hand_landmarks, multi_handedness=multi_handedness)
+
+
+def synthetic_frames(n, seed=0, hands=None):
+    # n random frames, returns (landmarks, labels, results)
+    # hands = None: 0, 1 or 2 hands at random, 0 / 1 / 2: every frame has exactly that many hands
+    rng = np.random.default_rng(seed)
+    landmarks = rng.random((n, 2, 21, 3))
+    landmarks[..., 2] -= 0.5
+    choices = HAND_CHOICES if hands is None else [c for c in HAND_CHOICES if len(c) == hands]
+    labels = [choices[i] for i in rng.integers(0, len(choices), size=n)]
+    results = [make_results(landmarks[i], labels[i]) for i in range(n)]
+    return landmarks, labels, results
+
+
+def to_slots(landmarks, labels):
+    # (N, 2, 21, 3) + labels -> Left/Right slot arrays for batch_hand_features
+    slots = np.zeros_like(landmarks)
+    present = np.zeros(landmarks.shape[:2], dtype=bool)
+    for i, frame_labels in enumerate(labels):
+        for j, label in enumerate(frame_labels):
+            slot = 0 if label == 'Left' else 1
+            slots[i, slot] = landmarks[i, j]
+            present[i, slot] = True
+    return slots, present
+
+
+def to_sorted_slots(landmarks, labels):
+    # same, slots sorted by label like data_collection_src.hands (a lone Right hand is in slot 0)
+    # -> (slots, is_left, present)
+    slots = np.zeros_like(landmarks)
+    is_left = np.zeros(landmarks.shape[:2], dtype=bool)
+    present = np.zeros(landmarks.shape[:2], dtype=bool)
+    for i, frame_labels in enumerate(labels):
+        for slot, j in enumerate(sorted(range(len(frame_labels)), key=lambda j: frame_labels[j])[:2]):
+            slots[i, slot] = landmarks[i, j]
+            is_left[i, slot] = frame_labels[j] == 'Left'
+            present[i, slot] = True
+    return slots, is_left, present
+
+
+def synthetic_sequences(n, seed=0, sequence_length=20):
+    # (n, 20, 146) float32 sequences with one or two hands present, same layout as collected data
+    rng = np.random.default_rng(seed)
+    landmarks = rng.random((n, sequence_length, 2, 21, 3))
+    present = np.ones((n, sequence_length, 2), dtype=bool)
+    present[rng.random(n) < 0.5, :, 0] = False # about half the sequences are one-handed (right hand only)
+    return batch_hand_features(landmarks, np.array([True, False]), present, dtype=np.float32)
+
+
+def write_sequence_dir(path, n, labels=('A', 'B', 'C'), seed=0):
+    # data/landmark_sequences-like tree: <path>/<label>/<idx>.npy
+    sequences = synthetic_sequences(n, seed)
+    for idx, sequence in enumerate(sequences):
+        label_dir = os.path.join(path, labels[idx % len(labels)])
+        os.makedirs(label_dir, exist_ok=True)
+        np.save(os.path.join(label_dir, f"{idx:06d}.npy"), sequence)
+    return path
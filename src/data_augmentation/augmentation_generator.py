@@ -0,0 +1,198 @@
+import numpy as np
+from features import HAND_FEATURES, batch_hand_features
+from augmentation_runner import is_generated
+from manifest import DatasetManifest
+from packed_dataset import PackedDataset
+from sequence_store import FEATURE_EXTENSION, RAW_EXTENSION, FeatureCache
+
+# streaming augmentation: augmented (batch, 20, 146) batches straight from the source sequences,
+# nothing is written to disk
+#
+# per sequence (same random draw for every frame and both hands):
+# - mirror (x -> 1 - x, left and right hand swap places and chirality)
+# - small 3D rotation and uniform scaling around the sequence's landmark centroid
+# - temporal resampling (play the gesture slightly faster / slower, nearest frame)
+# per landmark:
+# - gaussian coordinate jitter
+#
+# only the 63 raw landmark values per hand are transformed, normal / pitch / yaw / finger angles are
+# then recomputed with the same batch_hand_features kernel Hands uses, so they always match the landmarks
+# (HandMirror sign-flips the stored normal instead, so its _flipped files differ in normal z)
+#
+# chirality of each stored hand block (needed for the normal's sign) is read back from the stored
+# normal: it points along cross(index_mcp - wrist, pinky_mcp - wrist) for right hands, against it for left
+
+
+class AugmentationGenerator:
+    def __init__(self, sequences, labels, batch_size: int = 32, seed: int | None = None, shuffle: bool = True,
+                 mirror_p: float = 0.5, rotate_deg: float = 10.0, scale_range: tuple[float, float] = (0.9, 1.1),
+                 jitter_std: float = 0.002, speed_range: tuple[float, float] = (0.8, 1.2)):
+        # sequences: (N, 20, 146) array-like (np.ndarray or a PackedDataset memmap), labels: (N,) ints
+        self.sequences = sequences
+        self.labels = np.asarray(labels)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.rng = np.random.default_rng(seed)
+
+        self.mirror_p = mirror_p
+        self.rotate_deg = rotate_deg
+        self.scale_range = scale_range
+        self.jitter_std = jitter_std
+        self.speed_range = speed_range
+
+    @classmethod
+    def from_packed(cls, packed_path: str, **kwargs) -> 'AugmentationGenerator':
+        # original sequences of a packed dataset, the memmap is only read batch by batch
+        dataset = PackedDataset(packed_path)
+        rows = np.array([not is_generated(source) for source in dataset.sources], dtype=bool)
+        generator = cls(dataset.sequences if rows.all() else _RowView(dataset.sequences, np.flatnonzero(rows)),
+                        dataset.labels[rows], **kwargs)
+        generator.label_names = list(dataset.label_names)
+        return generator
+
+    @classmethod
+    def from_directory(cls, input_directory_path: str, **kwargs) -> 'AugmentationGenerator':
+        # data/landmark_sequences/<label>/*.npy|*.npz, generated _flipped files are left out (mirroring happens here)
+        # files are listed from the dataset manifest and only read batch by batch, raw .npz recordings come in
+        # as their schema 1 features (data/feature_cache)
+        manifest = DatasetManifest(input_directory_path)
+        manifest.check()
+        label_names = sorted(manifest.counts())
+        label_index = {label: idx for idx, label in enumerate(label_names)}
+        paths = [path for path in manifest.paths(augmented=False) if path.endswith((FEATURE_EXTENSION, RAW_EXTENSION))]
+        labels = [label_index[manifest.get(path)['label']] for path in paths] # type: ignore
+        generator = cls(_FileRows(paths, FeatureCache(input_directory_path, schema=1).load), labels, **kwargs)
+        generator.label_names = label_names
+        return generator
+
+    def __len__(self):
+        # batches per epoch
+        return -(-len(self.labels) // self.batch_size)
+
+    def __iter__(self):
+        return self.epoch()
+
+    def epoch(self):
+        order = self.rng.permutation(len(self.labels)) if self.shuffle else np.arange(len(self.labels))
+        for start in range(0, len(order), self.batch_size):
+            idx = np.sort(order[start:start + self.batch_size]) # sorted reads are friendlier to memmaps
+            yield self.augment(np.asarray(self.sequences[idx])), self.labels[idx]
+
+    def batches(self, epochs: int | None = None):
+        # endless (epochs=None) stream of (x, y) batches
+        epoch = 0
+        while epochs is None or epoch < epochs:
+            yield from self.epoch()
+            epoch += 1
+
+    def augment(self, x: np.ndarray) -> np.ndarray:
+        # (B, T, 146) -> augmented (B, T, 146) float32
+        x = np.asarray(x, dtype=np.float64)
+        B, T, _ = x.shape
+        hands = x.reshape(B, T, 2, HAND_FEATURES)
+        landmarks = hands[..., :63].reshape(B, T, 2, 21, 3).copy()
+        present = np.any(hands != 0, axis=-1)                                    # (B, T, 2)
+        is_left = self._stored_chirality(landmarks, hands[..., 63:66])          # (B, T, 2)
+
+        if self.speed_range != (1.0, 1.0):
+            landmarks, present, is_left = self._resample(landmarks, present, is_left)
+
+        if self.mirror_p > 0:
+            mirror = self.rng.random(B) < self.mirror_p
+            landmarks[mirror] = landmarks[mirror][:, :, ::-1]
+            landmarks[mirror, ..., 0] = 1.0 - landmarks[mirror, ..., 0]
+            present[mirror] = present[mirror][:, :, ::-1]
+            is_left[mirror] = ~is_left[mirror][:, :, ::-1]
+
+        landmarks = self._rotate_and_scale(landmarks, present)
+
+        if self.jitter_std > 0:
+            landmarks += self.rng.normal(0.0, self.jitter_std, landmarks.shape)
+
+        return batch_hand_features(landmarks, is_left, present, dtype=np.float32)
+
+    def _stored_chirality(self, landmarks, normals):
+        wrist = landmarks[..., 0, :]
+        cross = np.cross(landmarks[..., 5, :] - wrist, landmarks[..., 17, :] - wrist)
+        return np.einsum('...i,...i->...', cross, normals) < 0
+
+    def _resample(self, landmarks, present, is_left):
+        # frame t of the output = frame round(center + (t - center) * speed) of the input
+        B, T = landmarks.shape[:2]
+        speed = self.rng.uniform(*self.speed_range, size=(B, 1))
+        center = (T - 1) / 2.0
+        src = np.clip(np.rint(center + (np.arange(T) - center) * speed), 0, T - 1).astype(np.int64)  # (B, T)
+        rows = np.arange(B)[:, None]
+        return landmarks[rows, src], present[rows, src], is_left[rows, src]
+
+    def _rotate_and_scale(self, landmarks, present):
+        B = landmarks.shape[0]
+        if self.rotate_deg <= 0 and self.scale_range == (1.0, 1.0):
+            return landmarks
+
+        # centroid of all present landmarks of each sequence
+        weights = present[..., None, None].astype(np.float64)                    # (B, T, 2, 1, 1)
+        n = np.maximum(weights.sum(axis=(1, 2, 3)) * landmarks.shape[-2], 1.0)   # (B, 1)
+        center = (landmarks * weights).sum(axis=(1, 2, 3)) / n                   # (B, 3)
+
+        ax, ay, az = np.radians(self.rng.uniform(-self.rotate_deg, self.rotate_deg, size=(3, B)))
+        cx, sx, cy, sy, cz, sz = np.cos(ax), np.sin(ax), np.cos(ay), np.sin(ay), np.cos(az), np.sin(az)
+        one, zero = np.ones(B), np.zeros(B)
+        rx = np.stack([one, zero, zero, zero, cx, -sx, zero, sx, cx], axis=-1).reshape(B, 3, 3)
+        ry = np.stack([cy, zero, sy, zero, one, zero, -sy, zero, cy], axis=-1).reshape(B, 3, 3)
+        rz = np.stack([cz, -sz, zero, sz, cz, zero, zero, zero, one], axis=-1).reshape(B, 3, 3)
+        scale = self.rng.uniform(*self.scale_range, size=(B, 1, 1))
+        transform = (rz @ ry @ rx) * scale                                       # (B, 3, 3)
+
+        centered = landmarks - center[:, None, None, None, :]
+        return np.einsum('bij,btkpj->btkpi', transform, centered) + center[:, None, None, None, :]
+
+
+class _RowView:
+    # lazily indexes a subset of rows of a (memmapped) array
+    def __init__(self, array, rows):
+        self.array = array
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, idx):
+        return self.array[self.rows[idx]]
+
+
+class _FileRows:
+    # one sequence file per row, a batch of rows is loaded (and stacked) when indexed
+    def __init__(self, paths, load):
+        self.paths = paths
+        self.load = load
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __getitem__(self, idx):
+        return np.stack([self.load(self.paths[row]) for row in idx])
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Throughput check for the streaming augmentation generator")
+    parser.add_argument('--data', default="data/landmark_sequences")
+    parser.add_argument('--packed', default=None, help="read a packed dataset instead of --data")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.packed:
+        generator = AugmentationGenerator.from_packed(args.packed, batch_size=args.batch_size, seed=args.seed)
+    else:
+        generator = AugmentationGenerator.from_directory(args.data, batch_size=args.batch_size, seed=args.seed)
+
+    start = time.time()
+    total = sum(len(y) for _, y in generator.epoch())
+    out_text = f"Augmented {total} sequence/s in {time.time() - start:.2f} second/s ({total / max(time.time() - start, 1e-9):.0f} sequences/s)."
+    print("-" * (len(out_text) + 4))
+    print(f"| {out_text} |")
+    print("-" * (len(out_text) + 4))
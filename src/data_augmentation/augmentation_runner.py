@@ -0,0 +1,116 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import tqdm
+from hand_mirror import HandMirror
+from manifest import DatasetManifest
+from sequence_store import RAW_EXTENSION, load_raw_sequence, mirror_raw, save_raw_sequence
+
+# parallel, incremental mirroring of data/landmark_sequences
+#
+# - inputs are the original .npy / .npz files only, <name>_flipped.* outputs are never mirrored again
+# - inputs and mtimes come from the dataset manifest, so a rerun doesn't stat every file
+# - an input is skipped when its output exists and is at least as new as the input (mtime)
+# - files are handed to worker processes in chunks, at most 2 chunks per worker in flight,
+#   so memory stays bounded no matter how big the dataset is
+# - outputs are written to a temp file and renamed, an interrupted run never leaves half written .npy files,
+#   and are added to the manifest as their chunk finishes
+
+GENERATED_SUFFIX = "_flipped"
+
+
+def is_generated(file_path: str) -> bool:
+    return os.path.splitext(file_path)[0].endswith(GENERATED_SUFFIX)
+
+
+def output_path_for(file_path: str) -> str:
+    name_only, ext = os.path.splitext(file_path)
+    return f"{name_only}{GENERATED_SUFFIX}{ext}"
+
+
+def is_up_to_date(file_path: str) -> bool:
+    out_path = output_path_for(file_path)
+    return os.path.exists(out_path) and os.path.getmtime(out_path) >= os.path.getmtime(file_path)
+
+
+def save_atomic(file_path: str, sequence: np.ndarray):
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, sequence)
+    os.replace(tmp_path, file_path)
+
+
+def save_raw_atomic(file_path: str, landmarks: np.ndarray, handedness: np.ndarray, mirrored: bool = False):
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        save_raw_sequence(f, landmarks, handedness, mirrored)
+    os.replace(tmp_path, file_path)
+
+
+def mirror_files(file_paths: list[str]) -> int:
+    # runs in a worker process: load, mirror and save one chunk, nothing is sent back but the count
+    # raw .npz recordings are mirrored as landmarks (their features are derived later), .npy as features;
+    # both end up with the same features (sequence_store.py keeps HandMirror's convention for mirrored files)
+    hand_mirror = HandMirror()
+    for file_path in file_paths:
+        if file_path.endswith(RAW_EXTENSION):
+            save_raw_atomic(output_path_for(file_path), *mirror_raw(*load_raw_sequence(file_path)))
+        else:
+            save_atomic(output_path_for(file_path), hand_mirror.safe_sequence_mirroring(np.load(file_path)))
+    return len(file_paths)
+
+
+class AugmentationRunner:
+    def __init__(self, input_directory_path: str, workers: int | None = None, chunk_size: int = 64):
+        self._input_directory_path = input_directory_path
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.manifest = DatasetManifest(input_directory_path)
+
+    def scan_inputs(self) -> list[str]:
+        self.manifest.check()
+        return self.manifest.paths(augmented=False)
+
+    def is_up_to_date(self, file_path: str) -> bool:
+        entry, out_entry = self.manifest.get(file_path), self.manifest.get(output_path_for(file_path))
+        if entry is None or out_entry is None:
+            return is_up_to_date(file_path)
+        return out_entry['mtime_ns'] >= entry['mtime_ns']
+
+    def pending_inputs(self, inputs: list[str], force: bool = False) -> list[str]:
+        return inputs if force else [file_path for file_path in inputs if not self.is_up_to_date(file_path)]
+
+    def _finish(self, future, chunk: list[str], progress) -> int:
+        count = future.result()
+        self.manifest.add_many([output_path_for(file_path) for file_path in chunk])
+        progress.update(count)
+        return count
+
+    def run(self, force: bool = False) -> int:
+        start_time = time.time()
+        inputs = self.scan_inputs()
+        pending = self.pending_inputs(inputs, force)
+
+        chunks = [pending[i:i + self.chunk_size] for i in range(0, len(pending), self.chunk_size)]
+        done = 0
+        with ProcessPoolExecutor(max_workers=self.workers) as pool, \
+                tqdm.tqdm(total=len(pending), desc="Mirroring sequences", colour = 'green', unit = 'files', ascii = True) as progress:
+            in_flight = {}
+            for chunk in chunks:
+                if len(in_flight) >= 2 * self.workers:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        done += self._finish(future, in_flight.pop(future), progress)
+                in_flight[pool.submit(mirror_files, chunk)] = chunk
+            for future, chunk in in_flight.items():
+                done += self._finish(future, chunk, progress)
+
+        elapsed_time = time.time() - start_time
+        out_text = (f"Mirrored {done} sequences in {elapsed_time:.2f} seconds "
+                    f"({len(inputs) - len(pending)} already up to date, {self.workers} worker/s).")
+        print("-" * (len(out_text) + 4))
+        print(f"| {out_text} |")
+        print("-" * (len(out_text) + 4))
+        return done
@@ -1,23 +1,39 @@
+import argparse
+
 from hand_mirror import HandMirror
 from numpy_array_file import NumpyArrayFile
-from numpy_file_procs import NumpyFileProcs
+from augmentation_runner import AugmentationRunner
+from sequence_store import RAW_EXTENSION, derive_features, load_raw_sequence
+
+# mirrors every new/changed sequence in data/landmark_sequences into <name>_flipped.npy / .npz
+# rerunning only picks up inputs without an up-to-date output, --force redoes everything
 
 if __name__ == '__main__':
-    file_procs_instance = NumpyFileProcs("data/landmark_sequences")
-    file_procs_instance.create_file_objs()
+    parser = argparse.ArgumentParser(description="Mirror landmark sequences (left <-> right hand)")
+    parser.add_argument('--data', default="data/landmark_sequences")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--chunk-size', type=int, default=64, help="files per worker task")
+    parser.add_argument('--force', action='store_true', help="re-mirror inputs whose output is already up to date")
+    parser.add_argument('--preview', action='store_true', help="preview the first pending file and ask for 'confirm' before starting")
+    args = parser.parse_args()
+
+    runner = AugmentationRunner(args.data, args.workers, args.chunk_size)
 
-    hand_mirror = HandMirror()
+    if args.preview:
+        pending = runner.pending_inputs(runner.scan_inputs(), args.force)
+        if pending:
+            print("\n============ PREVIEW ============")
+            if pending[0].endswith(RAW_EXTENSION): # raw landmarks, previewed as the features they mirror into
+                HandMirror().preview_sequence_mirroring(derive_features(*load_raw_sequence(pending[0]), schema=1), pending[0])
+            else:
+                HandMirror().preview_mirroring_output(NumpyArrayFile(pending[0]))
+            print("\n========== END PREVIEW ==========\n\n")
 
-    if file_procs_instance.file_objs:
-        print("\n============ PREVIEW ============")
-        hand_mirror.preview_mirroring_output(file_procs_instance.file_objs[0])
-        print("\n========== END PREVIEW ==========\n\n")
+        inp = "> Want to start the process? (type 'confirm'):\t"
+        print('-' * (len(inp) + 10))
+        if input(inp) != 'confirm':
+            print("\nUser cancel.")
+            raise SystemExit(0)
 
-    inp = "> Want to start the process? (type 'confirm'):\t"
-    print('-' * (len(inp) + 10))
-    if input(inp) == 'confirm':
-        # this will start processs
-        hand_mirror.start_sequence_mirroring(file_procs_instance.file_objs)
-        print("\nAll sequences have been mirrored and saved!")
-    else:
-        print("\nUser cancel.")
\ No newline at end of file
+    runner.run(args.force)
+    print("\nAll sequences have been mirrored and saved!")
@@ -0,0 +1,299 @@
+import csv
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from manifest import DatasetManifest
+from sequence_store import FeatureCache
+
+# near-duplicate detection for data/landmark_sequences
+#
+# signature: per hand, the 20 non-wrist landmarks relative to the wrist and divided by the wrist ->
+# middle finger MCP length (position and distance to the camera don't matter), averaged over
+# SEGMENTS equal parts of the sequence, quantized to int8 in steps of QUANTUM hand lengths
+# -> 4 x 2 x 20 x 3 = 480 bytes per sequence, a missing hand is all zeros
+#
+# search: the signatures are projected on `projections` random unit vectors, sorted along each one and
+# every sequence is compared with its `window` neighbours in that order (n * projections * window
+# distance checks, O(n log n) overall instead of all n^2 pairs). projecting on orthonormal directions
+# never moves two sequences further apart than they are, so pairs whose 32-dim projections are
+# further apart than the threshold are dropped before the full distance is computed. matching pairs
+# (RMS signature distance <= threshold) are joined into clusters (single linkage), within and across labels
+#
+# signatures are cached in dedup_index.npz next to the manifest (data/.manifest/<data name>/, outside the
+# label folders), only files whose manifest checksum changed are reloaded
+#
+# only depends on numpy (and manifest.py), import it from the data_augmentation scripts (flat imports)
+
+INDEX_FILE = 'dedup_index.npz'
+SEGMENTS = 4
+QUANTUM = 0.025
+HAND_SIZE = 73
+SCALE_LANDMARK = 9 # middle finger MCP
+SKETCH = 32 # projected dimensions used to skip far pairs before the full distance
+
+
+def sequence_signatures(sequences: np.ndarray, segments: int = SEGMENTS, quantum: float = QUANTUM) -> np.ndarray:
+    # (n, T, 146) -> (n, segments * 2 * 20 * 3) int8
+    sequences = np.asarray(sequences, dtype=np.float32)
+    n, frames = sequences.shape[:2]
+    hands = sequences.reshape(n, frames, 2, HAND_SIZE)
+    present = np.any(hands != 0, axis=-1) # (n, T, 2)
+    landmarks = hands[..., :63].reshape(n, frames, 2, 21, 3)
+
+    relative = landmarks[..., 1:, :] - landmarks[..., :1, :]
+    scale = np.linalg.norm(relative[..., SCALE_LANDMARK - 1, :], axis=-1) # (n, T, 2)
+    valid = present & (scale > 1e-6)
+    relative = np.where(valid[..., None, None], relative / np.where(valid, scale, 1.0)[..., None, None], 0.0)
+
+    # mean over the frames of each segment where the hand is present
+    bounds = np.linspace(0, frames, segments + 1).astype(np.int64)[:-1]
+    sums = np.add.reduceat(relative, bounds, axis=1)
+    counts = np.add.reduceat(valid.astype(np.float32), bounds, axis=1)
+    means = sums / np.maximum(counts, 1.0)[..., None, None]
+
+    return np.clip(np.round(means / quantum), -127, 127).astype(np.int8).reshape(n, -1)
+
+
+def signature_distances(signatures: np.ndarray, i: np.ndarray, j: np.ndarray, quantum: float = QUANTUM,
+                        chunk: int = 16384) -> np.ndarray:
+    # RMS distance in hand lengths between signatures[i] and signatures[j], pairwise
+    out = np.empty(len(i), dtype=np.float32)
+    for start in range(0, len(i), chunk):
+        a = signatures[i[start:start + chunk]].astype(np.int16)
+        b = signatures[j[start:start + chunk]].astype(np.int16)
+        out[start:start + chunk] = np.sqrt(np.mean(np.square(a - b, dtype=np.int32), axis=1)) * quantum
+    return out
+
+
+def connected_components(n: int, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    # component id (smallest member index) per node, vectorized min-label propagation with pointer jumping
+    parent = np.arange(n)
+    while True:
+        previous = parent.copy()
+        low = np.minimum(parent[i], parent[j])
+        np.minimum.at(parent, parent[i], low)
+        np.minimum.at(parent, parent[j], low)
+        parent = parent[parent]
+        if np.array_equal(parent, previous):
+            return parent
+
+
+class DedupIndex:
+    def __init__(self, paths: list[str], labels: list[str], checksums: list[str], signatures: np.ndarray):
+        self.paths = paths
+        self.labels = labels
+        self.checksums = checksums
+        self.signatures = signatures
+
+    def __len__(self):
+        return len(self.paths)
+
+    @classmethod
+    def build(cls, data_dir: str, include_augmented: bool = False, workers: int = 8, chunk_size: int = 1024) -> 'DedupIndex':
+        # signatures of every sequence in the manifest, reusing the cached ones whose checksum didn't change
+        manifest = DatasetManifest(data_dir)
+        manifest.check()
+        paths = manifest.paths(augmented=None if include_augmented else False)
+        entries = [manifest.get(path) for path in paths]
+        checksums = [entry['checksum'] for entry in entries] # type: ignore
+        labels = [entry['label'] for entry in entries] # type: ignore
+
+        index_path = os.path.join(manifest.manifest_dir, INDEX_FILE)
+        legacy_path = os.path.join(data_dir, INDEX_FILE) # inside the label root in earlier versions
+        if os.path.isfile(legacy_path):
+            if os.path.exists(index_path):
+                os.remove(legacy_path)
+            else:
+                os.replace(legacy_path, index_path)
+        cached = cls.load(index_path)
+        known = {} if cached is None else {(p, c): s for p, c, s in zip(cached.paths, cached.checksums, cached.signatures)}
+        rel_paths = [os.path.relpath(path, data_dir) for path in paths]
+
+        signatures = np.zeros((len(paths), SEGMENTS * 2 * 20 * 3), dtype=np.int8)
+        missing = []
+        for idx, key in enumerate(zip(rel_paths, checksums)):
+            if key in known:
+                signatures[idx] = known[key]
+            else:
+                missing.append(idx)
+
+        feature_cache = FeatureCache(data_dir, schema=1) # signatures use the schema 1 layout, raw .npz included
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for offset in range(0, len(missing), chunk_size):
+                chunk = missing[offset:offset + chunk_size]
+                sequences = list(pool.map(feature_cache.load, [paths[idx] for idx in chunk]))
+                by_shape: dict[tuple, list[int]] = {}
+                for pos, sequence in enumerate(sequences):
+                    by_shape.setdefault(sequence.shape, []).append(pos)
+                for shape, positions in by_shape.items():
+                    if len(shape) != 2 or shape[1] != 2 * HAND_SIZE:
+                        continue # not a (T, 146) sequence, keeps an all-zero signature
+                    signatures[[chunk[pos] for pos in positions]] = sequence_signatures(np.stack([sequences[pos] for pos in positions]))
+
+        index = cls(paths, labels, checksums, signatures)
+        index.save(index_path, data_dir)
+        print(f"Signatures: {len(paths) - len(missing)} cached, {len(missing)} computed")
+        return index
+
+    def save(self, path: str, data_dir: str):
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, paths=np.array([os.path.relpath(p, data_dir) for p in self.paths], dtype=str),
+                 checksums=np.array(self.checksums, dtype=str), signatures=self.signatures,
+                 segments=SEGMENTS, quantum=QUANTUM)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'DedupIndex | None':
+        # cached signatures (paths relative to the data folder), None if missing or built with other settings
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            if int(data['segments']) != SEGMENTS or float(data['quantum']) != QUANTUM:
+                return None
+            return cls(data['paths'].tolist(), [], data['checksums'].tolist(), data['signatures'])
+
+    def candidate_pairs(self, threshold: float, projections: int = 8, window: int = 8, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        # (i, j) with i < j, unique, that are neighbours in sorted order along at least one random projection
+        # and whose SKETCH-dimensional projection is within the threshold
+        n = len(self)
+        if n < 2:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        rng = np.random.default_rng(seed)
+        dims = self.signatures.shape[1]
+        # orthonormal directions: the distance between two sketches is a lower bound of the full distance
+        directions, _ = np.linalg.qr(rng.standard_normal((dims, max(projections, SKETCH))))
+        sketches = (self.signatures.astype(np.float32) @ directions.astype(np.float32)) * QUANTUM # hand lengths
+        max_distance = threshold * np.sqrt(dims)
+
+        keys = []
+        for p in range(projections):
+            order = np.argsort(sketches[:, p], kind='stable')
+            ordered = sketches[order]
+            for offset in range(1, min(window, n - 1) + 1):
+                gap = ordered[offset:] - ordered[:-offset]
+                close = np.einsum('ij,ij->i', gap, gap) <= max_distance * max_distance
+                a, b = order[:-offset][close], order[offset:][close]
+                keys.append(np.minimum(a, b).astype(np.int64) * n + np.maximum(a, b))
+        keys = np.unique(np.concatenate(keys))
+        return keys // n, keys % n
+
+    def find_clusters(self, threshold: float = 0.05, projections: int = 8, window: int = 8, seed: int = 0) -> list[np.ndarray]:
+        # clusters of 2+ near-duplicate sequences (index arrays), largest first
+        i, j = self.candidate_pairs(threshold, projections, window, seed)
+        match = signature_distances(self.signatures, i, j) <= threshold
+        components = connected_components(len(self), i[match], j[match])
+        ids, inverse, sizes = np.unique(components, return_inverse=True, return_counts=True)
+        order = np.argsort(inverse, kind='stable')
+        groups = np.split(order, np.cumsum(sizes)[:-1])
+        clusters = [group for group in groups if len(group) > 1]
+        clusters.sort(key=len, reverse=True)
+        return clusters
+
+    def label_groups(self, clusters: list[np.ndarray]) -> list[np.ndarray]:
+        # clusters split by label, duplicates are only pruned / down-weighted within one label
+        groups = []
+        for cluster in clusters:
+            by_label: dict[str, list[int]] = {}
+            for idx in cluster:
+                by_label.setdefault(self.labels[idx], []).append(int(idx))
+            groups.extend(np.array(members) for members in by_label.values() if len(members) > 1)
+        return groups
+
+    def weights(self, clusters: list[np.ndarray]) -> np.ndarray:
+        # 1 / group size for sequences in a same-label group of near-duplicates, 1 otherwise
+        weights = np.ones(len(self), dtype=np.float32)
+        for group in self.label_groups(clusters):
+            weights[group] = 1.0 / len(group)
+        return weights
+
+    def redundant(self, clusters: list[np.ndarray]) -> list[int]:
+        # every member of a same-label group except the first (paths are sorted, so the oldest file stays)
+        return sorted(int(idx) for group in self.label_groups(clusters) for idx in sorted(group)[1:])
+
+    def report(self, clusters: list[np.ndarray], top: int = 10):
+        cross_label = [c for c in clusters if len({self.labels[idx] for idx in c}) > 1]
+        redundant = len(self.redundant(clusters))
+        print("===== NEAR-DUPLICATE CLUSTERS =====")
+        for cluster in clusters[:top]:
+            labels: dict[str, int] = {}
+            for idx in cluster:
+                labels[self.labels[idx]] = labels.get(self.labels[idx], 0) + 1
+            print(f"{len(cluster)} sequence/s {labels}: {self.paths[cluster[0]]} ...")
+        if len(clusters) > top:
+            print(f"... {len(clusters) - top} more")
+        for cluster in cross_label[:top]:
+            print(f"CROSS-LABEL: {sorted({self.labels[idx] for idx in cluster})}: {', '.join(self.paths[idx] for idx in cluster[:4])}")
+        print("===== END =====")
+        out_text = (f"{len(self)} sequence/s, {len(clusters)} cluster/s, {redundant} redundant within a label, "
+                    f"{len(cross_label)} cross-label cluster/s.")
+        print("-" * (len(out_text) + 4))
+        print(f"| {out_text} |")
+        print("-" * (len(out_text) + 4))
+
+
+def generated_path_for(file_path: str) -> str:
+    name_only, ext = os.path.splitext(file_path)
+    return f"{name_only}_flipped{ext}"
+
+
+def write_weights(path: str, index: DedupIndex, weights: np.ndarray):
+    # path,label,weight per sequence, a _flipped output gets the weight of its source
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['path', 'label', 'weight'])
+        for file_path, label, weight in zip(index.paths, index.labels, weights):
+            writer.writerow([file_path, label, f"{weight:.6f}"])
+            if os.path.exists(generated_path_for(file_path)):
+                writer.writerow([generated_path_for(file_path), label, f"{weight:.6f}"])
+
+
+def prune(index: DedupIndex, clusters: list[np.ndarray], data_dir: str, prune_dir: str) -> int:
+    # moves the redundant files (and their _flipped outputs) to prune_dir/<label>/, nothing is deleted
+    moved = 0
+    for idx in index.redundant(clusters):
+        for file_path in (index.paths[idx], generated_path_for(index.paths[idx])):
+            if not os.path.exists(file_path):
+                continue
+            target = os.path.join(prune_dir, os.path.relpath(file_path, data_dir))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.move(file_path, target)
+            moved += 1
+    DatasetManifest(data_dir).check()
+    return moved
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find near-duplicate sequences in data/landmark_sequences")
+    parser.add_argument('--data', default=os.path.join("data", "landmark_sequences"))
+    parser.add_argument('--threshold', type=float, default=0.05, help="max RMS signature distance, in hand lengths (wrist -> middle finger MCP)")
+    parser.add_argument('--projections', type=int, default=8, help="random projections to sort along (more = better recall, slower)")
+    parser.add_argument('--window', type=int, default=8, help="neighbours compared per sequence and projection")
+    parser.add_argument('--include-augmented', action='store_true', help="also index *_flipped.npy outputs")
+    parser.add_argument('--weights', default=None, help="write path,label,weight CSV (1 / near-duplicate group size)")
+    parser.add_argument('--prune', action='store_true', help="move all but one sequence of every same-label group to --prune-dir")
+    parser.add_argument('--prune-dir', default=os.path.join("data", "landmark_sequences_duplicates"))
+    args = parser.parse_args()
+
+    start = time.time()
+    index = DedupIndex.build(args.data, args.include_augmented)
+    clusters = index.find_clusters(args.threshold, args.projections, args.window)
+    print(f"Search: {len(index)} sequence/s in {time.time() - start:.2f} second/s")
+    index.report(clusters)
+
+    if args.weights:
+        write_weights(args.weights, index, index.weights(clusters))
+        print(f"Weights => {args.weights}")
+
+    if args.prune:
+        inp = f"> Move {len(index.redundant(clusters))} redundant sequence/s to {args.prune_dir}? (type 'confirm'):\t"
+        print('-' * (len(inp) + 10))
+        if input(inp) == 'confirm':
+            print(f"Moved {prune(index, clusters, args.data, args.prune_dir)} file/s to {args.prune_dir}")
+        else:
+            print("\nUser cancel.")
@@ -5,13 +5,26 @@ from numpy_array_file import NumpyArrayFile
 
 class HandMirror:
     
+    # per hand block (73,): 63 landmarks (x, y, z), normal (3), pitch, yaw, 5 finger angles
+    # mirroring = x -> 1 - x, negate normal x/z and yaw, then swap the left and right blocks
+    HAND_SIZE = 73
+    LANDMARK_X = slice(0, 63, 3)
+    NEGATED = [63, 65, 67] # normal x, normal z, yaw
+
     def start_sequence_mirroring(self, file_objs: list[NumpyArrayFile]):
 
         start_time = time.time()
-        for sequence in tqdm.tqdm(file_objs, desc="Mirroring sequences", colour = 'green', unit = 'files', ascii = True):
-            sequence_original = sequence.sequence
-            sequence_mirrored = self.safe_sequence_mirroring(sequence_original)
-            sequence.set_new_sequence(sequence_mirrored)
+
+        # same shaped sequences are stacked and mirrored in one batch_sequence_mirroring call
+        by_shape: dict[tuple, list[NumpyArrayFile]] = {}
+        for file_obj in file_objs:
+            by_shape.setdefault(file_obj.sequence.shape, []).append(file_obj)
+        for group in by_shape.values():
+            mirrored = self.batch_sequence_mirroring(np.stack([file_obj.sequence for file_obj in group]))
+            for file_obj, sequence_mirrored in zip(group, mirrored):
+                file_obj.set_new_sequence(sequence_mirrored)
+
+        for sequence in tqdm.tqdm(file_objs, desc="Saving mirrored sequences", colour = 'green', unit = 'files', ascii = True):
             sequence.save_sequence()
         
         elapsed_time = time.time() - start_time
@@ -21,48 +34,33 @@ class HandMirror:
         print("-" * (len(out_text) + 4))
     
     def safe_sequence_mirroring(self, sequence: np.ndarray) -> np.ndarray:
+        # (T, 146) -> (T, 146) float32, the input is left untouched
+        return self.batch_sequence_mirroring(sequence)
 
-        sequence_mirrored = []
-        
-        for frame in sequence:
-            hand_left = frame[:73]
-            hand_right = frame[73:]
-
-            mirrored_l = np.zeros_like(hand_left)
-            mirrored_r = np.zeros_like(hand_right)
-
-            def mirror_hand(hand):
-                landmarks = hand[:63].reshape((21, 3)).copy()
-                normal = hand[63:66]
-                pitch, yaw = hand[66:68]
-                angles = hand[68:73]
-
-                landmarks[:, 0] = 1.0 - landmarks[:, 0]
-                normal[0] *= -1
-                normal[2] *= -1
-                yaw *= -1
+    def batch_sequence_mirroring(self, sequences: np.ndarray) -> np.ndarray:
+        # (..., 146), e.g. a whole (N, T, 146) dataset -> same shape, float32
+        # math is done in the input dtype and cast once at the end, so results are bit-identical
+        # to the old frame by frame version (which also flipped the input's normals in place, this doesn't)
+        sequences = np.asarray(sequences)
+        hands = sequences.reshape(sequences.shape[:-1] + (2, self.HAND_SIZE))
 
-                return np.concatenate([
-                    landmarks.flatten(),
-                    normal,
-                    [pitch, yaw],
-                    angles
-                ])
+        present = np.any(hands != 0, axis = -1, keepdims = True) # all-zero block = hand missing, stays zero
 
-            if not np.all(hand_left == 0):
-                mirrored_r = mirror_hand(hand_left)
-            if not np.all(hand_right == 0):
-                mirrored_l = mirror_hand(hand_right)
+        mirrored = hands.copy()
+        mirrored[..., self.LANDMARK_X] = 1.0 - hands[..., self.LANDMARK_X]
+        mirrored[..., self.NEGATED] *= -1
 
-            full_frame = np.concatenate([mirrored_l, mirrored_r])
-            sequence_mirrored.append(full_frame)
+        # left hand becomes the right one and vice versa
+        mirrored = np.where(present, mirrored, 0)[..., ::-1, :]
 
-        return np.array(sequence_mirrored, dtype=np.float32)
+        return mirrored.reshape(sequences.shape).astype(np.float32)
 
     def preview_mirroring_output(self, file_obj: NumpyArrayFile, frame_idx: int = 0):
-        sequence_original = file_obj.sequence
+        self.preview_sequence_mirroring(file_obj.sequence, file_obj.file_path, frame_idx)
 
-        print(f"Preview file path: {file_obj.file_path}")        
+    def preview_sequence_mirroring(self, sequence_original: np.ndarray, file_path: str, frame_idx: int = 0):
+        # (T, 146) features, e.g. derived from a raw .npz recording
+        print(f"Preview file path: {file_path}")        
 
         if frame_idx >= len(sequence_original):
             print(f"Frame index {frame_idx} is out of bounds. Sequence has {len(sequence_original)} frames.")
@@ -0,0 +1,262 @@
+import csv
+import io
+import json
+import os
+import zlib
+
+import numpy as np
+
+# dataset manifest for data/landmark_sequences/<label>/*.npy|*.npz, so consumers read one file instead of
+# listing every label folder (minutes on network drives / Colab's Drive mount)
+#
+# both files sit next to the label root, never inside it (data/.manifest/landmark_sequences/), anything
+# listing the root expects only label folders there (the training notebook makes every entry a class)
+#
+# <dir>/manifest.csv            one row per sequence: path (relative to root), label, shape, size,
+#                               mtime_ns, checksum (crc32 of the file), augmented (1 = generated _flipped file)
+#                               append-only journal: later rows for a path win, size -1 = removed,
+#                               compacted when superseded rows pile up
+# <dir>/manifest_folders.json   mtime_ns of every label folder when the manifest last matched it
+#
+# collection / augmentation add their files as they write them (add / add_many), check() then only
+# lists the folders whose mtime changed since (a file created, renamed or deleted in them)
+# files rewritten in place don't change their folder's mtime, check(deep=True) stats every file
+#
+# only depends on numpy, so it can be imported from the data_augmentation scripts (flat imports)
+# and from src/ as data_augmentation.manifest; data_collection_src/manifest.py is a copy of this file
+
+MANIFEST_FILE = 'manifest.csv'
+FOLDERS_FILE = 'manifest_folders.json'
+FIELDS = ['path', 'label', 'shape', 'size', 'mtime_ns', 'checksum', 'augmented']
+EXTENSIONS = ('.npy', '.npz') # derived features / raw landmarks (sequence_store.py)
+GENERATED_SUFFIX = '_flipped'
+MANIFEST_DIR = '.manifest'
+
+
+def describe_file(path: str) -> dict:
+    # size, mtime, crc32 and array shape (.npy header / landmarks of a raw .npz) of one sequence file
+    with open(path, 'rb') as f:
+        data = f.read()
+        st = os.fstat(f.fileno())
+    shape = ()
+    try:
+        bio = io.BytesIO(data)
+        if path.endswith('.npz'):
+            with np.load(bio) as npz:
+                shape = npz['landmarks'].shape
+        elif np.lib.format.read_magic(bio) == (1, 0):
+            shape = np.lib.format.read_array_header_1_0(bio)[0]
+        else:
+            shape = np.lib.format.read_array_header_2_0(bio)[0]
+    except (ValueError, KeyError, OSError):
+        pass # not a valid sequence file, recorded with an empty shape
+    return {'shape': list(shape), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'checksum': f"{zlib.crc32(data):08x}"}
+
+
+def default_manifest_dir(root: str) -> str:
+    # data/landmark_sequences -> data/.manifest/landmark_sequences
+    root = os.path.abspath(root)
+    return os.path.join(os.path.dirname(root), MANIFEST_DIR, os.path.basename(root))
+
+
+class DatasetManifest:
+    def __init__(self, root: str, manifest_dir: str | None = None):
+        self.root = root
+        self.manifest_dir = manifest_dir or default_manifest_dir(root)
+        self.manifest_path = os.path.join(self.manifest_dir, MANIFEST_FILE)
+        self.folders_path = os.path.join(self.manifest_dir, FOLDERS_FILE)
+        self.entries: dict[str, dict] = {}
+        self.folders: dict[str, int] = {}
+        self._journal_rows = 0
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        self._move_legacy_files()
+        self._load()
+
+    def _move_legacy_files(self):
+        # manifests written inside the label root by earlier versions, moved out (or dropped when
+        # the new location already has one)
+        for file, path in ((MANIFEST_FILE, self.manifest_path), (FOLDERS_FILE, self.folders_path)):
+            legacy_path = os.path.join(self.root, file)
+            if os.path.isfile(legacy_path):
+                if os.path.exists(path):
+                    os.remove(legacy_path)
+                else:
+                    os.replace(legacy_path, path)
+
+    def _load(self):
+        # a run killed mid-append can leave a cut-off last row: rows that don't parse are skipped, their
+        # label folders are listed again by the next check() and the journal is rewritten without them
+        damaged: set[str] = set()
+        cut_off = False
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', newline='', encoding='utf-8') as f:
+                text = f.read()
+            cut_off = bool(text) and not text.endswith('\n')
+            row = {}
+            for row in csv.DictReader(io.StringIO(text)):
+                self._journal_rows += 1
+                try:
+                    if any(row.get(field) is None for field in FIELDS):
+                        raise ValueError("missing fields")
+                    size = int(row['size'])
+                    entry = {
+                        'label': row['label'],
+                        'shape': [int(n) for n in row['shape'].split('x')] if row['shape'] else [],
+                        'size': size,
+                        'mtime_ns': int(row['mtime_ns']),
+                        'checksum': row['checksum'],
+                        'augmented': row['augmented'] == '1',
+                    }
+                except ValueError:
+                    damaged.add((row.get('path') or '').split('/', 1)[0])
+                    continue
+                if size < 0:
+                    self.entries.pop(row['path'], None)
+                    continue
+                self.entries[row['path']] = entry
+            if cut_off: # even a complete last row may name a file that never got written
+                damaged.add((row.get('path') or '').split('/', 1)[0])
+        if os.path.exists(self.folders_path):
+            with open(self.folders_path, 'r', encoding='utf-8') as f:
+                self.folders = json.load(f)
+        if damaged or cut_off:
+            for label in damaged:
+                self.folders.pop(label, None)
+            self.compact()
+            self._save_folders()
+
+    @staticmethod
+    def _row(path, entry):
+        return [path, entry['label'], 'x'.join(str(n) for n in entry['shape']), entry['size'], entry['mtime_ns'],
+                entry['checksum'], int(entry['augmented'])]
+
+    def _append(self, rows):
+        if not rows:
+            return
+        new_file = not os.path.exists(self.manifest_path)
+        with open(self.manifest_path, 'a', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(FIELDS)
+            writer.writerows(rows)
+        self._journal_rows += len(rows)
+
+    def _save_folders(self):
+        tmp_path = self.folders_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.folders, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.folders_path)
+
+    def _rel(self, path: str) -> str:
+        return os.path.relpath(path, self.root).replace(os.sep, '/')
+
+    def _describe(self, rel_path: str) -> dict:
+        label, file = rel_path.split('/', 1)
+        entry = describe_file(os.path.join(self.root, rel_path))
+        entry['label'] = label
+        entry['augmented'] = os.path.splitext(file)[0].endswith(GENERATED_SUFFIX)
+        return entry
+
+    def add_many(self, paths: list[str]):
+        # files just written by collection / augmentation; the new mtimes of folders check() has already
+        # matched are taken as checked, other folders are still listed by the next check()
+        rows = []
+        labels = set()
+        for path in paths:
+            rel_path = self._rel(path)
+            entry = self._describe(rel_path)
+            self.entries[rel_path] = entry
+            rows.append(self._row(rel_path, entry))
+            labels.add(entry['label'])
+        self._append(rows)
+        checked = [label for label in labels if label in self.folders]
+        for label in checked:
+            self.folders[label] = os.stat(os.path.join(self.root, label)).st_mtime_ns
+        if checked:
+            self._save_folders()
+
+    def add(self, path: str):
+        self.add_many([path])
+
+    def check(self, deep: bool = False) -> dict:
+        # brings the manifest in line with the disk, only label folders whose mtime changed are listed
+        # (all of them with deep=True); returns what changed
+        os.makedirs(self.root, exist_ok=True)
+        labels = {d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d))}
+        summary = {'folders_scanned': 0, 'added': 0, 'updated': 0, 'removed': 0}
+        rows = []
+
+        by_label: dict[str, set[str]] = {}
+        for rel_path, entry in self.entries.items():
+            by_label.setdefault(entry['label'], set()).add(rel_path)
+
+        for label in set(by_label) - labels: # folder deleted
+            for rel_path in by_label[label]:
+                del self.entries[rel_path]
+                rows.append([rel_path, label, '', -1, 0, '', 0])
+                summary['removed'] += 1
+            self.folders.pop(label, None)
+
+        for label in sorted(labels):
+            folder = os.path.join(self.root, label)
+            mtime_ns = os.stat(folder).st_mtime_ns
+            if not deep and self.folders.get(label) == mtime_ns:
+                continue
+            summary['folders_scanned'] += 1
+            on_disk = {f"{label}/{f}" for f in os.listdir(folder) if f.endswith(EXTENSIONS)}
+            known = by_label.get(label, set())
+            for rel_path in known - on_disk:
+                del self.entries[rel_path]
+                rows.append([rel_path, label, '', -1, 0, '', 0])
+                summary['removed'] += 1
+            for rel_path in sorted(on_disk):
+                entry = self.entries.get(rel_path)
+                if entry is not None:
+                    if not deep:
+                        continue
+                    st = os.stat(os.path.join(self.root, rel_path))
+                    if st.st_size == entry['size'] and st.st_mtime_ns == entry['mtime_ns']:
+                        continue
+                    summary['updated'] += 1
+                else:
+                    summary['added'] += 1
+                entry = self._describe(rel_path)
+                self.entries[rel_path] = entry
+                rows.append(self._row(rel_path, entry))
+            self.folders[label] = mtime_ns
+
+        self._append(rows)
+        if summary['folders_scanned'] or summary['removed'] or not os.path.exists(self.folders_path):
+            self._save_folders()
+        if self._journal_rows > 2 * len(self.entries) + 1000:
+            self.compact()
+        return summary
+
+    def compact(self):
+        # rewrites the journal with one row per current file
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            writer.writerows(self._row(path, self.entries[path]) for path in sorted(self.entries))
+        os.replace(tmp_path, self.manifest_path)
+        self._journal_rows = len(self.entries)
+
+    def paths(self, label: str | None = None, augmented: bool | None = None, extension: str | None = None) -> list[str]:
+        # full paths, sorted; augmented None = all, False = originals only, True = _flipped only
+        return [os.path.join(self.root, *rel_path.split('/')) for rel_path, entry in sorted(self.entries.items())
+                if (label is None or entry['label'] == label) and (augmented is None or entry['augmented'] == augmented)
+                and (extension is None or rel_path.endswith(extension))]
+
+    def get(self, path: str) -> dict | None:
+        return self.entries.get(self._rel(path))
+
+    def counts(self, augmented: bool | None = None) -> dict[str, int]:
+        counts: dict[str, int] = {label: 0 for label in sorted(self.folders)}
+        for entry in self.entries.values():
+            if augmented is None or entry['augmented'] == augmented:
+                counts[entry['label']] = counts.get(entry['label'], 0) + 1
+        return dict(sorted(counts.items()))
+
+    def __len__(self):
+        return len(self.entries)
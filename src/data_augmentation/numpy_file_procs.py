@@ -3,21 +3,34 @@ import time
 
 import tqdm
 from numpy_array_file import NumpyArrayFile
+from augmentation_runner import is_generated
+from manifest import EXTENSIONS, DatasetManifest
 
 class NumpyFileProcs:
     def __init__(self, input_directory_path):
         self._input_directory_path = input_directory_path
+        self.manifest = DatasetManifest(input_directory_path)
+        self.manifest.check()
         self._npy_files = self.scan_dir(self._input_directory_path)
 
         self.file_objs: list[NumpyArrayFile] = []
 
-    def scan_dir(self, directory_path: str, extension_name: str = ".npy") -> list[str]:
-        scans = []
+    def scan_dir(self, directory_path: str, extension_name: str = ".npy", include_generated: bool = False) -> list[str]:
+        # generated <name>_flipped.npy files are skipped unless include_generated, so they are never mirrored again
+        # sequence files come from the dataset manifest, other extensions are still walked
         self._count_dirs()
-        for root, dirs, files in os.walk(directory_path):
-            for file in files:
-                if file.endswith(extension_name):
-                    scans.append(os.path.join(root, file))
+        if extension_name in EXTENSIONS:
+            manifest = self.manifest
+            if directory_path != self._input_directory_path:
+                manifest = DatasetManifest(directory_path)
+                manifest.check()
+            scans = manifest.paths(augmented=None if include_generated else False, extension=extension_name)
+        else:
+            scans = []
+            for root, dirs, files in os.walk(directory_path):
+                for file in files:
+                    if file.endswith(extension_name) and (include_generated or not is_generated(file)):
+                        scans.append(os.path.join(root, file))
 
         out_text = f"{directory_path} has {len(scans)} file/s."
         print("-" * (len(out_text) + 4))
@@ -26,15 +39,13 @@ class NumpyFileProcs:
         return scans
 
     def _count_dirs(self):
-        folder = self._input_directory_path
-        os.makedirs(folder, exist_ok = True)
+        counts = self.manifest.counts()
         print("===== EXISTING LABELS =====")
-        f1: list[str] = os.listdir(folder)
-        if len(f1) < 1:
+        if len(counts) < 1:
             print ("None.")
         else:
-            for label in os.listdir(folder):
-                print(f"\"{label}\": {len([f for f in os.listdir(os.path.join(folder, label)) if os.path.isfile(os.path.join(folder, label, f))])}")
+            for label, count in counts.items():
+                print(f"\"{label}\": {count}")
         print("===== END =====")
 
     def create_file_objs(self):
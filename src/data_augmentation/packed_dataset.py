@@ -0,0 +1,221 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# packed dataset: every (20, 146) sequence in one contiguous file instead of one tiny .npy each
+#
+# <path>/
+#   sequences.bin  raw (N, 20, 146) array, float32 or float16, opened with np.memmap
+#   index.csv      one row per sequence: label, source (original .npy / .npz path or "" when appended directly)
+#   meta.json      dtype, sequence shape, row count and label names, written last on every append
+#
+# appends go bytes -> index -> meta, so a crash mid-append leaves the old row count in meta.json
+# and the next append trims the partial tail
+#
+# only depends on numpy, so it can be imported from the data_augmentation scripts (flat imports)
+# and from src/ as data_augmentation.packed_dataset; import_directory reads raw .npz recordings through
+# sequence_store.py and only runs from the data_augmentation scripts
+
+SEQUENCES_FILE = 'sequences.bin'
+INDEX_FILE = 'index.csv'
+META_FILE = 'meta.json'
+SOURCE_EXTENSIONS = ('.npy', '.npz') # schema 1 features / raw landmarks (sequence_store.py)
+
+
+class PackedDataset:
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        self.dtype = np.dtype(meta['dtype'])
+        self.sequence_shape: tuple[int, ...] = tuple(meta['sequence_shape'])
+        self.label_names: list[str] = meta['labels']
+        self._count: int = meta['count']
+
+        self.sources: list[str] = []
+        labels = []
+        label_index = {label: idx for idx, label in enumerate(self.label_names)}
+        rows = 0
+        with open(os.path.join(path, INDEX_FILE), 'r', newline='', encoding='utf-8') as f:
+            for rows, row in enumerate(csv.reader(f), start=1):
+                if rows > self._count:
+                    continue # leftover of a crashed append, possibly cut off mid-row
+                label, source = row
+                labels.append(label_index[label])
+                self.sources.append(source)
+        self._index_tail = rows > self._count # leftover rows from a crashed append
+        self.labels = np.array(labels, dtype=np.int32)
+        self._source_set = None
+        self._map()
+
+    @classmethod
+    def create(cls, path: str, dtype='float32', sequence_shape=(20, 146)) -> 'PackedDataset':
+        if os.path.exists(os.path.join(path, META_FILE)):
+            raise FileExistsError(f"Packed dataset already exists: {path}")
+        if np.dtype(dtype) not in (np.dtype(np.float32), np.dtype(np.float16)):
+            raise ValueError(f"Unsupported dtype {dtype}, use float32 or float16")
+        os.makedirs(path, exist_ok=True)
+        open(os.path.join(path, SEQUENCES_FILE), 'wb').close()
+        open(os.path.join(path, INDEX_FILE), 'w').close()
+        cls._write_meta(path, np.dtype(dtype).name, list(sequence_shape), [], 0)
+        return cls(path)
+
+    @classmethod
+    def open_or_create(cls, path: str, dtype='float32', sequence_shape=(20, 146)) -> 'PackedDataset':
+        if os.path.exists(os.path.join(path, META_FILE)):
+            return cls(path)
+        return cls.create(path, dtype, sequence_shape)
+
+    @staticmethod
+    def _write_meta(path, dtype, sequence_shape, labels, count):
+        tmp_path = os.path.join(path, META_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'dtype': dtype, 'sequence_shape': sequence_shape, 'labels': labels, 'count': count}, f, indent=2)
+        os.replace(tmp_path, os.path.join(path, META_FILE))
+
+    def _map(self):
+        # read-only memmap, nothing is loaded until sliced
+        if self._count == 0:
+            self.sequences = np.zeros((0, *self.sequence_shape), dtype=self.dtype)
+        else:
+            self.sequences = np.memmap(os.path.join(self.path, SEQUENCES_FILE), dtype=self.dtype, mode='r',
+                                       shape=(self._count, *self.sequence_shape))
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, idx):
+        return self.sequences[idx]
+
+    @property
+    def frame_bytes(self) -> int:
+        return int(np.prod(self.sequence_shape)) * self.dtype.itemsize
+
+    def label_of(self, idx: int) -> str:
+        return self.label_names[self.labels[idx]]
+
+    def indices(self, label: str) -> np.ndarray:
+        if label not in self.label_names:
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(self.labels == self.label_names.index(label))
+
+    def has_source(self, source: str) -> bool:
+        if self._source_set is None:
+            self._source_set = set(self.sources)
+        return source in self._source_set
+
+    def counts(self) -> dict[str, int]:
+        bincount = np.bincount(self.labels, minlength=len(self.label_names))
+        return {label: int(n) for label, n in zip(self.label_names, bincount)}
+
+    def append(self, sequences, labels, sources=None):
+        # sequences: (n, 20, 146) or a single (20, 146); labels: one label for all or one per sequence
+        sequences = np.asarray(sequences)
+        if sequences.shape == self.sequence_shape:
+            sequences = sequences[np.newaxis]
+        if sequences.shape[1:] != self.sequence_shape:
+            raise ValueError(f"Sequence shape {sequences.shape[1:]} does not match dataset shape {self.sequence_shape}")
+        n = len(sequences)
+        if n == 0:
+            return
+        labels = [labels] * n if isinstance(labels, str) else list(labels)
+        sources = [''] * n if sources is None else list(sources)
+        if len(labels) != n or len(sources) != n:
+            raise ValueError(f"Got {n} sequence/s, {len(labels)} label/s and {len(sources)} source/s")
+
+        for label in labels:
+            if label not in self.label_names:
+                self.label_names.append(label)
+        label_index = {label: idx for idx, label in enumerate(self.label_names)}
+
+        # drop whatever a crashed append may have left after the last committed row
+        self.sequences = np.zeros((0, *self.sequence_shape), dtype=self.dtype) # release the memmap before resizing
+        with open(os.path.join(self.path, SEQUENCES_FILE), 'r+b') as f:
+            f.truncate(self._count * self.frame_bytes)
+            f.seek(0, os.SEEK_END)
+            f.write(np.ascontiguousarray(sequences, dtype=self.dtype).tobytes())
+
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if self._index_tail:
+            with open(index_path, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerows((self.label_names[l], s) for l, s in zip(self.labels, self.sources))
+            self._index_tail = False
+        with open(index_path, 'a', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(zip(labels, sources))
+
+        self._count += n
+        self._write_meta(self.path, self.dtype.name, list(self.sequence_shape), self.label_names, self._count)
+
+        self.labels = np.concatenate([self.labels, np.array([label_index[l] for l in labels], dtype=np.int32)])
+        self.sources.extend(sources)
+        if self._source_set is not None:
+            self._source_set.update(sources)
+        self._map()
+
+
+def scan_label_dirs(data_dir: str, include_flipped: bool = True) -> list[tuple[str, str]]:
+    # (file path, label) for data/landmark_sequences/<label>/*.npy|*.npz, label = folder name like NumpyFileProcs / the notebook
+    items = []
+    for label in sorted(os.listdir(data_dir)):
+        label_dir = os.path.join(data_dir, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for file in sorted(os.listdir(label_dir)):
+            if file.endswith(SOURCE_EXTENSIONS) and (include_flipped or not file.endswith(('_flipped.npy', '_flipped.npz'))):
+                items.append((os.path.join(label_dir, file), label))
+    return items
+
+
+def import_directory(data_dir: str, packed_path: str, dtype='float32', include_flipped: bool = True,
+                     chunk_size: int = 1024, workers: int = 8) -> PackedDataset:
+    # packs data/landmark_sequences into packed_path, files already in the index are skipped so it can be rerun
+    # raw .npz files are packed as their schema 1 features (cached in data/feature_cache like evaluate.py)
+    from sequence_store import FeatureCache
+
+    start = time.time()
+    feature_cache = FeatureCache(data_dir, schema=1)
+    dataset = PackedDataset.open_or_create(packed_path, dtype)
+    items = [(path, label) for path, label in scan_label_dirs(data_dir, include_flipped) if not dataset.has_source(path)]
+
+    skipped = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for offset in range(0, len(items), chunk_size):
+            chunk = items[offset:offset + chunk_size]
+            sequences, labels, sources = [], [], []
+            for (path, label), sequence in zip(chunk, pool.map(feature_cache.load, [p for p, _ in chunk])):
+                if sequence.shape != dataset.sequence_shape:
+                    skipped += 1
+                    continue
+                sequences.append(sequence)
+                labels.append(label)
+                sources.append(path)
+            if sequences:
+                dataset.append(np.stack(sequences), labels, sources)
+
+    out_text = f"Packed {len(items) - skipped} new sequence/s ({len(dataset)} total, {skipped} skipped for shape) in {time.time() - start:.2f} second/s."
+    print("-" * (len(out_text) + 4))
+    print(f"| {out_text} |")
+    print("-" * (len(out_text) + 4))
+    return dataset
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pack data/landmark_sequences into one memory-mapped dataset")
+    parser.add_argument('--data', default=os.path.join("data", "landmark_sequences"))
+    parser.add_argument('--out', default=os.path.join("data", "packed"))
+    parser.add_argument('--float16', action='store_true', help="store as float16 (half the size), new datasets only")
+    parser.add_argument('--skip-flipped', action='store_true', help="don't pack *_flipped.npy / .npz augmentation outputs")
+    args = parser.parse_args()
+
+    packed = import_directory(args.data, args.out, 'float16' if args.float16 else 'float32', include_flipped=not args.skip_flipped)
+    print("===== PACKED LABELS =====")
+    for label, count in packed.counts().items():
+        print(f"\"{label}\": {count}")
+    print("===== END =====")
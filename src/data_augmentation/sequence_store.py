@@ -0,0 +1,164 @@
+import os
+import tempfile
+
+import numpy as np
+from features import HAND_FEATURES, batch_hand_features
+
+# raw landmark sequences and versioned features derived from them
+#
+# <label>/<name>.npz   what data collection stores (RAW_VERSION 1):
+#   landmarks   (T, 2, 21, 3) float32  normalized MediaPipe landmarks, slots sorted by label like
+#                                      Hands.extract_all_hand_features (a lone right hand is in slot 0)
+#   handedness  (T, 2) uint8           per slot: 0 = no hand, 1 = Left, 2 = Right
+#   mirrored    () uint8               1 = a generated _flipped file (mirror_raw), optional, 0 when missing
+# <label>/<name>.npy   older recordings, (T, 146) features of schema 1. the landmarks and handedness
+#                      can be recovered from them (features_to_raw), so every schema works on them too
+#
+# mirrored files follow HandMirror's _flipped.npy convention, so old and new flipped files train the same:
+# the two slots are swapped (a lone hand in slot 0 moves to slot 1) and schema 1 negates the palm normal's z
+# of mirrored sequences (HandMirror negates normal x and z, recomputing the normal from mirrored landmarks
+# only negates x; pitch, yaw and the finger angles already match)
+#
+# FEATURE_SCHEMAS maps a schema version to the function deriving per-frame features from the raw arrays.
+# changing the features = adding a version, never editing an existing one; derived features are cached
+# in <cache>/v<version>/<label>/<name>.npy and recomputed when the source file is newer than the cache
+#
+# data_collection_src/ and inference/sequence_store.py are copies of this file (only the features import differs)
+
+RAW_EXTENSION = '.npz'
+FEATURE_EXTENSION = '.npy'
+RAW_VERSION = 1
+HANDEDNESS = {'Left': 1, 'Right': 2}
+GENERATED_SUFFIX = '_flipped'
+NORMAL_Z = 65 # in a hand block of schema 1
+
+
+def features_v1(landmarks: np.ndarray, handedness: np.ndarray, mirrored: bool = False) -> np.ndarray:
+    # (T, 2, 21, 3), (T, 2) -> (T, 146): 63 landmarks, normal, pitch / yaw, 5 finger angles per hand
+    features = batch_hand_features(landmarks.astype(np.float64), handedness == HANDEDNESS['Left'], handedness > 0,
+                                   dtype=np.float32)
+    if mirrored: # HandMirror's convention, see above (missing hands stay all zeros)
+        features[..., [NORMAL_Z, HAND_FEATURES + NORMAL_Z]] *= -1
+    return features
+
+
+FEATURE_SCHEMAS = {
+    1: features_v1,
+}
+CURRENT_SCHEMA = max(FEATURE_SCHEMAS)
+
+
+def save_raw_sequence(file, landmarks: np.ndarray, handedness: np.ndarray, mirrored: bool = False):
+    # file: an open binary file, or a path ending with RAW_EXTENSION (np.savez adds it otherwise)
+    np.savez(file, version=RAW_VERSION, landmarks=np.asarray(landmarks, dtype=np.float32),
+             handedness=np.asarray(handedness, dtype=np.uint8), mirrored=np.uint8(mirrored))
+
+
+def load_raw_sequence(path: str) -> tuple[np.ndarray, np.ndarray, bool]:
+    # (landmarks (T, 2, 21, 3), handedness (T, 2), mirrored) of a raw .npz or a legacy .npy feature file
+    if path.endswith(FEATURE_EXTENSION):
+        return features_to_raw(np.load(path), os.path.splitext(path)[0].endswith(GENERATED_SUFFIX))
+    with np.load(path) as data:
+        if int(data['version']) != RAW_VERSION:
+            raise ValueError(f"Unsupported raw sequence version {int(data['version'])}: {path}")
+        mirrored = bool(data['mirrored']) if 'mirrored' in data.files else False
+        return data['landmarks'], data['handedness'], mirrored
+
+
+def features_to_raw(features: np.ndarray, mirrored: bool = False) -> tuple[np.ndarray, np.ndarray, bool]:
+    # schema 1 features -> raw arrays. a slot is present when its block isn't all zeros, Left / Right
+    # comes from the stored palm normal, which schema 1 flips for left hands (and HandMirror's z for mirrored ones)
+    hands = np.asarray(features).reshape(*features.shape[:-1], 2, HAND_FEATURES)
+    present = np.any(hands != 0, axis=-1)
+    landmarks = hands[..., :63].reshape(*hands.shape[:-1], 21, 3)
+    normals = hands[..., 63:66] * ([1, 1, -1] if mirrored else [1, 1, 1])
+    cross = np.cross(landmarks[..., 5, :] - landmarks[..., 0, :], landmarks[..., 17, :] - landmarks[..., 0, :])
+    is_left = np.einsum('...i,...i->...', cross, normals) < 0
+    handedness = np.where(present, np.where(is_left, HANDEDNESS['Left'], HANDEDNESS['Right']), 0).astype(np.uint8)
+    return landmarks.astype(np.float32), handedness, mirrored
+
+
+def mirror_raw(landmarks: np.ndarray, handedness: np.ndarray, mirrored: bool = False) -> tuple[np.ndarray, np.ndarray, bool]:
+    # x -> 1 - x, Left <-> Right, slots swapped; the raw counterpart of HandMirror (mirroring twice = the input)
+    present = handedness > 0
+    flipped = landmarks.copy()
+    flipped[..., 0] = np.where(present[..., None], 1.0 - landmarks[..., 0], 0.0)
+    swapped = np.where(present, 3 - handedness.astype(np.int16), 0).astype(np.uint8)
+    return flipped[..., ::-1, :, :].copy(), swapped[..., ::-1].copy(), not mirrored
+
+
+def derive_features(landmarks: np.ndarray, handedness: np.ndarray, mirrored: bool = False,
+                    schema: int = CURRENT_SCHEMA) -> np.ndarray:
+    if schema not in FEATURE_SCHEMAS:
+        raise ValueError(f"Unknown feature schema {schema}, known: {sorted(FEATURE_SCHEMAS)}")
+    return FEATURE_SCHEMAS[schema](landmarks, handedness, mirrored)
+
+
+class FeatureCache:
+    def __init__(self, data_dir: str, cache_dir: str | None = None, schema: int = CURRENT_SCHEMA):
+        # the cache sits next to the data folder (data/feature_cache), never inside it
+        if schema not in FEATURE_SCHEMAS:
+            raise ValueError(f"Unknown feature schema {schema}, known: {sorted(FEATURE_SCHEMAS)}")
+        self.data_dir = data_dir
+        self.schema = schema
+        cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(data_dir)), 'feature_cache')
+        self.cache_dir = os.path.join(cache_dir, f"v{schema}")
+        self.hits = 0
+        self.misses = 0
+
+    def cache_path(self, path: str) -> str:
+        rel_path = os.path.splitext(os.path.relpath(path, self.data_dir))[0]
+        return os.path.join(self.cache_dir, rel_path + FEATURE_EXTENSION)
+
+    def load(self, path: str) -> np.ndarray:
+        # (T, features) of the cache's schema for a raw .npz or legacy .npy sequence
+        if path.endswith(FEATURE_EXTENSION) and self.schema == 1:
+            return np.load(path) # already schema 1 features
+        cache_path = self.cache_path(path)
+        try:
+            if os.path.getmtime(cache_path) >= os.path.getmtime(path):
+                self.hits += 1
+                return np.load(cache_path)
+        except OSError:
+            pass # not cached yet
+
+        self.misses += 1
+        features = derive_features(*load_raw_sequence(path), schema=self.schema)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # unique temp file per call: tf.data / ThreadPoolExecutor threads of one process can derive
+        # the same file at once, each one renames its own complete copy
+        fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=os.path.dirname(cache_path))
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, features)
+        os.replace(tmp_path, cache_path)
+        return features
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from manifest import DatasetManifest
+
+    parser = argparse.ArgumentParser(description="Derive (and cache) features of every sequence for a feature schema")
+    parser.add_argument('--data', default=os.path.join("data", "landmark_sequences"))
+    parser.add_argument('--cache', default=None, help="cache folder (default: feature_cache next to --data)")
+    parser.add_argument('--schema', type=int, default=CURRENT_SCHEMA, help=f"feature schema version {sorted(FEATURE_SCHEMAS)}")
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    start = time.time()
+    manifest = DatasetManifest(args.data)
+    manifest.check()
+    paths = manifest.paths()
+    cache = FeatureCache(args.data, args.cache, args.schema)
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for _ in pool.map(cache.load, paths):
+            pass
+
+    out_text = (f"Schema {args.schema}: {len(paths)} sequence/s ({cache.misses} derived, {cache.hits} cached) "
+                f"in {time.time() - start:.2f} second/s => {cache.cache_dir}")
+    print("-" * (len(out_text) + 4))
+    print(f"| {out_text} |")
+    print("-" * (len(out_text) + 4))
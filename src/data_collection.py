@@ -1,21 +1,34 @@
 import os
 os.environ['TF_ENABLE_ONEDNN_OPTS'] = '0'
 
+import argparse
 import cv2
 import logging
+import time
 from data_collection_src.camera import Camera
 from data_collection_src.hands import Hands
 from data_collection_src.sequence import Sequence
-from data_collection_src.procs import UIProcess, FileProcs
-
-# 's' to record sequence
-# 'q' to quit
+from data_collection_src.procs import UIProcess, FileProcs, LabelSession, SequenceWriter
+from data_collection_src.metrics import PerfMonitor
+from data_collection_src.landmark_log import LandmarkLogWriter, export_sequences
+
+# 's' to record sequence (asks for a label once, then keeps using it)
+# 'l' to change the label, '[' / ']' for the previous / next preset label
+# 'a' to toggle back-to-back recording (next sequence starts auto_delay seconds after the last)
+# 'Q' to quit
 # '0' to count files
 
 class Main:
     @staticmethod
-    def main():
+    def main(monitor: PerfMonitor | None = None, landmark_log: LandmarkLogWriter | None = None,
+             labels: LabelSession | None = None, auto_delay: float = 1.0, auto: bool = False, store_raw: bool = False):
+        # landmark_log: every processed frame's landmarks are also recorded there, not only the 's' bursts
+        # store_raw: sequences are saved as raw landmarks (.npz, features derived later by sequence_store),
+        # off by default: the training notebook, NumpyFileProcs and the Colab mirroring still read .npy only
         collecting = False
+        next_auto_start: float | None = None
+        monitor = monitor or PerfMonitor()
+        labels = labels or LabelSession()
 
         logging.basicConfig(
             level=logging.INFO,
@@ -23,54 +36,146 @@ class Main:
         )
 
         camera = Camera()
+        camera.monitor = monitor
         hands = Hands()
         frame_sequence = Sequence()
+        sequence_writer = SequenceWriter()
 
         camera.initialize()
         FileProcs.count_dirs()
 
-        while True:
-            ret, frame, image = camera.read_frame()
-            if not ret:
-                continue
-
-            results = hands.hands.process(image)
-
-            if collecting:
-                frame_features = hands.extract_all_hand_features(results, image.shape)
-                frame_sequence.append(frame_features)
-
-                camera.putText(frame, f"Collecting: {len(frame_sequence.sequence)}/{frame_sequence.sequence_length}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (106, 255, 0), 2)
-
-                if frame_sequence.is_full():
-                    collecting = False
-                    label: str|None = UIProcess.prompt_label()
-
-                    if label == None:
-                        logging.info(f"Label null. Sequence not saved.")
-                    elif label == "":
-                        logging.info(f"Label empty. Sequence not saved.")
-                    else:
-                        FileProcs.save_sequence(frame_sequence.get_sequence(), label)
-
-            hands.draw(frame, results)
-            cv2.imshow("demo", frame) # type: ignore
-
-            # to quit, either shift+q or close window
-            # to start collection, shift+s
-
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('s') or key == ord(' '):
-                frame_sequence.reset() # reset every before collection
-                logging.info("Collecting sequence...")
-                collecting = True
-            elif key == ord('0'):
-                FileProcs.count_dirs()
-            elif key == ord('Q') or cv2.getWindowProperty("demo", cv2.WND_PROP_VISIBLE) < 1:
-                break
-
-        camera.release()
-        cv2.destroyAllWindows()
+        def choose_label() -> bool:
+            label = UIProcess.prompt_label(labels.current)
+            if label:
+                labels.set(label)
+                logging.info(f"Current label: {label}")
+            return labels.current is not None
+
+        def start_collecting():
+            frame_sequence.reset() # reset every before collection
+            logging.info(f"Collecting sequence for {labels.current}...")
+
+        # finally: an exception in the loop must still close the writer thread (daemon, queued sequences
+        # would be lost) and flush the landmark log
+        try:
+            while True:
+                ret, frame, image = camera.read_frame()
+                if not ret:
+                    continue
+
+                with monitor.stage('landmarks'):
+                    results = hands.hands.process(image)
+                if landmark_log is not None:
+                    with monitor.stage('log'):
+                        landmark_log.write(results)
+
+                if not collecting and next_auto_start is not None and time.monotonic() >= next_auto_start:
+                    next_auto_start = None
+                    start_collecting()
+                    collecting = True
+
+                if collecting:
+                    with monitor.stage('features'):
+                        if store_raw:
+                            frame_sequence.append(hands.extract_raw_landmarks(results))
+                        else:
+                            frame_sequence.append(hands.extract_all_hand_features(results, image.shape))
+
+                    camera.putText(frame, f"Collecting: {len(frame_sequence.sequence)}/{frame_sequence.sequence_length}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (106, 255, 0), 2)
+
+                    if frame_sequence.is_full():
+                        collecting = False
+                        label = labels.current
+                        sequence = frame_sequence.get_raw_sequence() if store_raw else frame_sequence.get_sequence()
+                        sequence_writer.put(sequence, label) # type: ignore
+                        labels.count_saved(label) # type: ignore
+                        if auto:
+                            next_auto_start = time.monotonic() + auto_delay
+                elif next_auto_start is not None:
+                    camera.putText(frame, f"Next in {max(next_auto_start - time.monotonic(), 0):.1f}s", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 200, 255), 2)
+
+                status = f"Label: {labels.current or '-'} ({labels.saved.get(labels.current, 0)} saved)" # type: ignore
+                status += f" | saving: {sequence_writer.pending}" if sequence_writer.pending else ""
+                status += " | AUTO" if auto else ""
+                camera.putText(frame, status, (10, frame.shape[0] - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2) # type: ignore
+
+                with monitor.stage('render'):
+                    hands.draw(frame, results)
+                    monitor.draw_overlay(frame)
+                    cv2.imshow("demo", frame) # type: ignore
+
+                    # to quit, either shift+q or close window
+                    # to start collection, shift+s
+
+                    key = cv2.waitKey(1) & 0xFF
+                monitor.frame_done()
+                if key == ord('s') or key == ord(' '):
+                    if not collecting and (labels.current is not None or choose_label()):
+                        next_auto_start = None
+                        start_collecting()
+                        collecting = True
+                elif key == ord('l'):
+                    choose_label()
+                elif key == ord('[') or key == ord(']'):
+                    labels.step(-1 if key == ord('[') else 1)
+                    logging.info(f"Current label: {labels.current}")
+                elif key == ord('a'):
+                    auto = not auto
+                    next_auto_start = None
+                    logging.info(f"Back-to-back recording {'on' if auto else 'off'}")
+                elif key == ord('0'):
+                    FileProcs.count_dirs()
+                elif key == ord('Q') or cv2.getWindowProperty("demo", cv2.WND_PROP_VISIBLE) < 1:
+                    break
+        finally:
+            camera.release()
+            cv2.destroyAllWindows()
+            if sequence_writer.pending:
+                logging.info(f"Waiting for {sequence_writer.pending} sequence/s to be saved...")
+            sequence_writer.close()
+            if labels.saved:
+                logging.info("Saved this session: " + ", ".join(f"{label}: {n}" for label, n in labels.saved.items()))
+            if landmark_log is not None:
+                landmark_log.close()
+                logging.info(f"Landmark log: {landmark_log.frames} frame/s in {len(landmark_log.paths)} file/s")
+            monitor.close()
 
 if __name__ == '__main__':
-    Main.main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="ASL landmark sequence collection")
+    parser.add_argument('--perf-overlay', action='store_true', help="show FPS and per-stage latency on screen")
+    parser.add_argument('--perf-json', default=None, help="periodically write per-stage latency / FPS snapshots to this JSON file")
+    parser.add_argument('--perf-interval', type=float, default=5.0, help="seconds between --perf-json snapshots")
+    parser.add_argument('--record-log', default=None, metavar='DIR', help="continuously record every frame's landmarks to .lmlog files in DIR")
+    parser.add_argument('--log-flush-frames', type=int, default=30, help="write the landmark log every this many frames")
+    parser.add_argument('--log-rotate-mb', type=float, default=64.0, help="start a new landmark log file after this many MB")
+    parser.add_argument('--labels', nargs='+', default=None, help="preset labels to switch between with '[' / ']', the first one is selected")
+    parser.add_argument('--auto', action='store_true', help="start with back-to-back recording on ('a' toggles it)")
+    parser.add_argument('--auto-delay', type=float, default=1.0, help="seconds between back-to-back sequences")
+    parser.add_argument('--store-raw', action='store_true', help="save raw landmark .npz files instead of (T, 146) feature .npy files (needs a .npz-aware training pipeline)")
+    parser.add_argument('--export-log', default=None, metavar='LOG', help="no camera: slice a recorded .lmlog file / folder into sequences of --label")
+    parser.add_argument('--label', default=None, help="label for --export-log")
+    parser.add_argument('--export-stride', type=int, default=20, help="frames between exported sequence starts (< 20 overlaps)")
+    parser.add_argument('--export-range', type=int, nargs=2, default=None, metavar=('START', 'END'), help="only export this frame range of the log")
+    args = parser.parse_args()
+
+    if args.export_log:
+        if not args.label:
+            parser.error("--export-log needs --label")
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        start_frame, end_frame = args.export_range or (0, None)
+        export_sequences(args.export_log, args.label, args.export_stride, start_frame=start_frame, end_frame=end_frame,
+                         raw=args.store_raw)
+    else:
+        landmark_log = None
+        if args.record_log:
+            landmark_log = LandmarkLogWriter(args.record_log, flush_frames=args.log_flush_frames,
+                                             rotate_bytes=int(args.log_rotate_mb * 1024 * 1024))
+        if args.labels:
+            label_session = LabelSession(args.labels, args.labels[0])
+        else:
+            # existing label folders as presets, nothing selected until the first 's' / 'l' / ']'
+            data_dir = os.path.join("data", "landmark_sequences")
+            existing = sorted(os.listdir(data_dir)) if os.path.isdir(data_dir) else []
+            label_session = LabelSession([d for d in existing if os.path.isdir(os.path.join(data_dir, d))])
+        Main.main(PerfMonitor(overlay=args.perf_overlay, snapshot_path=args.perf_json, snapshot_interval=args.perf_interval),
+                  landmark_log, label_session, args.auto_delay, args.auto, store_raw=args.store_raw)
\ No newline at end of file
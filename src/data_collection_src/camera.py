@@ -2,6 +2,8 @@ import cv2
 import numpy as np
 from typing import Optional, Tuple, Any
 
+from data_collection_src.metrics import PerfMonitor
+
 class Camera:
     def __init__(self):
         self.cap: Optional[cv2.VideoCapture] = None
@@ -10,6 +12,7 @@ class Camera:
         # self._CAM_H = 720
         self._CAM_W = 768
         self._CAM_H = 432
+        self.monitor: PerfMonitor = PerfMonitor() # disabled unless the app passes its own
 
     def initialize(self):
         self.cap = cv2.VideoCapture(self._IDX)
@@ -22,10 +25,12 @@ class Camera:
         if not self.is_opened or not self.cap:
             return False, None, None
         
-        ret, frame = self.cap.read()
+        with self.monitor.stage('read'):
+            ret, frame = self.cap.read()
         if ret:
-            frame = cv2.flip(frame, 1)
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            with self.monitor.stage('convert'):
+                frame = cv2.flip(frame, 1)
+                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         return ret, frame, image # type: ignore
     
     def release(self):
@@ -0,0 +1,113 @@
+import math
+
+import numpy as np
+
+# vectorized version of Hands._extract_hand_features
+# works on any number of frames at once: (..., hands, 21, 3) -> (..., hands * 73)
+# frame_hand_features is the same for one live frame: at N = 1 the np.cross / einsum setup of the batch
+# kernel costs more than the math, so it only computes the present hands, the palm normal on scalars
+#
+# per hand feature layout (same as Hands._extract_hand_features):
+# - 21 landmarks * 3 = 63
+# - palm normal vector = 3
+# - pitch + yaw = 2
+# - 5 finger angles = 5
+
+HAND_FEATURES = 73
+FRAME_FEATURES = 146
+
+# (a, b, c) landmark triplets, angle is measured at b
+FINGER_JOINTS = np.array([
+    (1, 2, 3),   # Thumb
+    (5, 6, 7),   # Index
+    (9, 10, 11), # Middle
+    (13, 14, 15),# Ring
+    (17, 18, 19) # Pinky
+])
+
+
+def landmarks_to_array(hand_landmarks) -> np.ndarray:
+    # mediapipe NormalizedLandmarkList -> (21, 3) float64
+    return np.fromiter(
+        (v for l in hand_landmarks.landmark for v in (l.x, l.y, l.z)),
+        dtype = np.float64, count = 63
+    ).reshape(21, 3)
+
+
+def batch_hand_features(landmarks, is_left, present=None, dtype=np.float64) -> np.ndarray:
+    """
+    landmarks: (..., H, 21, 3) hand landmarks
+    is_left:   (..., H) or (H,) bool, True where the slot holds a 'Left' hand (flips the palm normal)
+    present:   (..., H) bool, slots set to False come out as all zeros (same as a missing hand)
+
+    returns (..., H * 73), e.g. (N, 2, 21, 3) -> (N, 146) or (2, 21, 3) -> (146,)
+    """
+    lm = np.asarray(landmarks, dtype = np.float64)
+    lead = lm.shape[:-2]
+    out = np.empty(lead + (HAND_FEATURES,), dtype = np.float64)
+
+    out[..., :63] = lm.reshape(lead + (63,))
+
+    # palm normal, flipped for left hands to account for chirality
+    wrist = lm[..., 0, :]
+    normal = np.cross(lm[..., 5, :] - wrist, lm[..., 17, :] - wrist)
+    sign = np.where(np.broadcast_to(is_left, lead), -1.0, 1.0)
+    normal *= sign[..., None]
+    normal /= np.sqrt(np.einsum('...i,...i->...', normal, normal))[..., None] + 1e-6
+    out[..., 63:66] = normal
+
+    # pitch, yaw
+    out[..., 66] = np.degrees(np.arcsin(normal[..., 1]))
+    out[..., 67] = np.degrees(np.arctan2(normal[..., 0], normal[..., 2]))
+
+    # all 5 finger angles in one go
+    b = lm[..., FINGER_JOINTS[:, 1], :]
+    ba = lm[..., FINGER_JOINTS[:, 0], :] - b
+    bc = lm[..., FINGER_JOINTS[:, 2], :] - b
+    norms = np.sqrt(np.einsum('...i,...i->...', ba, ba)) * np.sqrt(np.einsum('...i,...i->...', bc, bc))
+    cos_angle = np.einsum('...i,...i->...', ba, bc) / (norms + 1e-6)
+    out[..., 68:73] = np.degrees(np.arccos(np.clip(cos_angle, -1.0, 1.0)))
+
+    if present is not None:
+        out[~np.broadcast_to(np.asarray(present, dtype = bool), lead)] = 0.0
+
+    return out.reshape(lead[:-1] + (lead[-1] * HAND_FEATURES,)).astype(dtype, copy = False)
+
+
+def frame_hand_features(landmarks, is_left, present) -> np.ndarray:
+    """
+    single frame version of batch_hand_features, same values
+    landmarks: (H, 21, 3), is_left / present: (H,) bool
+
+    returns (H * 73,) float64
+    """
+    out = np.zeros(len(present) * HAND_FEATURES, dtype = np.float64)
+    for slot in range(len(present)):
+        if not present[slot]:
+            continue
+        lm = np.asarray(landmarks[slot], dtype = np.float64)
+        hand = out[slot * HAND_FEATURES:(slot + 1) * HAND_FEATURES]
+        hand[:63] = lm.ravel()
+
+        # palm normal, flipped for left hands to account for chirality
+        (wx, wy, wz), (ax, ay, az), (bx, by, bz) = lm[0].tolist(), lm[5].tolist(), lm[17].tolist()
+        ax, ay, az, bx, by, bz = ax - wx, ay - wy, az - wz, bx - wx, by - wy, bz - wz
+        nx, ny, nz = ay * bz - az * by, az * bx - ax * bz, ax * by - ay * bx
+        if is_left[slot]:
+            nx, ny, nz = -nx, -ny, -nz
+        norm = math.sqrt(nx * nx + ny * ny + nz * nz) + 1e-6
+        nx, ny, nz = nx / norm, ny / norm, nz / norm
+        hand[63:66] = nx, ny, nz
+
+        # pitch, yaw
+        hand[66] = math.degrees(math.asin(ny))
+        hand[67] = math.degrees(math.atan2(nx, nz))
+
+        b = lm[FINGER_JOINTS[:, 1]]
+        ba = lm[FINGER_JOINTS[:, 0]] - b
+        bc = lm[FINGER_JOINTS[:, 2]] - b
+        norms = np.sqrt((ba * ba).sum(axis = 1)) * np.sqrt((bc * bc).sum(axis = 1))
+        cos_angle = (ba * bc).sum(axis = 1) / (norms + 1e-6)
+        hand[68:73] = np.degrees(np.arccos(np.clip(cos_angle, -1.0, 1.0)))
+
+    return out
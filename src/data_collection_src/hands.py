@@ -3,6 +3,9 @@ import cv2
 import numpy as np
 import mediapipe as mp
 
+from data_collection_src.features import frame_hand_features, landmarks_to_array
+from data_collection_src.sequence_store import HANDEDNESS
+
 class Hands:
     def __init__(self):
         self.finger_angles: List[Any] = []
@@ -113,27 +116,44 @@ class Hands:
         return [self._compute_angle(landmarks[a], landmarks[b], landmarks[c]) for a, b, c in indices]
 
     def extract_all_hand_features(self, results, image_shape):
-        frame_vector = []
-
         if not results.multi_hand_landmarks:
             return np.zeros(146, dtype = np.float32)
         
         hands_data = []
         for idx, lm in enumerate(results.multi_hand_landmarks):
-            landmarks = np.array([[l.x, l.y, l.z] for l in lm.landmark])
             label = results.multi_handedness[idx].classification[0].label
-            hands_data.append((label, landmarks))
-
-        sorted_hands_data = sorted(hands_data, key = lambda x: x[0]) # hands data always ordered -> Left, Right
-
-        for label, landmarks in sorted_hands_data:
-            features = self._extract_hand_features(landmarks, label)
-            frame_vector.append(features)
+            hands_data.append((label, lm))
+
+        sorted_hands_data = sorted(hands_data, key = lambda x: x[0])[:2] # hands data always ordered -> Left, Right
+
+        # missing second hand stays as zeros (present = False)
+        landmarks = np.zeros((2, 21, 3), dtype = np.float64)
+        is_left = np.zeros(2, dtype = bool)
+        present = np.zeros(2, dtype = bool)
+        for slot, (label, lm) in enumerate(sorted_hands_data):
+            landmarks[slot] = landmarks_to_array(lm)
+            is_left[slot] = label == 'Left'
+            present[slot] = True
+
+        return frame_hand_features(landmarks, is_left, present)
+
+    def extract_raw_landmarks(self, results):
+        # what collection stores (sequence_store.py): (2, 21, 3) float32 landmarks + (2,) handedness codes,
+        # same slot order as extract_all_hand_features (sorted by label), 0 = no hand
+        landmarks = np.zeros((2, 21, 3), dtype = np.float32)
+        handedness = np.zeros(2, dtype = np.uint8)
+        if not results.multi_hand_landmarks:
+            return landmarks, handedness
 
-        while len(frame_vector) < 2:
-            frame_vector.append(np.zeros_like(frame_vector[0]))
+        hands_data = []
+        for idx, lm in enumerate(results.multi_hand_landmarks):
+            label = results.multi_handedness[idx].classification[0].label
+            hands_data.append((label, lm))
 
-        return np.concatenate(frame_vector)
+        for slot, (label, lm) in enumerate(sorted(hands_data, key = lambda x: x[0])[:2]):
+            landmarks[slot] = landmarks_to_array(lm)
+            handedness[slot] = HANDEDNESS.get(label, 0)
+        return landmarks, handedness
 
     def _extract_hand_features(self, landmarks, hand_label):
         flattened_landmark = landmarks.flatten()
@@ -0,0 +1,260 @@
+import glob
+import logging
+import os
+import struct
+import time
+from types import SimpleNamespace
+from typing import Iterator, Optional
+
+import numpy as np
+
+from data_collection_src.features import batch_hand_features
+from data_collection_src.manifest import DatasetManifest
+from data_collection_src.sequence_store import RAW_EXTENSION, save_raw_sequence
+
+# continuous landmark recording: every frame MediaPipe processed, as fixed-size binary records
+#
+# <dir>/<prefix>_<YYYYmmdd_HHMMSS>_<part>.lmlog
+#   header  16 bytes: b'LMLG', u16 version, u16 record size, f64 creation time (unix)
+#   records RECORD_DTYPE, one per frame, appended in order:
+#     timestamp   f64   time.time() when the frame was processed
+#     frame       u32   frame counter of the recording session (keeps counting across parts)
+#     hands       u8    number of detected hands (0..2)
+#     handedness  2xu8  per MediaPipe output slot: 0 = empty, 1 = Left, 2 = Right
+#     score       2xf32 handedness score
+#     landmarks   2x21x3 f32 normalized landmarks, as MediaPipe returned them
+#
+# records are buffered and written every flush_frames frames (or flush_interval seconds), a new part
+# starts when a file reaches rotate_bytes. records are fixed-size, so a crash can at most leave a partial
+# last record, which the reader ignores. 527 bytes / frame ~ 16 KB/s at 30 fps
+
+MAGIC = b'LMLG'
+VERSION = 1
+HEADER = struct.Struct('<4sHHd')
+EXTENSION = '.lmlog'
+
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('frame', '<u4'),
+    ('hands', 'u1'),
+    ('handedness', 'u1', (2,)),
+    ('score', '<f4', (2,)),
+    ('landmarks', '<f4', (2, 21, 3)),
+])
+HANDEDNESS = {'Left': 1, 'Right': 2}
+HANDEDNESS_LABELS = {1: 'Left', 2: 'Right'}
+
+
+class LandmarkLogWriter:
+    def __init__(self, directory: str, prefix: str = 'session', flush_frames: int = 30, flush_interval: float = 1.0,
+                 rotate_bytes: int = 64 * 1024 * 1024):
+        self.directory = directory
+        self.prefix = prefix
+        self.flush_frames = max(1, flush_frames)
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self._session = time.strftime('%Y%m%d_%H%M%S')
+        self._buffer = np.zeros(self.flush_frames, dtype=RECORD_DTYPE)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._file = None
+        self._file_bytes = 0
+        self.part = 0
+        self.frames = 0
+        self.paths: list[str] = []
+
+    def _open_part(self):
+        self.part += 1
+        path = os.path.join(self.directory, f"{self.prefix}_{self._session}_{self.part:04d}{EXTENSION}")
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD_DTYPE.itemsize, time.time()))
+        self._file_bytes = self._file.tell()
+        self.paths.append(path)
+        logging.info(f"Landmark log: {path}")
+
+    def write(self, results, timestamp: Optional[float] = None):
+        # results: hands.hands.process(image) output (or anything shaped like it)
+        record = self._buffer[self._pending]
+        record['timestamp'] = time.time() if timestamp is None else timestamp
+        record['frame'] = self.frames
+        record['handedness'] = 0
+        record['score'] = 0.0
+        record['landmarks'] = 0.0
+
+        hands = 0
+        if results.multi_hand_landmarks:
+            for idx, lm in enumerate(results.multi_hand_landmarks[:2]):
+                classification = results.multi_handedness[idx].classification[0]
+                record['handedness'][idx] = HANDEDNESS.get(classification.label, 0)
+                record['score'][idx] = getattr(classification, 'score', 0.0)
+                record['landmarks'][idx] = np.fromiter(
+                    (v for pt in lm.landmark for v in (pt.x, pt.y, pt.z)), dtype=np.float32, count=63
+                ).reshape(21, 3)
+                hands += 1
+        record['hands'] = hands
+
+        self._pending += 1
+        self.frames += 1
+        if self._pending == self.flush_frames or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        if self._pending == 0:
+            return
+        if self._file is None or self._file_bytes >= self.rotate_bytes:
+            self.close_part()
+            self._open_part()
+        data = self._buffer[:self._pending].tobytes()
+        self._file.write(data) # type: ignore
+        self._file.flush() # type: ignore
+        self._file_bytes += len(data)
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def close_part(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self.flush()
+        self.close_part()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def log_paths(path: str) -> list[str]:
+    # a .lmlog file, or every .lmlog in a directory in recording order (names sort by session, part)
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, f"*{EXTENSION}")))
+    return [path]
+
+
+def read_records(path: str) -> np.ndarray:
+    # all complete records of one file as a RECORD_DTYPE array (memory-mapped, nothing is copied)
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        magic, version, record_size, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or record_size != RECORD_DTYPE.itemsize:
+        raise ValueError(f"Not a version {VERSION} landmark log: {path}")
+    count = (size - HEADER.size) // RECORD_DTYPE.itemsize # a partial trailing record is ignored
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+
+
+class LandmarkLogReader:
+    def __init__(self, path: str):
+        self.paths = log_paths(path)
+        if not self.paths:
+            raise FileNotFoundError(f"No {EXTENSION} files in {path}")
+
+    def records(self) -> np.ndarray:
+        parts = [read_records(p) for p in self.paths]
+        return np.concatenate(parts) if len(parts) > 1 else np.asarray(parts[0])
+
+    def replay(self) -> Iterator[tuple[float, SimpleNamespace]]:
+        # (timestamp, mediapipe-like results) per recorded frame, for Hands.extract_all_hand_features / draw
+        for path in self.paths:
+            for record in read_records(path):
+                yield float(record['timestamp']), record_to_results(record)
+
+    def features(self) -> np.ndarray:
+        # (frames, 146) float32, same slots as data_collection's Hands (sorted by label)
+        return records_to_features(self.records())
+
+
+def record_to_results(record) -> SimpleNamespace:
+    hands = int(record['hands'])
+    if hands == 0:
+        return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+    multi_hand_landmarks = [
+        SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in record['landmarks'][idx].tolist()])
+        for idx in range(hands)
+    ]
+    multi_handedness = [
+        SimpleNamespace(classification=[SimpleNamespace(label=HANDEDNESS_LABELS.get(int(record['handedness'][idx]), ''),
+                                                        score=float(record['score'][idx]))])
+        for idx in range(hands)
+    ]
+    return SimpleNamespace(multi_hand_landmarks=multi_hand_landmarks, multi_handedness=multi_handedness)
+
+
+def records_to_raw(records: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # (frames, 2, 21, 3) landmarks + (frames, 2) handedness (0 = no hand) in the slots of data_collection's
+    # Hands: sorted by label ('Left' < 'Right'), so a lone right hand goes into slot 0
+    present = np.arange(2) < records['hands'][:, None]
+    handedness = np.where(present, records['handedness'], 0).astype(np.uint8)
+    order = np.argsort(np.where(present, handedness, 255), axis=1, kind='stable')
+    rows = np.arange(len(records))[:, None]
+    return np.asarray(records['landmarks'][rows, order]), handedness[rows, order]
+
+
+def records_to_features(records: np.ndarray) -> np.ndarray:
+    # vectorized data_collection Hands.extract_all_hand_features over every record
+    landmarks, handedness = records_to_raw(records)
+    return batch_hand_features(landmarks.astype(np.float64), handedness == HANDEDNESS['Left'], handedness > 0, dtype=np.float32)
+
+
+def slice_sequences(features: np.ndarray, sequence_length: int = 20, stride: int = 20,
+                    require_hands: bool = True) -> tuple[np.ndarray, np.ndarray]:
+    # (frames, 146) -> start frames (n,) + (n, sequence_length, 146) windows every `stride` frames,
+    # windows with a handless frame are dropped when require_hands
+    if len(features) < sequence_length:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, sequence_length, features.shape[-1]), dtype=features.dtype)
+    windows = np.lib.stride_tricks.sliding_window_view(features, sequence_length, axis=0)[::stride]
+    windows = np.moveaxis(windows, -1, 1) # (n, 146, T) -> (n, T, 146)
+    starts = np.arange(len(windows)) * stride
+    if require_hands:
+        keep = np.any(windows != 0, axis=2).all(axis=1)
+        windows, starts = windows[keep], starts[keep]
+    return starts, np.ascontiguousarray(windows)
+
+
+def export_sequences(log_path: str, label: str, stride: int = 20, output_root: str = os.path.join("data", "landmark_sequences"),
+                     start_frame: int = 0, end_frame: Optional[int] = None, raw: bool = False) -> list[str]:
+    # slices recorded sessions (or the part between start_frame and end_frame, counted over all the log's
+    # files in order) into 20-frame training sequences, <output_root>/<label>/<label>_<log name>_<start frame>.npy
+    # (features) or .npz (raw landmarks, sequence_store.py) when raw, added to the dataset manifest
+    # every file is windowed on its own, a sequence never spans two sessions / parts; start frames count
+    # from the file's first record, so exporting the same range twice overwrites instead of duplicating
+    reader = LandmarkLogReader(log_path)
+    folder = os.path.join(output_root, label)
+    os.makedirs(folder, exist_ok=True)
+    paths = []
+    frames = offset = 0
+    for log_file in reader.paths:
+        file_records = read_records(log_file)
+        first = max(start_frame - offset, 0)
+        last = len(file_records) if end_frame is None else min(max(end_frame - offset, 0), len(file_records))
+        offset += len(file_records)
+        if first >= last:
+            continue
+        records = file_records[first:last]
+        frames += len(records)
+        features = records_to_features(records)
+        starts, windows = slice_sequences(features, stride=stride)
+        if raw:
+            landmarks, handedness = records_to_raw(records)
+
+        log_name = os.path.splitext(os.path.basename(log_file))[0]
+        for start, window in zip(starts, windows):
+            path = os.path.join(folder, f"{label}_{log_name}_{first + int(start):06d}")
+            if raw:
+                path += RAW_EXTENSION
+                save_raw_sequence(path, landmarks[start:start + window.shape[0]], handedness[start:start + window.shape[0]])
+            else:
+                path += ".npy"
+                np.save(path, window)
+            paths.append(path)
+
+    DatasetManifest(output_root).add_many(paths)
+    logging.info(f"Exported {len(paths)} sequence/s from {frames} frame/s of {log_path} => {folder}")
+    return paths
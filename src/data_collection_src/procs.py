@@ -1,47 +1,151 @@
 import os
 import logging
+import queue
+import threading
 import numpy as np
 import tkinter as tk
 from tkinter import simpledialog
 from datetime import datetime
 
+from data_collection_src.manifest import DatasetManifest
+from data_collection_src.sequence_store import RAW_EXTENSION, save_raw_sequence
+
 class UIProcess:
     @staticmethod
-    def prompt_label() -> str|None:
+    def prompt_label(initial: str|None = None) -> str|None:
+        # the hidden root is destroyed on every path, cancelling used to leak it
         root = tk.Tk()
         root.withdraw()
-        label: str|None = simpledialog.askstring(title = "Label Input", prompt = "Enter ASL Label:")
-        if label is None:
-            return None
-        root.destroy()
-        return label
-    
+        try:
+            label: str|None = simpledialog.askstring(title = "Label Input", prompt = "Enter ASL Label:", initialvalue = initial, parent = root)
+        finally:
+            root.destroy()
+        return label.strip() if label is not None else None
+
+class LabelSession:
+    # sticky "current label": chosen once (dialog or preset list), then every captured sequence gets it
+    # until it is switched with the hotkeys
+
+    def __init__(self, presets: list[str]|None = None, current: str|None = None):
+        self.presets: list[str] = list(presets or [])
+        self.current: str|None = current
+        self.saved: dict[str, int] = {} # sequences saved per label in this session
+
+    def set(self, label: str):
+        if label not in self.presets:
+            self.presets.append(label)
+        self.current = label
+
+    def step(self, offset: int):
+        # previous / next preset label
+        if not self.presets:
+            return
+        idx = self.presets.index(self.current) if self.current in self.presets else -1 if offset > 0 else 0
+        self.current = self.presets[(idx + offset) % len(self.presets)]
+
+    def count_saved(self, label: str):
+        self.saved[label] = self.saved.get(label, 0) + 1
+
+class SequenceWriter:
+    # sequences are saved on a background thread, the capture loop only enqueues them
+    # the queue is bounded: if the disk can't keep up, put() blocks instead of piling up memory
+
+    def __init__(self, maxsize: int = 64):
+        self._queue: queue.Queue = queue.Queue(maxsize = maxsize)
+        self._thread = threading.Thread(target = self._worker, name = "sequence-writer", daemon = True)
+        self._thread.start()
+
+    def put(self, sequence, label: str):
+        # raw (landmarks, handedness) tuples are passed through as they are
+        self._queue.put((sequence if isinstance(sequence, tuple) else np.asarray(sequence), label))
+
+    @property
+    def pending(self) -> int:
+        return self._queue.unfinished_tasks
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                FileProcs.save_sequence(*item)
+            except Exception:
+                logging.exception("Saving sequence failed")
+            finally:
+                self._queue.task_done()
+
+    def close(self):
+        # waits until everything queued so far is on disk
+        self._queue.put(None)
+        self._thread.join()
+
 class FileProcs:
+    # per-label file counts come from the dataset manifest (only changed label folders are listed),
+    # then are kept up to date in memory by save_sequence, which also adds every new file to the manifest
+    FOLDER = os.path.join("data", "landmark_sequences")
+    _manifest: DatasetManifest | None = None
+    _label_counts: dict[str, int] | None = None
+    _counts_lock = threading.Lock()
+
+    @staticmethod
+    def _seed_counts() -> dict[str, int]:
+        with FileProcs._counts_lock:
+            if FileProcs._label_counts is None:
+                FileProcs._manifest = DatasetManifest(FileProcs.FOLDER)
+                FileProcs._manifest.check()
+                FileProcs._label_counts = FileProcs._manifest.counts()
+            return FileProcs._label_counts
+
     @staticmethod
     def count_dirs():
-        folder = os.path.join("data", "landmark_sequences")
-        os.makedirs(folder, exist_ok = True)
+        counts = dict(FileProcs._seed_counts())
         print("===== EXISTING LABELS =====")
-        f1: list[str] = os.listdir(folder)
-        if len(f1) < 1:
+        if len(counts) < 1:
             print ("None.")
         else:
-            for label in os.listdir(folder):
-                print(f"\"{label}\": {len([f for f in os.listdir(os.path.join(folder, label)) if os.path.isfile(os.path.join(folder, label, f))])}")
+            for label, count in counts.items():
+                print(f"\"{label}\": {count}")
         print("===== END =====")
 
+    @staticmethod
+    def new_filename(folder, label, extension = ".npy"):
+        # timestamp down to the microsecond (still sorts by time), plus a counter if that name exists
+        now = datetime.now()
+        name = f"{label}_{now.strftime('%Y%m%d%H%M%S')}_{now.microsecond:06d}"
+        filename = os.path.join(folder, f"{name}{extension}")
+        n = 1
+        while os.path.exists(filename):
+            filename = os.path.join(folder, f"{name}_{n}{extension}")
+            n += 1
+        return filename
+
     @staticmethod
     def save_sequence(sequence, label):
-        folder = os.path.join("data", "landmark_sequences", label)
+        # sequence: (T, 146) features -> .npy, or a (landmarks, handedness) tuple of raw arrays -> .npz
+        # written to a temp file and renamed, an interrupted save never leaves a truncated file behind
+        counts = FileProcs._seed_counts()
+        folder = os.path.join(FileProcs.FOLDER, label)
         os.makedirs(folder, exist_ok = True)
-        filename = os.path.join(
-            folder, 
-            f"{label}_{datetime.now().strftime('%Y%m%d%H%M%S')}.npy"
-            )
-        np.save(filename, sequence)
+        raw = isinstance(sequence, tuple)
+        filename = FileProcs.new_filename(folder, label, RAW_EXTENSION if raw else ".npy")
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, 'wb') as f:
+            if raw:
+                save_raw_sequence(f, *sequence)
+            else:
+                np.save(f, sequence)
+            size = f.tell()
+        os.replace(tmp_filename, filename)
+
+        with FileProcs._counts_lock:
+            FileProcs._manifest.add(filename) # type: ignore
+            counts[label] = counts.get(label, 0) + 1
+            count = counts[label]
         logging.info(f"Saved: {label} => {filename}")
-        logging.info(f"Size of {filename}: {os.path.getsize(filename)}")
-        logging.info(f"File count for {folder}: {len([f for f in os.listdir(folder) if os.path.isfile(os.path.join(folder, f))])}")
+        logging.info(f"Size of {filename}: {size}")
+        logging.info(f"File count for {folder}: {count}")
+        return filename
 
 if __name__ == '__main__':
     for i in range(0, 100): print("DO NOT RUN THIS CODE!!! INSTEAD, RUN src/data_collection.py !!!")
\ No newline at end of file
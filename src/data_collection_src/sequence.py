@@ -16,6 +16,10 @@ class Sequence:
     
     def get_sequence(self):
         return np.array(self.sequence)
+
+    def get_raw_sequence(self):
+        # frames appended as (landmarks, handedness) -> ((T, 2, 21, 3), (T, 2))
+        return np.stack([frame[0] for frame in self.sequence]), np.stack([frame[1] for frame in self.sequence])
     
 if __name__ == '__main__':
     for i in range(0, 100): print("DO NOT RUN THIS CODE!!! INSTEAD, RUN src/data_collection.py !!!")
@@ -0,0 +1,198 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from inference.labels import LABELS
+from inference.engine import InterpreterEngine, load_engine_config
+from data_augmentation.packed_dataset import PackedDataset
+from data_collection_src.sequence_store import FeatureCache
+
+# batched evaluation of a .tflite model over data/landmark_sequences/<label>/*.npy|*.npz
+# (raw .npz recordings are turned into features through sequence_store's cache)
+# run from repo root: python src/evaluate.py --model models/asl_model_lstm_quant.tflite
+
+
+class Evaluator:
+    def __init__(self, engine: InterpreterEngine, feature_cache: FeatureCache | None = None):
+        self.labels: list[str] = list(LABELS)
+        self.label_index = {label: idx for idx, label in enumerate(self.labels)}
+
+        self.engine = engine
+        if not self.engine.allocated:
+            self.engine.allocate()
+        self.batch_size = self.engine.batch_size
+        self.sequence_shape = self.engine.input_shape
+
+        self.skipped: dict[str, int] = {}
+        self.feature_cache = feature_cache
+
+    def scan(self, data_dir: str, include_flipped: bool = True) -> list[tuple[str, int]]:
+        # (file path, label index) for every sequence whose folder name is a model label
+        items = []
+        for label in sorted(os.listdir(data_dir)):
+            label_dir = os.path.join(data_dir, label)
+            if not os.path.isdir(label_dir):
+                continue
+            if label not in self.label_index:
+                self.skipped[f"unknown label '{label}'"] = len(os.listdir(label_dir))
+                continue
+            for file in sorted(os.listdir(label_dir)):
+                if not file.endswith(('.npy', '.npz')):
+                    continue
+                if not include_flipped and file.endswith(('_flipped.npy', '_flipped.npz')):
+                    continue
+                items.append((os.path.join(label_dir, file), self.label_index[label]))
+        return items
+
+    def file_batches(self, items, workers: int = 8):
+        # streams (x, y) batches, the next batch is read by the pool while the current one is evaluated
+        chunks = [items[start:start + self.batch_size] for start in range(0, len(items), self.batch_size)]
+        load = self.feature_cache.load if self.feature_cache is not None else np.load
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = [pool.submit(load, path) for path, _ in chunks[0]] if chunks else []
+            for idx, chunk in enumerate(chunks):
+                loading = pending
+                if idx + 1 < len(chunks):
+                    pending = [pool.submit(load, path) for path, _ in chunks[idx + 1]]
+
+                x = np.zeros((self.batch_size, *self.sequence_shape), dtype=np.float32)
+                y = []
+                for (path, label_idx), future in zip(chunk, loading):
+                    sequence = future.result()
+                    if sequence.shape != self.sequence_shape:
+                        key = f"shape {sequence.shape}"
+                        self.skipped[key] = self.skipped.get(key, 0) + 1
+                        continue
+                    x[len(y)] = sequence
+                    y.append(label_idx)
+                yield x, np.array(y, dtype=np.int64)
+
+    def packed_batches(self, dataset: PackedDataset, include_flipped: bool = True):
+        # same (x, y) batches sliced straight out of the memory-mapped packed dataset
+        to_model = np.array([self.label_index.get(label, -1) for label in dataset.label_names], dtype=np.int64)
+        y_all = to_model[dataset.labels] if len(dataset) else np.zeros(0, dtype=np.int64)
+        keep = y_all >= 0
+        for label, n in zip(dataset.label_names, np.bincount(dataset.labels, minlength=len(dataset.label_names))):
+            if label not in self.label_index and n > 0:
+                self.skipped[f"unknown label '{label}'"] = int(n)
+        if not include_flipped:
+            keep &= np.array([not s.endswith(('_flipped.npy', '_flipped.npz')) for s in dataset.sources], dtype=bool)
+        rows = np.flatnonzero(keep)
+
+        for start in range(0, len(rows), self.batch_size):
+            chunk = rows[start:start + self.batch_size]
+            x = np.zeros((self.batch_size, *self.sequence_shape), dtype=np.float32)
+            x[:len(chunk)] = dataset.sequences[chunk]
+            yield x, y_all[chunk]
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        # x is always a full (batch_size, 20, 146) batch, unused rows are zero padding
+        return self.engine.invoke(x)
+
+    def evaluate(self, batches) -> dict:
+        # batches: file_batches(...) or packed_batches(...)
+        n_labels = len(self.labels)
+        confusion = np.zeros((n_labels, n_labels), dtype=np.int64)
+        compute_time = 0.0
+
+        start = time.perf_counter()
+        for x, y in batches:
+            if len(y) == 0:
+                continue
+            t = time.perf_counter()
+            predicted = np.argmax(self.predict(x)[:len(y)], axis=1)
+            compute_time += time.perf_counter() - t
+            confusion += np.bincount(y * n_labels + predicted, minlength=n_labels * n_labels).reshape(n_labels, n_labels)
+        elapsed = time.perf_counter() - start
+
+        total = int(confusion.sum())
+        return {
+            'samples': total,
+            'accuracy': float(np.trace(confusion) / max(total, 1)),
+            'labels': self.labels,
+            'confusion_matrix': confusion.tolist(), # rows = true label, columns = predicted label
+            'elapsed_s': elapsed,
+            'samples_per_s': total / max(elapsed, 1e-9),
+            'compute_samples_per_s': total / max(compute_time, 1e-9),
+            'batch_size': self.batch_size,
+            'skipped': dict(self.skipped),
+        }
+
+
+def print_report(report: dict):
+    confusion = np.array(report['confusion_matrix'])
+    labels = report['labels']
+
+    print("===== PER LABEL =====")
+    for idx, label in enumerate(labels):
+        n = confusion[idx].sum()
+        if n == 0:
+            continue
+        row = confusion[idx].copy()
+        correct = row[idx]
+        row[idx] = 0
+        confused = f", mostly confused with \"{labels[int(np.argmax(row))]}\" ({row.max()})" if row.max() > 0 else ""
+        print(f"\"{label}\": {correct}/{n} ({correct / n * 100:.1f}%){confused}")
+
+    print("===== CONFUSION MATRIX (rows = true, cols = predicted) =====")
+    width = max(4, max(len(label) for label in labels) + 1)
+    print(" " * width + "".join(f"{label:>{width}}" for label in labels))
+    for idx, label in enumerate(labels):
+        print(f"{label:>{width}}" + "".join(f"{v:>{width}}" for v in confusion[idx]))
+
+    for reason, count in report['skipped'].items():
+        print(f"Skipped {count} file/s: {reason}")
+
+    out_text = (f"Accuracy {report['accuracy'] * 100:.2f}% on {report['samples']} sequences in {report['elapsed_s']:.2f} second/s "
+                f"({report['samples_per_s']:.0f} samples/s, {report['compute_samples_per_s']:.0f} samples/s model only, batch {report['batch_size']})")
+    print("-" * (len(out_text) + 4))
+    print(f"| {out_text} |")
+    print("-" * (len(out_text) + 4))
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Evaluate a .tflite model on the collected landmark sequences")
+    parser.add_argument('--config', default=None, help="JSON engine config (model_path, num_threads, xnnpack, warmup)")
+    parser.add_argument('--model', default=None, help="overrides model_path")
+    parser.add_argument('--data', default=os.path.join("data", "landmark_sequences"))
+    parser.add_argument('--packed', default=None, help="read a packed dataset (data_augmentation/packed_dataset.py) instead of --data")
+    parser.add_argument('--batch-size', type=int, default=512)
+    parser.add_argument('--threads', type=int, default=None, help="interpreter threads, overrides num_threads")
+    parser.add_argument('--xnnpack', choices=['on', 'off'], default=None, help="overrides xnnpack")
+    parser.add_argument('--workers', type=int, default=8, help="parallel file readers")
+    parser.add_argument('--skip-flipped', action='store_true', help="ignore *_flipped.npy / .npz augmentation outputs")
+    parser.add_argument('--feature-schema', type=int, default=None, help="feature schema the model was trained on (default: current)")
+    parser.add_argument('--output', default=None, help="write the full report (incl. confusion matrix) as JSON")
+    args = parser.parse_args()
+
+    engine_config = load_engine_config(
+        args.config, model_path=args.model, num_threads=args.threads,
+        xnnpack=None if args.xnnpack is None else args.xnnpack == 'on'
+    )
+    engine = InterpreterEngine.from_config(engine_config, batch_size=args.batch_size)
+    logging.info(f"Model: {engine.describe()}")
+
+    feature_cache = FeatureCache(args.data) if args.feature_schema is None else FeatureCache(args.data, schema=args.feature_schema)
+    evaluator = Evaluator(engine, feature_cache)
+    if args.packed:
+        batches = evaluator.packed_batches(PackedDataset(args.packed), include_flipped=not args.skip_flipped)
+    else:
+        batches = evaluator.file_batches(evaluator.scan(args.data, include_flipped=not args.skip_flipped), args.workers)
+    report = evaluator.evaluate(batches)
+    print_report(report)
+    logging.info(engine.latency.format(f"batch invoke latency (batch {engine.batch_size})"))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logging.info(f"Report saved: {args.output}")
@@ -1,115 +1,195 @@
+import argparse
 import cv2
 import numpy as np
-import tensorflow as tf
-from collections import deque, Counter
 from typing import Any
 import logging
+import time
 
 from inference.camera import Camera
 from inference.hands import Hands
-from inference.sequence import Sequence
+from inference.labels import LABELS
+from inference.engine import InterpreterEngine, load_engine_config
+from inference.metrics import PerfMonitor
+from inference.roi import RoiTracker
+from inference.motion_gate import MotionGate
+from inference.classifier_cache import ClassifierCache
+from inference.stream_state import StreamState
+from inference.pipeline import InferencePipeline
+from inference.streams import MultiStreamRecognizer
+from inference.batching import MicroBatcher
+from inference.offline import VideoFileSource, PredictionWriter, SEQUENCE_EXTENSIONS, expand_inputs, load_landmark_sequence
 
 #make a model with only 20 sequences per npy, not 30
 #for faster inference, more static gestures friendly
 
 
 class Inference:
-    def __init__(self):
-        self.interpreter: tf.lite.Interpreter = tf.lite.Interpreter(model_path='./models/asl_model_lstm_quant.tflite')
-        # self.interpreter: tf.lite.Interpreter = tf.lite.Interpreter(model_path='./models/asl_model_lstm_quant.tflite')
-        self.labels: list[str] = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'hello', 'i', 'iloveyou', 'j', 'k', 'l', 'm', 'n', 'no', 'o', 'p', 'please', 'q', 'r', 's', 'sorry', 't', 'thankyou', 'u', 'v', 'w', 'x', 'y', 'yes', 'z']
-        # Found 34 labels: ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'hello', 'i', 'iloveyou', 'j', 'k', 'l', 'm', 'n', 'no', 'o', 'p', 'please', 'q', 'r', 's', 'sorry', 't', 'thankyou', 'u', 'urwelc', 'v', 'w', 'x', 'y', 'yes', 'z']
+    def __init__(self, engine: InterpreterEngine | None = None, monitor: PerfMonitor | None = None):
+        self.engine: InterpreterEngine = engine or InterpreterEngine.from_config(load_engine_config())
+        self.monitor: PerfMonitor = monitor or PerfMonitor()
+        self.labels: list[str] = list(LABELS)
         self.camera: Camera = Camera()
+        self.camera.monitor = self.monitor
         self.hands: Hands = Hands()
-        self.sequence: Sequence = Sequence()
-
+        self.roi: RoiTracker | None = None # set to crop MediaPipe's input around the last detected hands
+        self.motion_gate: MotionGate | None = None # set to skip MediaPipe on frames that barely changed
+        self._last_hands: tuple[Any, Any] = (None, None)
+        self.STRIDE = 4 # predict every STRIDE hand frames over the latest 20
         self.SM_WND = 2
         self.AC_THR = 1
-        self.output_buffer = deque(maxlen=self.SM_WND)
-        self.prediction_buffer = deque(maxlen=self.AC_THR)
-        self.last_confirmed_label = "Idle"
+        # sequence window / smoothing / agreement, the same StreamState the multi-stream and server paths use
+        self.state: StreamState = StreamState("camera", stride=self.STRIDE, smoothing_window=self.SM_WND,
+                                              agreement=self.AC_THR, labels=self.labels)
 
         logging.basicConfig(
             level=logging.INFO,
             format='%(asctime)s - %(levelname)s - %(message)s'
         )
         
-    def main(self):
-        self.interpreter.allocate_tensors()
+    def prepare(self):
+        if not self.engine.allocated:
+            self.engine.allocate() # input: [1, 20, 146], output: [1, 33]
+
+    @property
+    def classifier_cache(self) -> ClassifierCache | None:
+        # set to reuse outputs for unchanged / repeated windows, restarted whenever the hand is lost
+        return self.state.classifier_cache
+
+    @classifier_cache.setter
+    def classifier_cache(self, cache: ClassifierCache | None):
+        self.state.classifier_cache = cache
+
+    @property
+    def last_confirmed_label(self) -> str:
+        return self.state.last_confirmed_label
+
+    def detect(self, image):
+        # hands.process on the full frame, or on the hand ROI when enabled
+        if self.roi is not None:
+            return self.roi.process(image)
+        return self.hands.hands.process(image)
+
+    def find_hands(self, image):
+        # detect + extract_all_hand_features -> (results, frame_features), frame_features = None when no hand
+        # with the motion gate on, static frames reuse the previous results / features instead
+        if self.motion_gate is not None and not self.motion_gate.should_detect(image):
+            return self._last_hands
 
-        input_details = self.interpreter.get_input_details()   # Shape: [1, 30, 146]
-        output_details = self.interpreter.get_output_details() # Shape: [1, 43]
+        with self.monitor.stage('landmarks'):
+            results = self.detect(image)
+        frame_features = None
+        if results.multi_hand_landmarks is not None:
+            with self.monitor.stage('features'):
+                frame_features = self.hands.extract_all_hand_features(results, image.shape)
+
+        self._last_hands = (results, frame_features)
+        return self._last_hands
+
+    def update(self, frame_features):
+        # frame_features = None when no hand is present
+        # returns the raw model output when the classifier ran on this frame, else None
+        window = self.state.push(frame_features) # (1, 20, 146) view, no copy
+        if window is None:
+            return None
+        classifier = self.classifier_cache if self.classifier_cache is not None else self.engine
+        output = classifier.invoke(window)[0]
+        self.state.apply(output)
+        return output
+
+    def draw(self, frame, results):
+        if results.multi_hand_landmarks is not None:
+            for hand_landmarks in results.multi_hand_landmarks:
+                lm = np.array([[pt.x, pt.y] for pt in hand_landmarks.landmark])
+                h, w, _ = frame.shape # type: ignore
+                lm_px = (lm * [w, h]).astype(int)
+                x1, y1 = np.min(lm_px, axis=0)
+                x2, y2 = np.max(lm_px, axis=0)
 
+                cv2.rectangle(frame, (x1-10, y1-10), (x2+10, y2+10), (0, 255, 0), 2) # type: ignore
+                label_txt = f"{self.last_confirmed_label}"
+                if self.last_confirmed_label != "Idle":
+                    confidence = np.max(self.state.smoothed_out)
+                    label_txt += f" ({confidence * 100:.1f}%)"
+                self.put_text_with_background(frame, label_txt, (x1, y1 - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), (0, 255, 0), 2) # type: ignore
+        else:
+            cv2.putText(frame, "Idle", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (200, 200, 200), 2) # type: ignore
+
+    def main(self):
+        self.prepare()
         self.camera.initialize()
-        
-        smoothed_out: Any = 0
 
         while True:
             ret, frame, image = self.camera.read_frame()
             if not ret:
                 break
 
-            results = self.hands.hands.process(image)
-            hand_present = results.multi_hand_landmarks is not None
-            draw_boundbox = False
+            # if u want to draw landmarks on hands: # self.hands.draw(frame, results)
+            results, frame_features = self.find_hands(image)
+            with self.monitor.stage('classify'):
+                self.update(frame_features)
 
-            if hand_present:
-                draw_boundbox = True
-                # if u want to draw landmarks on hands: # self.hands.draw(frame, results)
-                frame_features = self.hands.extract_all_hand_features(results, image.shape)
-                self.sequence.append(frame_features)
-
-                if self.sequence.is_full():
-                    input_seq = np.expand_dims(self.sequence.get_sequence(), axis=0).astype(np.float32)
-                    self.interpreter.set_tensor(input_details[0]['index'], input_seq)
-                    self.interpreter.invoke()
-                    output = self.interpreter.get_tensor(output_details[0]['index'])[0]
-
-                    self.output_buffer.append(output)
-                    smoothed_out = np.mean(self.output_buffer, axis=0)
-                    prediction_index = int(np.argmax(smoothed_out))
-                    self.prediction_buffer.append(prediction_index)
-                                        
-                    if len(self.prediction_buffer) == self.AC_THR:
-                        most_common, freq = Counter(self.prediction_buffer).most_common(1)[0]
-                        if freq >= self.AC_THR:
-                            self.last_confirmed_label = self.labels[most_common]
-                        self.prediction_buffer.clear()
-
-                    self.sequence.reset()
-                
-            else:
-                self.sequence.reset()
-                self.output_buffer.clear()
-                self.prediction_buffer.clear()
-                self.last_confirmed_label = "Idle"
-
-            if draw_boundbox and hand_present:
-                for hand_landmarks in results.multi_hand_landmarks:
-                    lm = np.array([[pt.x, pt.y] for pt in hand_landmarks.landmark])
-                    h, w, _ = frame.shape # type: ignore
-                    lm_px = (lm * [w, h]).astype(int)
-                    x1, y1 = np.min(lm_px, axis=0)
-                    x2, y2 = np.max(lm_px, axis=0)
-
-                    cv2.rectangle(frame, (x1-10, y1-10), (x2+10, y2+10), (0, 255, 0), 2) # type: ignore
-                    label_txt = f"{self.last_confirmed_label}"
-                    if self.last_confirmed_label != "Idle":
-                        confidence = np.max(smoothed_out)
-                        label_txt += f" ({confidence * 100:.1f}%)"
-                    self.put_text_with_background(frame, label_txt, (x1, y1 - 15), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 0), (0, 255, 0), 2) # type: ignore
-            else:
-                cv2.putText(frame, "Idle", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (200, 200, 200), 2) # type: ignore
-
-            cv2.imshow("inference", frame) # type: ignore
-
-            key = cv2.waitKey(1) & 0xFF
+            with self.monitor.stage('render'):
+                self.draw(frame, results)
+                self.monitor.draw_overlay(frame)
+                cv2.imshow("inference", frame) # type: ignore
+
+                key = cv2.waitKey(1) & 0xFF
+            self.monitor.frame_done()
             if key == ord('Q') or cv2.getWindowProperty("inference", cv2.WND_PROP_VISIBLE) < 1:
                 break
 
         self.camera.release()
+        self.monitor.close()
         cv2.destroyAllWindows()
 
+    def main_offline(self, inputs, output_path, flip=True):
+        # headless: video files / .npy or raw .npz landmark sequences -> per-frame predictions (JSONL or CSV), no camera or GUI
+        self.prepare()
+
+        frames = 0
+        start = time.perf_counter()
+        with PredictionWriter(output_path) as writer:
+            for path in expand_inputs(inputs):
+                self.update(None) # every input starts from a clean state
+                logging.info(f"Processing {path}")
+
+                if path.lower().endswith(SEQUENCE_EXTENSIONS):
+                    for idx, frame_features in enumerate(load_landmark_sequence(path)):
+                        hand_present = bool(np.any(frame_features))
+                        output = self.update(frame_features if hand_present else None)
+                        writer.write(self.prediction_record(path, idx, hand_present, output))
+                        frames += 1
+                    continue
+
+                # released even when reading or classifying the video fails
+                with VideoFileSource(path, flip) as source:
+                    if self.roi is not None:
+                        self.roi.reset()
+                    if self.motion_gate is not None:
+                        self.motion_gate.reset()
+                    idx = 0
+                    while True:
+                        ret, frame, image = source.read_frame()
+                        if not ret:
+                            break
+
+                        results, frame_features = self.find_hands(image)
+                        hand_present = frame_features is not None
+                        output = self.update(frame_features)
+                        writer.write(self.prediction_record(path, idx, hand_present, output))
+                        idx += 1
+                    frames += idx
+
+        elapsed = time.perf_counter() - start
+        logging.info(f"{frames} frames in {elapsed:.2f} second/s ({frames / max(elapsed, 1e-9):.1f} frames/s) => {output_path}")
+
+    def prediction_record(self, source, frame_idx, hand_present, output):
+        return self.state.record(frame_idx, hand_present, output, source)
+
+    def main_threaded(self):
+        # capture / landmarks / classify run on worker threads, rendering stays on the main thread
+        InferencePipeline(self).run()
+
     def put_text_with_background(self, img, text, org, font=cv2.FONT_HERSHEY_SIMPLEX,
                              font_scale=0.0, text_color=(0, 0, 0),
                              bg_color=(0, 0, 0), thickness=0):
@@ -124,6 +204,87 @@ class Inference:
         cv2.putText(img, text, org, font, font_scale, text_color, thickness) # type: ignore
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="ASL inference")
+    parser.add_argument('--threaded', action='store_true', help="run capture, landmarks, classifier and rendering on separate threads")
+    parser.add_argument('--input', nargs='+', metavar='PATH', help="headless mode: video files, .npy / .npz landmark sequences or folders of them instead of the webcam")
+    parser.add_argument('--output', default='predictions.jsonl', help="headless mode: per-frame predictions, .jsonl or .csv")
+    parser.add_argument('--no-flip', action='store_true', help="headless mode: don't mirror video frames like Camera does")
+    parser.add_argument('--config', default=None, help="JSON engine config (model_path, num_threads, xnnpack, warmup)")
+    parser.add_argument('--model', default=None, help="overrides model_path")
+    parser.add_argument('--threads', type=int, default=None, help="interpreter threads, overrides num_threads")
+    parser.add_argument('--xnnpack', choices=['on', 'off'], default=None, help="overrides xnnpack")
+    parser.add_argument('--warmup', type=int, default=None, help="warm-up invokes before the first frame, overrides warmup")
+    parser.add_argument('--latency-report', default=None, help="write the invoke latency histogram as JSON on exit")
+    parser.add_argument('--perf-overlay', action='store_true', help="show FPS and per-stage latency on screen")
+    parser.add_argument('--perf-json', default=None, help="periodically write per-stage latency / FPS snapshots to this JSON file")
+    parser.add_argument('--roi', action='store_true', help="run MediaPipe on a crop around the previous frame's hands")
+    parser.add_argument('--roi-max-side', type=int, default=256, help="downscale ROI crops to at most this many pixels, 0 = never")
+    parser.add_argument('--roi-margin', type=float, default=0.3, help="ROI margin around the hands' bounding box")
+    parser.add_argument('--roi-check-every', type=int, default=0, help="compare ROI landmarks with a full-frame detection every this many cropped frames, 0 = never")
+    parser.add_argument('--motion-gate', action='store_true', help="reuse the previous landmarks on frames that barely changed")
+    parser.add_argument('--motion-threshold', type=int, default=12, help="motion gate: gray level change that counts a thumbnail cell as changed")
+    parser.add_argument('--motion-fraction', type=float, default=0.002, help="motion gate: fraction of changed cells that triggers a detection")
+    parser.add_argument('--max-reuse', type=int, default=5, help="motion gate: force a detection after this many reused frames")
+    parser.add_argument('--classifier-cache', action='store_true', help="skip invoke for windows that barely changed or were already classified")
+    parser.add_argument('--cache-distance', type=float, default=0.004, help="classifier cache: RMS landmark distance below which the last output is reused")
+    parser.add_argument('--cache-size', type=int, default=256, help="classifier cache: LRU entries keyed on the quantized window, 0 = off")
+    parser.add_argument('--perf-interval', type=float, default=5.0, help="seconds between --perf-json snapshots")
+    parser.add_argument('--streams', nargs='+', metavar='SOURCE', help="multi-stream mode: camera indices and/or video files recognized concurrently, predictions go to --output")
+    parser.add_argument('--engine-pool', type=int, default=1, help="multi-stream mode: interpreters shared by all streams")
+    parser.add_argument('--hands-pool', type=int, default=2, help="multi-stream mode: MediaPipe Hands graphs shared by all streams (one per stream keeps tracking)")
+    parser.add_argument('--stream-workers', type=int, default=None, help="multi-stream mode: worker threads, default = --hands-pool")
+    parser.add_argument('--max-batch', type=int, default=1, help="multi-stream mode: classify up to this many streams' windows in one invoke, 1 = no batching")
+    parser.add_argument('--batch-deadline-ms', type=float, default=5.0, help="multi-stream mode: how long a window may wait for others to fill a batch")
+    parser.add_argument('--max-frames', type=int, default=None, help="multi-stream mode: stop each stream after this many frames")
+    args = parser.parse_args()
+
+    engine_config = load_engine_config(
+        args.config, model_path=args.model, num_threads=args.threads,
+        xnnpack=None if args.xnnpack is None else args.xnnpack == 'on', warmup=args.warmup
+    )
+
     print("The app is being loaded. Please wait.")
-    instance = Inference()
-    instance.main()
+    if args.streams:
+        logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+        batcher = None
+        if args.max_batch > 1:
+            batcher = MicroBatcher(InterpreterEngine.from_config(engine_config, batch_size=args.max_batch),
+                                   args.max_batch, args.batch_deadline_ms)
+        recognizer = MultiStreamRecognizer(
+            args.streams, lambda: InterpreterEngine.from_config(engine_config), engine_pool=args.engine_pool,
+            hands_pool=args.hands_pool, workers=args.stream_workers, flip=not args.no_flip, max_frames=args.max_frames,
+            batcher=batcher
+        )
+        recognizer.run(args.output)
+        if batcher is not None:
+            batcher.close()
+            logging.info(batcher.stats())
+    else:
+        monitor = PerfMonitor(overlay=args.perf_overlay, snapshot_path=args.perf_json, snapshot_interval=args.perf_interval)
+        instance = Inference(InterpreterEngine.from_config(engine_config), monitor)
+        logging.info(f"Model: {instance.engine.describe()}")
+        if args.classifier_cache:
+            instance.classifier_cache = ClassifierCache(instance.engine, args.cache_distance, capacity=args.cache_size)
+        if args.motion_gate:
+            instance.motion_gate = MotionGate(args.motion_threshold, args.motion_fraction, args.max_reuse)
+        if args.roi:
+            # own static-mode graph, crops must not go through the tracking one (see inference/roi.py)
+            instance.roi = RoiTracker(Hands(static_image_mode=True).hands, margin=args.roi_margin,
+                                      max_side=args.roi_max_side, check_every=args.roi_check_every)
+        if args.input:
+            instance.main_offline(args.input, args.output, flip=not args.no_flip)
+        elif args.threaded:
+            instance.main_threaded()
+        else:
+            instance.main()
+
+        logging.info(instance.engine.latency.format("invoke latency"))
+        if instance.roi is not None:
+            logging.info(instance.roi.stats())
+        if instance.motion_gate is not None:
+            logging.info(instance.motion_gate.stats())
+        if instance.classifier_cache is not None:
+            logging.info(instance.classifier_cache.stats())
+        if args.latency_report:
+            instance.engine.latency.export(args.latency_report)
+            logging.info(f"Latency report saved: {args.latency_report}")
@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+from inference.metrics import LatencyHistogram
+
+# dynamic micro-batching in front of one InterpreterEngine
+#
+# callers (stream workers, server sessions, ...) submit single (1, 20, 146) windows and get a Future back.
+# one dispatcher thread waits for the first pending window, then keeps collecting until either max_batch
+# windows are pending or max_delay_ms passed since the first one arrived, and classifies them all with
+# one invoke on an interpreter resized to max_batch (partial batches are zero padded)
+#
+# queue wait (submit -> batch start) and compute (the batched invoke) are recorded separately, so the
+# latency added by waiting can be weighed against the throughput gained
+
+class MicroBatcher:
+    def __init__(self, engine, max_batch: int = 8, max_delay_ms: float = 5.0):
+        # engine: InterpreterEngine created with batch_size=max_batch and not allocated yet, or already
+        # allocated at some batch size (if the model refused to resize, windows go through one at a time)
+        self.engine = engine
+        if not engine.allocated:
+            engine.allocate()
+        self.max_batch = max(1, max_batch)
+        if engine.batch_size > 1:
+            self.max_batch = min(self.max_batch, engine.batch_size)
+        self.max_delay = max_delay_ms / 1000.0
+        self._input = np.zeros((engine.batch_size, *engine.input_shape), dtype=engine.input_details[0]['dtype'])
+
+        self._pending: deque = deque() # (window, future, submit time)
+        self._cond = threading.Condition()
+        self._stop = False
+
+        self.queue_wait = LatencyHistogram()
+        self.compute = LatencyHistogram()
+        self.batches = 0
+        self.windows = 0
+
+        self._thread = threading.Thread(target=self._dispatch, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, window: np.ndarray) -> Future:
+        # window: (1, 20, 146) or (20, 146), copied, so callers may reuse their buffer right away
+        future: Future = Future()
+        item = (np.array(window, dtype=self._input.dtype).reshape(self.engine.input_shape), future, time.perf_counter())
+        with self._cond:
+            if self._stop:
+                raise RuntimeError("MicroBatcher is closed")
+            self._pending.append(item)
+            self._cond.notify()
+        return future
+
+    def invoke(self, window: np.ndarray) -> np.ndarray:
+        # same contract as InterpreterEngine.invoke for one window: (1, 20, 146) -> (1, labels), blocks
+        return self.submit(window).result()[np.newaxis]
+
+    def _collect(self) -> list:
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or self._stop)
+            if not self._pending:
+                return []
+            deadline = self._pending[0][2] + self.max_delay
+            while len(self._pending) < self.max_batch and not self._stop:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return [self._pending.popleft() for _ in range(min(self.max_batch, len(self._pending)))]
+
+    def _dispatch(self):
+        while True:
+            batch = self._collect()
+            if not batch:
+                return # stopped and drained
+
+            start = time.perf_counter()
+            for _, _, submitted in batch:
+                self.queue_wait.record((start - submitted) * 1000.0)
+            try:
+                outputs = self._run(batch)
+            except Exception as e:
+                logging.exception("Batched invoke failed")
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            self.compute.record((time.perf_counter() - start) * 1000.0)
+            self.batches += 1
+            self.windows += len(batch)
+            for (_, future, _), output in zip(batch, outputs):
+                future.set_result(output)
+
+    def _run(self, batch) -> np.ndarray:
+        if self.engine.batch_size == 1:
+            return np.stack([self.engine.invoke(window[np.newaxis])[0].copy() for window, _, _ in batch])
+        for idx, (window, _, _) in enumerate(batch):
+            self._input[idx] = window
+        self._input[len(batch):] = 0
+        return self.engine.invoke(self._input)[:len(batch)].copy()
+
+    def close(self):
+        # pending windows are still classified, then the dispatcher exits
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        self._thread.join(timeout=2.0)
+
+    def stats(self) -> str:
+        return (f"Micro-batching: {self.windows} window/s in {self.batches} batch/es "
+                f"(mean {self.windows / max(self.batches, 1):.2f}, max {self.max_batch}, deadline {self.max_delay * 1000:.1f} ms)\n"
+                f"  {self.queue_wait.format('queue wait')}\n"
+                f"  {self.compute.format('batch compute')}")
@@ -2,14 +2,17 @@ import cv2
 import numpy as np
 from typing import Optional, Tuple, Any
 
+from inference.metrics import PerfMonitor
+
 class Camera:
-    def __init__(self):
+    def __init__(self, index: int = 0):
         self.video_capture: Optional[cv2.VideoCapture] = None
-        self._IDX = 0 # 1 for obs
+        self._IDX = index # 1 for obs
         # self._CAM_W = 540
         # self._CAM_H = 720
         self._CAM_W = 768
         self._CAM_H = 432
+        self.monitor: PerfMonitor = PerfMonitor() # disabled unless the app passes its own
 
     def initialize(self):
         self.video_capture = cv2.VideoCapture(self._IDX)
@@ -22,10 +25,13 @@ class Camera:
         if not self.is_opened or not self.video_capture:
             return False, None, None
         
-        ret, frame = self.video_capture.read()
+        image = None
+        with self.monitor.stage('read'):
+            ret, frame = self.video_capture.read()
         if ret:
-            frame = cv2.flip(frame, 1)
-            image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            with self.monitor.stage('convert'):
+                frame = cv2.flip(frame, 1)
+                image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         return ret, frame, image # type: ignore
     
     def release(self):
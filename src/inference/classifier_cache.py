@@ -0,0 +1,90 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+
+from inference.features import FRAME_FEATURES, HAND_FEATURES
+
+# change-aware classifier invocation
+#
+# 1. near hit: the new (1, 20, 146) window is within distance_threshold of the last window the model
+#    actually classified -> that window's output is returned again (steady pose, sliding window barely moved)
+# 2. cache hit: the window's quantized signature (landmarks rounded to quantization) is in a small LRU
+#    cache -> cached output (a pose / movement that was already classified earlier)
+# 3. miss: engine.invoke, the output is remembered for both checks
+#
+# only the 63 landmark values + normal of each hand are compared, pitch / yaw / finger angles are derived
+# from them and are in degrees, so they would swamp the distance
+# distance = RMS difference over those columns and all 20 frames
+
+COMPARED = np.zeros(FRAME_FEATURES, dtype=bool)
+for _hand in range(FRAME_FEATURES // HAND_FEATURES):
+    COMPARED[_hand * HAND_FEATURES:_hand * HAND_FEATURES + 66] = True
+
+
+class ClassifierCache:
+    def __init__(self, engine, distance_threshold: float = 0.004, quantization: float = 0.02, capacity: int = 256):
+        self.engine = engine
+        self.distance_threshold = distance_threshold # 0 = never reuse the last output
+        self.quantization = quantization             # signature grid, in normalized landmark units
+        self.capacity = capacity                     # LRU size, 0 = no LRU
+
+        self._last_input = None
+        self._last_output = None
+        self._lru: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self.near_hits = 0
+        self.cache_hits = 0
+        self.misses = 0
+
+    def reset(self):
+        # forget the last window (e.g. the hand left the frame), the LRU is kept
+        self._last_input = None
+        self._last_output = None
+
+    def clear(self):
+        self.reset()
+        self._lru.clear()
+
+    def distance(self, a: np.ndarray, b: np.ndarray) -> float:
+        diff = a[..., COMPARED] - b[..., COMPARED]
+        return float(np.sqrt(np.mean(diff * diff)))
+
+    def signature(self, x: np.ndarray) -> bytes:
+        quantized = np.rint(x[..., COMPARED] / self.quantization).astype(np.int32)
+        return hashlib.blake2b(quantized.tobytes(), digest_size=16).digest()
+
+    def invoke(self, input_data: np.ndarray) -> np.ndarray:
+        # same contract as InterpreterEngine.invoke: (1, 20, 146) -> (1, labels)
+        if (self._last_input is not None and self.distance_threshold > 0
+                and self.distance(input_data, self._last_input) <= self.distance_threshold):
+            self.near_hits += 1
+            return self._last_output # type: ignore
+
+        key = None
+        if self.capacity > 0:
+            key = self.signature(input_data)
+            output = self._lru.get(key)
+            if output is not None:
+                self._lru.move_to_end(key)
+                self.cache_hits += 1
+                self._remember(input_data, output)
+                return output
+
+        output = self.engine.invoke(input_data).copy() # get_tensor's buffer is reused by the next invoke
+        self.misses += 1
+        if key is not None:
+            self._lru[key] = output
+            if len(self._lru) > self.capacity:
+                self._lru.popitem(last=False)
+        self._remember(input_data, output)
+        return output
+
+    def _remember(self, input_data, output):
+        self._last_input = np.array(input_data, dtype=np.float32) # the window is a view into Sequence's ring buffer
+        self._last_output = output
+
+    def stats(self) -> str:
+        total = self.near_hits + self.cache_hits + self.misses
+        hits = self.near_hits + self.cache_hits
+        return (f"Classifier cache: {hits}/{total} invoke/s saved ({hits / max(total, 1) * 100:.1f}%, "
+                f"{self.near_hits} near / {self.cache_hits} LRU hit/s, {self.misses} miss/es, {len(self._lru)} cached)")
@@ -0,0 +1,98 @@
+import json
+import logging
+import time
+from typing import Optional
+
+import numpy as np
+import tensorflow as tf
+
+from inference.metrics import LatencyHistogram
+
+# TFLite interpreter wrapper: model path, threads, XNNPACK on/off, warm-up and per-invoke latency
+#
+# config file (JSON), every key optional, CLI flags override it:
+# {"model_path": "./models/asl_model_lstm_quant.tflite", "num_threads": 4, "xnnpack": true, "warmup": 5}
+
+DEFAULT_ENGINE_CONFIG = {
+    'model_path': './models/asl_model_lstm_quant.tflite',
+    'num_threads': None, # None = TFLite default
+    'xnnpack': True,
+    'warmup': 3,
+}
+
+
+def load_engine_config(path: Optional[str] = None, **overrides) -> dict:
+    # defaults <- config file <- overrides that are not None
+    config = dict(DEFAULT_ENGINE_CONFIG)
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            file_config = json.load(f)
+        unknown = set(file_config) - set(DEFAULT_ENGINE_CONFIG)
+        if unknown:
+            raise ValueError(f"Unknown engine config key/s in {path}: {sorted(unknown)}")
+        config.update(file_config)
+    config.update({k: v for k, v in overrides.items() if v is not None})
+    return config
+
+
+class InterpreterEngine:
+    def __init__(self, model_path: str = DEFAULT_ENGINE_CONFIG['model_path'], num_threads: Optional[int] = None,
+                 xnnpack: bool = True, warmup: int = 3, batch_size: int = 1):
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.xnnpack = xnnpack
+        self.warmup = warmup
+        self.batch_size = batch_size
+        self.latency = LatencyHistogram()
+
+        resolver = (tf.lite.experimental.OpResolverType.AUTO if xnnpack
+                    else tf.lite.experimental.OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES)
+        self.interpreter: tf.lite.Interpreter = tf.lite.Interpreter(
+            model_path=model_path, num_threads=num_threads, experimental_op_resolver_type=resolver
+        )
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self.input_index = self.input_details[0]['index']
+        self.output_index = self.output_details[0]['index']
+        self.input_shape = tuple(self.input_details[0]['shape'][1:])   # (20, 146)
+        self.allocated = False
+
+    @classmethod
+    def from_config(cls, config: dict, **kwargs) -> 'InterpreterEngine':
+        return cls(**config, **kwargs)
+
+    def allocate(self):
+        # resize to batch_size (falls back to 1 if the model refuses), allocate, then warm up
+        if self.batch_size != 1:
+            try:
+                self.interpreter.resize_tensor_input(self.input_index, [self.batch_size, *self.input_shape])
+                self.interpreter.allocate_tensors()
+            except (RuntimeError, ValueError) as e:
+                logging.warning(f"Cannot resize model input to batch {self.batch_size} ({e}), falling back to batch 1")
+                self.batch_size = 1
+                self.interpreter.resize_tensor_input(self.input_index, [1, *self.input_shape])
+                self.interpreter.allocate_tensors()
+        else:
+            self.interpreter.allocate_tensors()
+        self.allocated = True
+
+        if self.warmup > 0:
+            dummy = np.zeros((self.batch_size, *self.input_shape), dtype=self.input_details[0]['dtype'])
+            start = time.perf_counter()
+            for _ in range(self.warmup):
+                self.interpreter.set_tensor(self.input_index, dummy)
+                self.interpreter.invoke()
+            logging.info(f"Interpreter warm-up: {self.warmup} invoke/s in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def invoke(self, input_data: np.ndarray) -> np.ndarray:
+        # (batch_size, 20, 146) -> (batch_size, labels), latency of set/invoke/get is recorded
+        start = time.perf_counter()
+        self.interpreter.set_tensor(self.input_index, input_data)
+        self.interpreter.invoke()
+        output = self.interpreter.get_tensor(self.output_index)
+        self.latency.record((time.perf_counter() - start) * 1000.0)
+        return output
+
+    def describe(self) -> str:
+        return (f"{self.model_path} (threads={self.num_threads or 'default'}, "
+                f"xnnpack={'on' if self.xnnpack else 'off'}, warmup={self.warmup}, batch={self.batch_size})")
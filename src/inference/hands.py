@@ -3,16 +3,20 @@ import cv2
 import numpy as np
 import mediapipe as mp
 
+from inference.features import frame_hand_features, landmarks_to_array
+
 class Hands:
-    def __init__(self):
+    def __init__(self, static_image_mode: bool = False):
         self.finger_angles: List[Any] = []
         self.LEFT_HAND_COLOR = (255, 0, 0)
         self.RIGHT_HAND_COLOR = (0, 0, 255)
+        self.SLOT_IS_LEFT = np.array([True, False])
         self.mp_hands = mp.solutions.hands # type: ignore
         self.mp_drawing = mp.solutions.drawing_utils # type: ignore
 
+        # static_image_mode = palm detection on every frame, no tracking between frames (for graphs shared by streams or fed ROI crops)
         self.hands = self.mp_hands.Hands(
-            max_num_hands = 2, min_tracking_confidence = 0.8, min_detection_confidence = 0.8
+            static_image_mode = static_image_mode, max_num_hands = 2, min_tracking_confidence = 0.8, min_detection_confidence = 0.8
         )
 
     @property
@@ -95,24 +99,25 @@ class Hands:
         return [self._compute_angle(landmarks[a], landmarks[b], landmarks[c]) for a, b, c in indices]
 
     def extract_all_hand_features(self, results, image_shape):
-        left_hand = np.zeros(73, dtype=np.float32)
-        right_hand = np.zeros(73, dtype=np.float32)
-
         if not results.multi_hand_landmarks:
-            return np.concatenate([left_hand, right_hand])  # when no hands
+            return np.zeros(146, dtype=np.float32)  # when no hands
+
+        # slot 0 = Left, slot 1 = Right, features of the present hands computed by frame_hand_features
+        landmarks = np.zeros((2, 21, 3), dtype=np.float64)
+        present = np.zeros(2, dtype=bool)
 
         for idx, lm in enumerate(results.multi_hand_landmarks):
-            landmarks = np.array([[l.x, l.y, l.z] for l in lm.landmark])
             label = results.multi_handedness[idx].classification[0].label
-            features = self._extract_hand_features(landmarks, label)
-            assert features.shape == (73,), f"{label} hand feature shape invalid: {features.shape}"
-
             if label == "Left":
-                left_hand = features
+                slot = 0
             elif label == "Right":
-                right_hand = features
+                slot = 1
+            else:
+                continue
+            landmarks[slot] = landmarks_to_array(lm)
+            present[slot] = True
 
-        return np.concatenate([left_hand, right_hand])
+        return frame_hand_features(landmarks, self.SLOT_IS_LEFT, present)
 
     def _extract_hand_features(self, landmarks, hand_label):
             # the hand features:
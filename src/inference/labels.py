@@ -0,0 +1,3 @@
+# model output index -> label, same order as the LabelEncoder used in training (sorted folder names)
+LABELS: list[str] = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'hello', 'i', 'iloveyou', 'j', 'k', 'l', 'm', 'n', 'no', 'o', 'p', 'please', 'q', 'r', 's', 'sorry', 't', 'thankyou', 'u', 'v', 'w', 'x', 'y', 'yes', 'z']
+# Found 34 labels: ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'hello', 'i', 'iloveyou', 'j', 'k', 'l', 'm', 'n', 'no', 'o', 'p', 'please', 'q', 'r', 's', 'sorry', 't', 'thankyou', 'u', 'urwelc', 'v', 'w', 'x', 'y', 'yes', 'z']
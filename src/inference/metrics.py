@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from contextlib import nullcontext
+from typing import Optional
+
+import cv2
+import numpy as np
+
+
+class LatencyHistogram:
+    # fixed log-spaced buckets (~10% wide) from 1us to 10s, so recording is O(log buckets)
+    # and memory stays constant no matter how long the app runs
+
+    EDGES_MS: list[float] = np.geomspace(0.001, 10000.0, 171).tolist()
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(self.EDGES_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float('inf')
+        self.max_ms = 0.0
+
+    def record(self, ms: float):
+        self.counts[bisect_right(self.EDGES_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms < self.min_ms:
+            self.min_ms = ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, p: float) -> float:
+        # upper edge of the bucket holding the p-th percentile, clamped to the observed range
+        if self.count == 0:
+            return 0.0
+        target = p / 100.0 * self.count
+        cumulative = 0
+        for idx, n in enumerate(self.counts):
+            cumulative += n
+            if cumulative >= target and n > 0:
+                edge = self.EDGES_MS[idx] if idx < len(self.EDGES_MS) else self.max_ms
+                return min(max(edge, self.min_ms), self.max_ms)
+        return self.max_ms
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean_ms': round(float(self.mean_ms), 4),
+            'min_ms': round(float(self.min_ms), 4) if self.count else 0.0,
+            'p50_ms': round(float(self.percentile(50)), 4),
+            'p95_ms': round(float(self.percentile(95)), 4),
+            'p99_ms': round(float(self.percentile(99)), 4),
+            'max_ms': round(float(self.max_ms), 4),
+        }
+
+    def to_dict(self) -> dict:
+        # summary + the non-empty buckets as [upper edge ms, count]
+        buckets = [
+            [self.EDGES_MS[idx] if idx < len(self.EDGES_MS) else None, n]
+            for idx, n in enumerate(self.counts) if n > 0
+        ]
+        return {**self.summary(), 'buckets': buckets}
+
+    def format(self, name: str) -> str:
+        s = self.summary()
+        return (f"{name}: n={s['count']} mean={s['mean_ms']:.2f}ms p50={s['p50_ms']:.2f}ms "
+                f"p95={s['p95_ms']:.2f}ms p99={s['p99_ms']:.2f}ms max={s['max_ms']:.2f}ms")
+
+    def export(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+
+class _StageStats:
+    # the stage's thread records while the snapshot writer reads and restarts, both under lock
+    __slots__ = ('ewma_ms', 'histogram', 'lock')
+
+    def __init__(self):
+        self.ewma_ms = None
+        self.histogram = LatencyHistogram() # since the last snapshot
+        self.lock = threading.Lock()
+
+
+class _StageTimer:
+    # reusable context manager, one per stage name (a stage is only ever timed by one thread)
+    __slots__ = ('monitor', 'name', 'start')
+
+    def __init__(self, monitor, name):
+        self.monitor = monitor
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.monitor.record(self.name, (time.perf_counter() - self.start) * 1000.0)
+        return False
+
+
+class PerfMonitor:
+    # per-stage latency + FPS for the live loops
+    #
+    #   with monitor.stage('landmarks'):
+    #       results = hands.hands.process(image)
+    #   ...
+    #   monitor.frame_done()        # once per displayed frame: FPS + periodic JSON snapshot
+    #   monitor.draw_overlay(frame) # optional on-screen FPS / latency
+    #
+    # disabled monitors hand out a shared nullcontext and return early everywhere
+
+    ALPHA = 0.1 # EWMA smoothing for the overlay numbers
+
+    def __init__(self, enabled: bool = False, overlay: bool = False, snapshot_path: Optional[str] = None,
+                 snapshot_interval: float = 5.0):
+        self.enabled = enabled or overlay or snapshot_path is not None
+        self.overlay = overlay
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+
+        self.stages: dict[str, _StageStats] = {}
+        self._timers: dict[str, _StageTimer] = {}
+        self.frames = 0
+        self.fps = 0.0
+        self._last_frame = None
+        self._last_snapshot = time.perf_counter()
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return _NULL_STAGE
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _StageTimer(self, name)
+            self.stages[name] = _StageStats()
+        return timer
+
+    def record(self, name: str, ms: float):
+        stats = self.stages[name]
+        with stats.lock:
+            stats.ewma_ms = ms if stats.ewma_ms is None else stats.ewma_ms + self.ALPHA * (ms - stats.ewma_ms)
+            stats.histogram.record(ms)
+
+    def frame_done(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            interval = now - self._last_frame
+            if interval > 0:
+                self.fps = 1.0 / interval if self.fps == 0.0 else self.fps + self.ALPHA * (1.0 / interval - self.fps)
+        self._last_frame = now
+        self.frames += 1
+
+        if self.snapshot_path and now - self._last_snapshot >= self.snapshot_interval:
+            self.write_snapshot()
+
+    def snapshot(self, reset: bool = False) -> dict:
+        # reset: every stage histogram is summarized and swapped for an empty one in the same locked step,
+        # so samples recorded meanwhile land in exactly one snapshot
+        stages = {}
+        for name, stats in list(self.stages.items()):
+            with stats.lock:
+                stages[name] = {'ewma_ms': round(stats.ewma_ms or 0.0, 4), **stats.histogram.summary()}
+                if reset:
+                    stats.histogram = LatencyHistogram()
+        return {
+            'timestamp': time.time(),
+            'frames': self.frames,
+            'fps': round(self.fps, 2),
+            'stages': stages,
+        }
+
+    def write_snapshot(self):
+        # atomic replace so readers never see a half written file, stage histograms restart with it
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(reset=True), f, indent=2)
+        os.replace(tmp_path, self.snapshot_path) # type: ignore
+        self._last_snapshot = time.perf_counter()
+
+    def close(self):
+        if self.enabled and self.snapshot_path:
+            self.write_snapshot()
+
+    def draw_overlay(self, frame):
+        if not self.overlay:
+            return
+        h, w, _ = frame.shape
+        x, y, spacing = w - 200, 20, 18
+        cv2.putText(frame, f"FPS: {self.fps:.1f}", (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+        for i, (name, stats) in enumerate(list(self.stages.items())):
+            cv2.putText(frame, f"{name}: {stats.ewma_ms or 0.0:.1f} ms", (x, y + spacing * (i + 1)),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+
+
+_NULL_STAGE = nullcontext()
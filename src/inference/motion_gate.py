@@ -0,0 +1,55 @@
+import cv2
+import numpy as np
+
+# motion gate for hands.process
+#
+# every frame is shrunk to a tiny grayscale thumbnail (64x36 by default, ~0.1 ms) and compared with the
+# thumbnail of the last frame MediaPipe actually ran on. when fewer than changed_fraction of the cells
+# changed by more than pixel_threshold gray levels, the previous landmarks / features are reused.
+# comparing against the last *detected* frame (not the previous one) stops slow drift from never triggering.
+# after max_reuse reused frames in a row a detection is forced anyway.
+
+
+class MotionGate:
+    def __init__(self, pixel_threshold: int = 12, changed_fraction: float = 0.002, max_reuse: int = 5,
+                 thumbnail_size: tuple[int, int] = (64, 36)):
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.max_reuse = max_reuse
+        self.thumbnail_size = thumbnail_size
+
+        self._reference = None
+        self._reused = 0
+        self.detections = 0
+        self.skipped = 0
+        self.forced = 0
+
+    def reset(self):
+        self._reference = None
+        self._reused = 0
+
+    def _thumbnail(self, image):
+        small = cv2.resize(image, self.thumbnail_size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_RGB2GRAY) if small.ndim == 3 else small
+
+    def should_detect(self, image) -> bool:
+        thumbnail = self._thumbnail(image)
+
+        if self._reference is not None and self._reused < self.max_reuse:
+            changed = np.count_nonzero(cv2.absdiff(thumbnail, self._reference) > self.pixel_threshold)
+            if changed < self.changed_fraction * thumbnail.size:
+                self._reused += 1
+                self.skipped += 1
+                return False
+        elif self._reference is not None:
+            self.forced += 1
+
+        self._reference = thumbnail
+        self._reused = 0
+        self.detections += 1
+        return True
+
+    def stats(self) -> str:
+        total = self.detections + self.skipped
+        return (f"Motion gate: {self.skipped}/{total} detection/s skipped ({self.skipped / max(total, 1) * 100:.1f}%), "
+                f"{self.forced} forced after {self.max_reuse} reuses")
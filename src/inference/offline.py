@@ -0,0 +1,119 @@
+import csv
+import json
+import os
+from typing import Any, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from inference.sequence_store import FEATURE_EXTENSION, RAW_EXTENSION, derive_features, load_raw_sequence
+
+# building blocks for headless runs (python src/inference.py --input ...):
+# video files stand in for the Camera, .npy / raw .npz landmark sequences skip MediaPipe entirely
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+SEQUENCE_EXTENSIONS = (FEATURE_EXTENSION, RAW_EXTENSION)
+
+
+class VideoFileSource:
+    # same interface as Camera, reads frames from a video file instead of device 0
+
+    def __init__(self, path: str, flip: bool = True):
+        self.path = path
+        self.flip = flip # Camera mirrors frames, keep the same orientation for recordings made with it
+        self.video_capture: Optional[cv2.VideoCapture] = None
+        self.is_opened = False
+
+    def initialize(self):
+        self.video_capture = cv2.VideoCapture(self.path)
+        self.is_opened = self.video_capture.isOpened()
+        if not self.is_opened:
+            raise IOError(f"Cannot open video file: {self.path}")
+
+    def read_frame(self) -> Tuple[bool, Optional[np.ndarray], Any]:
+        if not self.is_opened or not self.video_capture:
+            return False, None, None
+
+        ret, frame = self.video_capture.read()
+        if not ret:
+            return False, None, None
+        if self.flip:
+            frame = cv2.flip(frame, 1)
+        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return ret, frame, image
+
+    def release(self):
+        if self.video_capture:
+            self.video_capture.release()
+        self.is_opened = False
+
+    def __enter__(self):
+        try:
+            self.initialize()
+        except BaseException:
+            self.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+def load_landmark_sequence(path: str) -> np.ndarray:
+    # (20, 146) sequence files or longer (T, 146) recordings -> (frames, 146)
+    # raw .npz recordings (sequence_store.py) -> their schema 1 features, what the live pipeline computes
+    if path.lower().endswith(RAW_EXTENSION):
+        sequence = derive_features(*load_raw_sequence(path), schema=1)
+    else:
+        sequence = np.load(path)
+    return sequence.reshape(-1, sequence.shape[-1])
+
+
+def expand_inputs(paths: list[str]) -> list[str]:
+    # files are kept as given, directories are walked for videos and .npy / .npz files
+    inputs = []
+    for path in paths:
+        if not os.path.isdir(path):
+            inputs.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file in sorted(files):
+                if file.lower().endswith(VIDEO_EXTENSIONS + SEQUENCE_EXTENSIONS):
+                    inputs.append(os.path.join(root, file))
+    return inputs
+
+
+class PredictionWriter:
+    # per-frame prediction records, .csv -> CSV, anything else -> JSONL
+
+    FIELDS = ['source', 'frame', 'hand_present', 'predicted', 'raw_label', 'label', 'confidence']
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = None
+        self._csv = None
+
+    def __enter__(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok = True)
+        self._file = open(self.path, 'w', newline = '', encoding = 'utf-8')
+        if self.path.lower().endswith('.csv'):
+            self._csv = csv.DictWriter(self._file, fieldnames = self.FIELDS)
+            self._csv.writeheader()
+        return self
+
+    def write(self, record: dict):
+        if self._csv is not None:
+            self._csv.writerow(record)
+        else:
+            self._file.write(json.dumps(record) + '\n') # type: ignore
+        self.count += 1
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._file:
+            self._file.close()
+        self._file = None
+        self._csv = None
@@ -0,0 +1,150 @@
+import logging
+import threading
+from collections import deque
+from typing import Any, Optional
+
+import cv2
+
+# staged version of Inference.main:
+#
+#   capture thread   -> camera.read_frame (VideoCapture.read, flip, cvtColor)
+#   landmark thread  -> Inference.find_hands (hands.process on full frame / ROI, motion gate, feature extraction)
+#   classify thread  -> Inference.update (sequence, interpreter.invoke, smoothing)
+#   main thread      -> Inference.draw + imshow/waitKey (OpenCV GUI calls must stay on the main thread)
+#
+# stages are connected with small LatestQueues that drop the oldest item when full,
+# so a slow stage always works on the newest frame instead of a backlog of stale ones.
+# the classify queue's "no hand" items are reset markers and must never be dropped (two hand appearances
+# would merge into one window): they are put pinned, which clears the queue instead
+
+
+class LatestQueue:
+    # bounded FIFO, put() never blocks: when full the oldest item is dropped
+    # a pinned item drops everything queued before it and is never dropped itself; it is always at the
+    # front (nothing older is left) and does not count towards maxsize
+
+    def __init__(self, maxsize: int = 2):
+        self.maxsize = maxsize
+        self._items: deque = deque()
+        self._pinned_head = False
+        self._cond = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item, pinned: bool = False):
+        with self._cond:
+            if pinned:
+                self.dropped += len(self._items)
+                self._items.clear()
+                self._pinned_head = True
+            elif len(self._items) - self._pinned_head >= self.maxsize:
+                self.dropped += 1
+                del self._items[1 if self._pinned_head else 0]
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Any]:
+        # returns None on timeout
+        with self._cond:
+            if not self._cond.wait_for(lambda: len(self._items) > 0, timeout):
+                return None
+            self._pinned_head = False
+            return self._items.popleft()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class InferencePipeline:
+    WINDOW_NAME = "inference"
+    POLL_TIMEOUT = 0.05 # seconds, how often idle workers re-check the stop flag
+
+    def __init__(self, inference, queue_size: int = 2):
+        self.inference = inference
+        self.frames = LatestQueue(queue_size)    # capture  -> landmarks: (frame, image)
+        self.features = LatestQueue(queue_size)  # landmarks -> classify: (frame_features,)
+        self.rendered = LatestQueue(queue_size)  # landmarks -> render:   (frame, results)
+        self.stop_event = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def _capture_worker(self):
+        camera = self.inference.camera
+        while not self.stop_event.is_set():
+            ret, frame, image = camera.read_frame()
+            if not ret:
+                self.stop_event.set()
+                break
+            self.frames.put((frame, image))
+
+    def _landmark_worker(self):
+        while not self.stop_event.is_set():
+            item = self.frames.get(timeout=self.POLL_TIMEOUT)
+            if item is None:
+                continue
+            frame, image = item
+
+            results, frame_features = self.inference.find_hands(image)
+
+            # no hand = StreamState reset, pinned so it is never dropped
+            self.features.put((frame_features,), pinned=frame_features is None)
+            self.rendered.put((frame, results))
+
+    def _classify_worker(self):
+        # only this thread touches the interpreter, sequence and smoothing buffers
+        while not self.stop_event.is_set():
+            item = self.features.get(timeout=self.POLL_TIMEOUT)
+            if item is None:
+                continue
+            with self.inference.monitor.stage('classify'):
+                self.inference.update(item[0])
+
+    def _run_worker(self, target):
+        # a crashed stage stops the whole pipeline instead of leaving the others waiting forever
+        try:
+            target()
+        except Exception:
+            logging.exception(f"{threading.current_thread().name} stage failed")
+            self.stop_event.set()
+
+    def start(self):
+        self.inference.prepare()
+        self.inference.camera.initialize()
+
+        self._threads = [
+            threading.Thread(target=self._run_worker, args=(self._capture_worker,), name="capture", daemon=True),
+            threading.Thread(target=self._run_worker, args=(self._landmark_worker,), name="landmarks", daemon=True),
+            threading.Thread(target=self._run_worker, args=(self._classify_worker,), name="classify", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=2.0)
+        self._threads = []
+        self.inference.camera.release()
+        self.inference.monitor.close()
+        cv2.destroyAllWindows()
+
+    def run(self):
+        self.start()
+        monitor = self.inference.monitor
+        shown = False
+        try:
+            while not self.stop_event.is_set():
+                item = self.rendered.get(timeout=self.POLL_TIMEOUT)
+                if item is not None:
+                    frame, results = item
+                    with monitor.stage('render'):
+                        self.inference.draw(frame, results)
+                        monitor.draw_overlay(frame)
+                        cv2.imshow(self.WINDOW_NAME, frame) # type: ignore
+                    monitor.frame_done()
+                    shown = True
+
+                key = cv2.waitKey(1) & 0xFF
+                # window property is only valid once the window was shown
+                if key == ord('Q') or (shown and cv2.getWindowProperty(self.WINDOW_NAME, cv2.WND_PROP_VISIBLE) < 1):
+                    break
+        finally:
+            self.stop()
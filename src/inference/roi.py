@@ -0,0 +1,133 @@
+import cv2
+import numpy as np
+
+# hand ROI cropping for MediaPipe
+#
+# after a detection, the next frame only sends a square crop around the previous landmarks' bounding box
+# (optionally downscaled to max_side pixels) to hands.process. landmarks found in the crop are mapped back
+# to full-frame normalized coordinates in place, so drawing and the 146-D features are unaffected:
+#   x = (x_crop * crop_w + x0) / W,  y = (y_crop * crop_h + y0) / H,  z = z_crop * crop_w / W
+# (MediaPipe's z uses roughly the same scale as x)
+#
+# full frame is used when there is no previous box, when the crop finds no hand (tracking lost)
+# and every refresh_every frames so a hand entering outside the ROI is still picked up
+#
+# the tracker needs its own static_image_mode graph (Hands(static_image_mode=True).hands), never the camera's
+# tracking one: a tracking graph carries the last hand ROI over in the previous input's normalized coordinates,
+# which points at the wrong place once the input alternates between crops of varying size / offset and full
+# frames, giving stale or shifted landmarks. in static mode every call runs palm detection, so the saving is
+# the smaller input only; compare the 'landmarks' stage of --perf-json with and without --roi
+#
+# check_every > 0 also runs the full frame every check_every cropped frames and compares the mapped-back
+# landmarks with the full-frame ones (same handedness), reported by stats() in pixels
+
+
+def landmarks_bbox(results):
+    # union of all hands' landmarks, normalized (x1, y1, x2, y2), None when no hands
+    if not results.multi_hand_landmarks:
+        return None
+    pts = np.array([[pt.x, pt.y] for hand_landmarks in results.multi_hand_landmarks for pt in hand_landmarks.landmark])
+    x1, y1 = pts.min(axis=0)
+    x2, y2 = pts.max(axis=0)
+    return float(x1), float(y1), float(x2), float(y2)
+
+
+class RoiTracker:
+    def __init__(self, hands, margin: float = 0.3, max_side: int = 256, refresh_every: int = 30, min_side: float = 0.15,
+                 check_every: int = 0):
+        self.hands = hands # mediapipe Hands solution in static_image_mode, used by this tracker only
+        self.margin = margin               # extra space around the box, fraction of its longer side, per side
+        self.max_side = max_side           # crops bigger than this are downscaled, 0 = never
+        self.refresh_every = refresh_every # full-frame detection at least this often
+        self.min_side = min_side           # smallest crop, fraction of the frame's shorter side
+        self.check_every = check_every     # crop vs full-frame landmark check every this many cropped frames, 0 = never
+
+        self.bbox = None
+        self.frames_since_full = 0
+        self.roi_runs = 0
+        self.full_runs = 0
+        self.fallbacks = 0
+        self.check_errors: list[float] = [] # per checked frame, mean landmark distance in pixels
+        self.check_max = 0.0
+        self.check_mismatches = 0 # checked frames where crop and full frame disagreed on the hands found
+
+    def reset(self):
+        self.bbox = None
+        self.frames_since_full = 0
+
+    def _crop_box(self, w, h):
+        x1, y1, x2, y2 = self.bbox # type: ignore
+        side = max((x2 - x1) * w, (y2 - y1) * h)
+        side = max(side * (1 + 2 * self.margin), self.min_side * min(w, h))
+        cx, cy = (x1 + x2) / 2 * w, (y1 + y2) / 2 * h
+
+        x0 = int(max(0, cx - side / 2))
+        y0 = int(max(0, cy - side / 2))
+        x1 = int(min(w, cx + side / 2))
+        y1 = int(min(h, cy + side / 2))
+        return x0, y0, x1, y1
+
+    def _to_full_frame(self, results, x0, y0, crop_w, crop_h, w, h):
+        for hand_landmarks in results.multi_hand_landmarks:
+            for pt in hand_landmarks.landmark:
+                pt.x = (pt.x * crop_w + x0) / w
+                pt.y = (pt.y * crop_h + y0) / h
+                pt.z = pt.z * crop_w / w
+
+    def _check(self, image, results, w, h):
+        # mapped-back crop landmarks vs the same frame detected in full, matched by handedness
+        full = self.hands.process(image)
+        crop_hands = {hd.classification[0].label: lm for hd, lm in zip(results.multi_handedness, results.multi_hand_landmarks)}
+        full_hands = {hd.classification[0].label: lm for hd, lm in zip(full.multi_handedness or [], full.multi_hand_landmarks or [])}
+        if crop_hands.keys() != full_hands.keys():
+            self.check_mismatches += 1
+            return
+        distances = []
+        for label, lm in crop_hands.items():
+            a = np.array([[pt.x * w, pt.y * h] for pt in lm.landmark])
+            b = np.array([[pt.x * w, pt.y * h] for pt in full_hands[label].landmark])
+            distances.append(np.linalg.norm(a - b, axis=1))
+        distances = np.concatenate(distances)
+        self.check_errors.append(float(distances.mean()))
+        self.check_max = max(self.check_max, float(distances.max()))
+
+    def process(self, image):
+        h, w = image.shape[:2]
+
+        if self.bbox is not None and self.frames_since_full < self.refresh_every:
+            x0, y0, x1, y1 = self._crop_box(w, h)
+            crop_w, crop_h = x1 - x0, y1 - y0
+            if crop_w > 1 and crop_h > 1:
+                crop = image[y0:y1, x0:x1]
+                scale = self.max_side / max(crop_w, crop_h) if self.max_side else 1.0
+                if scale < 1.0:
+                    crop = cv2.resize(crop, (max(1, round(crop_w * scale)), max(1, round(crop_h * scale))), interpolation=cv2.INTER_AREA)
+
+                results = self.hands.process(np.ascontiguousarray(crop))
+                self.roi_runs += 1
+                if results.multi_hand_landmarks:
+                    self._to_full_frame(results, x0, y0, crop_w, crop_h, w, h)
+                    if self.check_every and (self.roi_runs - self.fallbacks) % self.check_every == 0:
+                        self._check(image, results, w, h)
+                    self.bbox = landmarks_bbox(results)
+                    self.frames_since_full += 1
+                    return results
+                self.fallbacks += 1
+
+        results = self.hands.process(image)
+        self.full_runs += 1
+        self.frames_since_full = 0
+        self.bbox = landmarks_bbox(results)
+        return results
+
+    def stats(self) -> str:
+        cropped = self.roi_runs - self.fallbacks
+        out = (f"ROI: {cropped} cropped / {self.full_runs} full-frame detection/s "
+               f"({cropped / max(cropped + self.full_runs, 1) * 100:.1f}% cropped, {self.fallbacks} crop/s lost the hand)")
+        checks = len(self.check_errors) + self.check_mismatches
+        if checks:
+            out += f", crop vs full frame over {checks} check/s: "
+            if self.check_errors:
+                out += f"mean {np.mean(self.check_errors):.2f} px, max {self.check_max:.2f} px, "
+            out += f"{self.check_mismatches} found different hands"
+        return out
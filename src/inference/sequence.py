@@ -1,19 +1,48 @@
 import numpy as np
 
 class Sequence:
-    def __init__(self):
+    # fixed size ring buffer of the most recent frames
+    # every frame is written twice (at i and i + sequence_length), so the latest window
+    # is always one contiguous slice of _buffer and get_sequence() never copies
+    #
+    # stride = number of new frames between two predictions over the sliding window
+    # stride == sequence_length gives the old behaviour (predict, then start a fresh window)
+
+    def __init__(self, sequence_length: int = 20, feature_size: int = 146, stride: int = 20):
+        self.sequence_length = sequence_length
+        self.feature_size = feature_size
+        self.stride = max(1, min(stride, sequence_length))
+        self._buffer = np.zeros((2 * sequence_length, feature_size), dtype=np.float32)
         self.reset()
-        self.sequence_length = 20
 
     def reset(self):
-        self.sequence = []
+        self._count = 0
+        self._since_slide = 0
 
     def append(self, frame_vector):
-        self.sequence.append(frame_vector)
-    
+        pos = self._count % self.sequence_length
+        self._buffer[pos] = frame_vector
+        self._buffer[pos + self.sequence_length] = frame_vector
+        self._count += 1
+        self._since_slide += 1
+
+    def __len__(self):
+        return min(self._count, self.sequence_length)
+
     def is_full(self):
-        return len(self.sequence) >= self.sequence_length
-    
+        return self._count >= self.sequence_length
+
+    def is_ready(self):
+        # full window and at least `stride` new frames since the last slide()
+        return self.is_full() and self._since_slide >= self.stride
+
+    def slide(self):
+        # call after predicting on the current window, the next window is ready after `stride` more frames
+        self._since_slide = 0
+
     def get_sequence(self):
-        return np.array(self.sequence)
-    
+        # (frames, feature_size) float32 view, oldest frame first
+        if self._count < self.sequence_length:
+            return self._buffer[:self._count]
+        start = self._count % self.sequence_length
+        return self._buffer[start:start + self.sequence_length]
@@ -0,0 +1,262 @@
+import asyncio
+import logging
+import socket
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from inference.batching import MicroBatcher
+from inference.features import FRAME_FEATURES, frame_hand_features
+from inference.stream_state import StreamState
+
+# landmark ingestion server: thin clients run MediaPipe themselves and send landmarks, not video
+#
+# plain TCP, every message is  <u32 payload length> <u8 type> <payload>  (little endian):
+#   client -> server
+#     FEATURES   146 x float32                 one frame, already in the 146-D layout
+#     LANDMARKS  u8 mask + 63 x float32 / hand  raw 21x3 landmarks, mask bit 0 = Left, bit 1 = Right,
+#                                              hands in slot order, features computed with the Hands math
+#     NO_HAND    empty                         no hand in this frame (resets the window like Inference.update)
+#     RESET      empty                         drop the session's window / smoothing state
+#   server -> client
+#     LABEL      f32 confidence + utf-8 label  sent whenever the confirmed label changes
+#     ERROR      utf-8 message                 the connection is closed afterwards
+#
+# one session (StreamState: Sequence + smoothing buffers) per connection, sessions that send nothing
+# for idle_timeout seconds are closed. the interpreter is not thread safe, so every invoke runs on one
+# dedicated executor thread (or goes through a MicroBatcher) and the event loop keeps serving the other
+# sessions meanwhile
+
+MSG_FEATURES = 0x01
+MSG_LANDMARKS = 0x02
+MSG_NO_HAND = 0x03
+MSG_RESET = 0x04
+MSG_LABEL = 0x81
+MSG_ERROR = 0x82
+
+HEADER = struct.Struct('<IB')
+HAND_LANDMARK_VALUES = 63
+MAX_PAYLOAD = FRAME_FEATURES * 4 # largest valid message (FEATURES)
+SLOT_IS_LEFT = np.array([True, False]) # same slots as Hands.extract_all_hand_features
+
+
+def encode_message(msg_type: int, payload: bytes = b'') -> bytes:
+    return HEADER.pack(len(payload), msg_type) + payload
+
+
+def encode_features(frame_features: np.ndarray) -> bytes:
+    return encode_message(MSG_FEATURES, np.asarray(frame_features, dtype='<f4').tobytes())
+
+
+def encode_landmarks(left: Optional[np.ndarray] = None, right: Optional[np.ndarray] = None) -> bytes:
+    # (21, 3) arrays in MediaPipe's normalized coordinates, None = hand not present
+    if left is None and right is None:
+        return encode_message(MSG_NO_HAND)
+    mask = int(left is not None) | int(right is not None) << 1
+    hands = [np.asarray(h, dtype='<f4').tobytes() for h in (left, right) if h is not None]
+    return encode_message(MSG_LANDMARKS, bytes([mask]) + b''.join(hands))
+
+
+def decode_label(payload: bytes) -> tuple[str, float]:
+    (confidence,) = struct.unpack_from('<f', payload)
+    return payload[4:].decode('utf-8'), confidence
+
+
+def landmarks_to_features(payload: bytes) -> Optional[np.ndarray]:
+    # LANDMARKS payload -> (146,) float32, None when the mask is empty
+    if not payload:
+        raise ValueError("Empty LANDMARKS payload")
+    mask = payload[0]
+    slots = [slot for slot in (0, 1) if mask >> slot & 1]
+    if len(payload) != 1 + len(slots) * HAND_LANDMARK_VALUES * 4:
+        raise ValueError(f"LANDMARKS payload of {len(payload)} bytes does not match mask {mask:#x}")
+    if not slots:
+        return None
+    values = np.frombuffer(payload, dtype='<f4', offset=1).reshape(len(slots), 21, 3)
+    landmarks = np.zeros((2, 21, 3), dtype=np.float64)
+    present = np.zeros(2, dtype=bool)
+    landmarks[slots] = values
+    present[slots] = True
+    return frame_hand_features(landmarks, SLOT_IS_LEFT, present).astype(np.float32)
+
+
+class Session:
+    def __init__(self, session_id: int, peer, state: StreamState):
+        self.session_id = session_id
+        self.peer = peer
+        self.state = state
+        self.last_seen = time.monotonic()
+        self.sent_label = state.last_confirmed_label
+        self.messages = 0
+
+
+class LandmarkServer:
+    def __init__(self, engine, host: str = '127.0.0.1', port: int = 8765, idle_timeout: float = 30.0,
+                 stride: int = 4, batcher: Optional[MicroBatcher] = None):
+        self.engine = engine
+        self.batcher = batcher # classify the windows of concurrent sessions together instead of one by one
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.stride = stride
+
+        self.sessions: dict[int, Session] = {}
+        self._writers: dict[int, asyncio.StreamWriter] = {}
+        self._next_id = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="classify")
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.evicted = 0
+        self.messages = 0
+
+    async def _classify(self, window: np.ndarray) -> np.ndarray:
+        if self.batcher is not None:
+            return await asyncio.wrap_future(self.batcher.submit(window)) # submit copies the window
+        window = window.copy() # the view into the session's ring buffer must not change while invoke runs
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, lambda: self.engine.invoke(window)[0].copy()
+        )
+
+    async def handle_message(self, session: Session, msg_type: int, payload: bytes) -> Optional[bytes]:
+        # returns the reply to send, if any
+        if msg_type == MSG_FEATURES:
+            if len(payload) != FRAME_FEATURES * 4:
+                raise ValueError(f"FEATURES payload must be {FRAME_FEATURES * 4} bytes, got {len(payload)}")
+            frame_features = np.frombuffer(payload, dtype='<f4')
+        elif msg_type == MSG_LANDMARKS:
+            frame_features = landmarks_to_features(payload)
+        elif msg_type == MSG_NO_HAND:
+            frame_features = None
+        elif msg_type == MSG_RESET:
+            session.state.reset()
+            return None
+        else:
+            raise ValueError(f"Unknown message type {msg_type:#x}")
+
+        window = session.state.push(frame_features)
+        if window is not None:
+            session.state.apply(await self._classify(window))
+
+        label = session.state.last_confirmed_label
+        if label == session.sent_label:
+            return None
+        session.sent_label = label
+        confidence = float(np.max(session.state.smoothed_out)) if label != "Idle" else 0.0
+        return encode_message(MSG_LABEL, struct.pack('<f', confidence) + label.encode('utf-8'))
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        session = Session(self._next_id, writer.get_extra_info('peername'), StreamState(f"session-{self._next_id}", stride=self.stride))
+        self._next_id += 1
+        self.sessions[session.session_id] = session
+        self._writers[session.session_id] = writer
+        logging.info(f"Session {session.session_id} opened ({session.peer})")
+        try:
+            while True:
+                length, msg_type = HEADER.unpack(await reader.readexactly(HEADER.size))
+                if length > MAX_PAYLOAD:
+                    raise ValueError(f"Message of {length} bytes is too long")
+                payload = await reader.readexactly(length)
+                session.last_seen = time.monotonic()
+                session.messages += 1
+                self.messages += 1
+
+                reply = await self.handle_message(session, msg_type, payload)
+                if reply is not None:
+                    writer.write(reply)
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass # client went away
+        except ValueError as e:
+            logging.warning(f"Session {session.session_id}: {e}")
+            writer.write(encode_message(MSG_ERROR, str(e).encode('utf-8')))
+        finally:
+            self.sessions.pop(session.session_id, None)
+            self._writers.pop(session.session_id, None)
+            writer.close()
+            logging.info(f"Session {session.session_id} closed after {session.messages} message/s "
+                         f"({session.state.predictions} prediction/s)")
+
+    async def _evict_idle(self):
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 4, 0.1))
+            now = time.monotonic()
+            for session_id, session in list(self.sessions.items()):
+                if now - session.last_seen > self.idle_timeout:
+                    logging.info(f"Session {session_id} idle for {now - session.last_seen:.1f} s, evicting")
+                    self.evicted += 1
+                    writer = self._writers.get(session_id)
+                    if writer is not None:
+                        writer.close() # the handler's pending read fails and cleans the session up
+
+    async def serve(self):
+        if self.batcher is None and not self.engine.allocated:
+            self.engine.allocate()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1] # port 0 = any free port
+        logging.info(f"Landmark server listening on {self.host}:{self.port}")
+        janitor = asyncio.create_task(self._evict_idle())
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            janitor.cancel()
+            self._executor.shutdown(wait=False)
+            if self.batcher is not None:
+                self.batcher.close()
+
+    def stats(self) -> str:
+        return (f"Landmark server: {self.messages} message/s, {self._next_id} session/s "
+                f"({len(self.sessions)} open, {self.evicted} evicted for idling)")
+
+
+class LandmarkClient:
+    # minimal blocking client, e.g. to replay .npy landmark sequences against a running server
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, timeout: Optional[float] = None):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def send_features(self, frame_features: Optional[np.ndarray]):
+        self.sock.sendall(encode_features(frame_features) if frame_features is not None and np.any(frame_features)
+                          else encode_message(MSG_NO_HAND))
+
+    def send_landmarks(self, left: Optional[np.ndarray] = None, right: Optional[np.ndarray] = None):
+        self.sock.sendall(encode_landmarks(left, right))
+
+    def reset(self):
+        self.sock.sendall(encode_message(MSG_RESET))
+
+    def poll_labels(self, timeout: float = 0.0) -> list[tuple[str, float]]:
+        # labels the server pushed so far
+        labels = []
+        self.sock.settimeout(timeout)
+        try:
+            while True:
+                header = self._recv_exactly(HEADER.size)
+                if header is None:
+                    break
+                length, msg_type = HEADER.unpack(header)
+                payload = self._recv_exactly(length) or b''
+                if msg_type == MSG_ERROR:
+                    raise RuntimeError(f"Server error: {payload.decode('utf-8')}")
+                if msg_type == MSG_LABEL:
+                    labels.append(decode_label(payload))
+                self.sock.settimeout(timeout)
+        except (socket.timeout, BlockingIOError):
+            pass
+        return labels
+
+    def _recv_exactly(self, n: int) -> Optional[bytes]:
+        data = b''
+        while len(data) < n:
+            chunk = self.sock.recv(n - len(data))
+            if not chunk:
+                return None
+            data += chunk
+            self.sock.settimeout(None) # message started, read the rest of it
+        return data
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,78 @@
+from collections import deque, Counter
+from typing import Any, Optional
+
+import numpy as np
+
+from inference.labels import LABELS
+from inference.sequence import Sequence
+
+# recognition state of one stream / session, without the camera, MediaPipe or the interpreter,
+# so the landmark server can use it without importing mediapipe
+
+
+class StreamState:
+    # per-stream recognition state: sequence window, smoothing and agreement
+    # (Inference keeps one for the camera, MultiStreamRecognizer / the landmark server one per stream)
+
+    def __init__(self, name: str, stride: int = 4, smoothing_window: int = 2, agreement: int = 1,
+                 labels: Optional[list[str]] = None):
+        self.name = name
+        self.labels = list(labels or LABELS)
+        self.sequence = Sequence(stride=stride)
+        self.agreement = agreement
+        self.output_buffer = deque(maxlen=smoothing_window)
+        self.prediction_buffer = deque(maxlen=agreement)
+        self.last_confirmed_label = "Idle"
+        self.smoothed_out: Any = 0
+        self.classifier_cache: Any = None # ClassifierCache the windows go through, restarted with the state
+
+        self.frames = 0
+        self.predictions = 0
+
+    def reset(self):
+        self.sequence.reset()
+        self.output_buffer.clear()
+        self.prediction_buffer.clear()
+        self.last_confirmed_label = "Idle"
+        if self.classifier_cache is not None:
+            self.classifier_cache.reset()
+
+    def push(self, frame_features) -> Optional[np.ndarray]:
+        # frame_features = None when no hand is present
+        # returns the (1, 20, 146) window to classify when one is due, else None
+        self.frames += 1
+        if frame_features is None:
+            self.reset()
+            return None
+        self.sequence.append(frame_features)
+        if self.sequence.is_ready():
+            return self.sequence.get_sequence()[np.newaxis]
+        return None
+
+    def apply(self, output: np.ndarray):
+        # smoothing / agreement over the model output of the window push() returned, then slide
+        self.output_buffer.append(output)
+        self.smoothed_out = np.mean(self.output_buffer, axis=0)
+        self.prediction_buffer.append(int(np.argmax(self.smoothed_out)))
+
+        if len(self.prediction_buffer) == self.agreement:
+            most_common, freq = Counter(self.prediction_buffer).most_common(1)[0]
+            if freq >= self.agreement:
+                self.last_confirmed_label = self.labels[most_common]
+            self.prediction_buffer.clear()
+
+        self.sequence.slide()
+        self.predictions += 1
+
+    def record(self, frame_idx, hand_present, output, source: Optional[str] = None) -> dict:
+        # one prediction record (PredictionWriter fields), source defaults to the stream name
+        confident = self.last_confirmed_label != "Idle"
+        return {
+            'source': source if source is not None else self.name,
+            'frame': frame_idx,
+            'hand_present': hand_present,
+            'predicted': output is not None,
+            'raw_label': self.labels[int(np.argmax(output))] if output is not None else None,
+            'label': self.last_confirmed_label,
+            'confidence': round(float(np.max(self.smoothed_out)), 4) if confident else None,
+        }
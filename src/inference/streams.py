@@ -0,0 +1,218 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Optional
+
+import numpy as np
+
+from inference.batching import MicroBatcher
+from inference.camera import Camera
+from inference.hands import Hands
+from inference.offline import VideoFileSource, PredictionWriter
+from inference.stream_state import StreamState
+
+# many cameras / video files in one process
+#
+# every stream keeps its own StreamState (Sequence + smoothing buffers, same logic as Inference.update),
+# the expensive parts are shared:
+#   - engine pool: a few InterpreterEngines (one TF import, M interpreters for N streams)
+#   - hands pool:  a few MediaPipe Hands graphs
+#   or, instead of the engine pool, one MicroBatcher that classifies the windows of all streams in batches
+# a pooled item is only used by one worker at a time (interpreters and Hands graphs are not thread safe)
+#
+# fair scheduling: streams wait in a round-robin queue, a worker takes the stream at the front, processes
+# exactly one frame of it and puts it back at the end, so every stream advances one frame per turn and
+# a stream is never processed by two workers at once (its frames stay in order)
+#
+# a shared Hands graph sees frames of different streams one after another, so its tracking state would
+# jump between streams: pools smaller than the stream count run Hands in static image mode (palm detection
+# on every frame), a pool with one graph per stream keeps tracking and pins each stream to its own graph
+
+
+class Stream:
+    def __init__(self, name: str, source, state: StreamState):
+        self.name = name
+        self.source = source # Camera or VideoFileSource
+        self.state = state
+        self.finished = False
+        self.hands: Optional[Hands] = None # pinned graph when every stream has its own
+
+
+def open_source(spec: str, flip: bool = True):
+    # "0", "1", ... = camera index, anything else = video file
+    if spec.isdigit():
+        return Camera(int(spec))
+    return VideoFileSource(spec, flip)
+
+
+class MultiStreamRecognizer:
+    POLL_TIMEOUT = 0.05
+
+    def __init__(self, specs: list[str], engine_factory, engine_pool: int = 1, hands_pool: int = 2,
+                 workers: Optional[int] = None, flip: bool = True, max_frames: Optional[int] = None,
+                 batcher: Optional[MicroBatcher] = None):
+        # engine_factory: () -> allocated-or-not InterpreterEngine, called engine_pool times (not at all with a batcher)
+        self.streams = [Stream(spec, open_source(spec, flip), StreamState(spec)) for spec in specs]
+        hands_pool = max(1, min(hands_pool, len(self.streams)))
+        self.pinned = hands_pool == len(self.streams)
+        self.workers = workers or hands_pool
+        self.max_frames = max_frames # per stream, None = until the source ends (cameras: until stopped)
+
+        self.batcher = batcher
+        self.engines: queue.Queue = queue.Queue()
+        for _ in range(0 if batcher is not None else max(1, engine_pool)):
+            engine = engine_factory()
+            if not engine.allocated:
+                engine.allocate()
+            self.engines.put(engine)
+        self.engine_count = self.engines.qsize()
+
+        self.hands: queue.Queue = queue.Queue()
+        graphs = [Hands(static_image_mode=not self.pinned) for _ in range(hands_pool)]
+        self.hands_count = len(graphs)
+        for graph in graphs:
+            self.hands.put(graph)
+        if self.pinned:
+            for stream, graph in zip(self.streams, graphs):
+                stream.hands = graph
+
+        self.ready: deque = deque(self.streams) # round-robin order
+        self._ready_cond = threading.Condition()
+        self.stop_event = threading.Event()
+        self._writer: Optional[PredictionWriter] = None
+        self._writer_lock = threading.Lock()
+
+        self.hands_wait = 0.0  # seconds workers spent waiting for a free pooled item
+        self.engine_wait = 0.0
+        self._wait_lock = threading.Lock()
+
+    def _next_stream(self) -> Optional[Stream]:
+        with self._ready_cond:
+            if not self._ready_cond.wait_for(lambda: len(self.ready) > 0 or self.stop_event.is_set(), self.POLL_TIMEOUT):
+                return None
+            return self.ready.popleft() if self.ready else None
+
+    def _requeue(self, stream: Stream):
+        with self._ready_cond:
+            if not stream.finished:
+                self.ready.append(stream)
+            elif all(s.finished for s in self.streams):
+                self.stop_event.set()
+            self._ready_cond.notify()
+
+    def _detect(self, stream: Stream, image):
+        if stream.hands is not None:
+            graph = stream.hands
+            return graph, graph.hands.process(image)
+        start = time.perf_counter()
+        graph = self.hands.get()
+        with self._wait_lock:
+            self.hands_wait += time.perf_counter() - start
+        try:
+            return graph, graph.hands.process(image)
+        finally:
+            self.hands.put(graph)
+
+    def _classify(self, window: np.ndarray) -> np.ndarray:
+        if self.batcher is not None:
+            return self.batcher.invoke(window)[0]
+        start = time.perf_counter()
+        engine = self.engines.get()
+        with self._wait_lock:
+            self.engine_wait += time.perf_counter() - start
+        try:
+            return engine.invoke(window)[0].copy()
+        finally:
+            self.engines.put(engine)
+
+    def process_frame(self, stream: Stream) -> bool:
+        # one frame of one stream, False when the stream has ended
+        if self.max_frames is not None and stream.state.frames >= self.max_frames:
+            return False
+        ret, frame, image = stream.source.read_frame()
+        if not ret:
+            return False
+
+        graph, results = self._detect(stream, image)
+        frame_features = None
+        if results.multi_hand_landmarks is not None:
+            frame_features = graph.extract_all_hand_features(results, image.shape)
+
+        frame_idx = stream.state.frames
+        window = stream.state.push(frame_features)
+        output = None
+        if window is not None:
+            output = self._classify(window)
+            stream.state.apply(output)
+
+        if self._writer is not None:
+            record = stream.state.record(frame_idx, frame_features is not None, output)
+            with self._writer_lock:
+                self._writer.write(record)
+        return True
+
+    def _worker(self):
+        while not self.stop_event.is_set():
+            stream = self._next_stream()
+            if stream is None:
+                continue
+            try:
+                stream.finished = not self.process_frame(stream)
+            except Exception:
+                logging.exception(f"Stream {stream.name} failed, dropping it")
+                stream.finished = True
+            self._requeue(stream)
+
+    def _initialize(self, stream: Stream):
+        # a source that can't be opened is dropped like a stream failing mid-run, the others keep going
+        try:
+            stream.source.initialize()
+        except Exception:
+            logging.exception(f"Stream {stream.name} could not be opened, dropping it")
+            stream.finished = True
+            with self._ready_cond:
+                if stream in self.ready:
+                    self.ready.remove(stream)
+                if all(s.finished for s in self.streams):
+                    self.stop_event.set()
+
+    def run(self, output_path: Optional[str] = None):
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self._worker, name=f"stream-worker-{i}", daemon=True) for i in range(self.workers)]
+        with PredictionWriter(output_path) if output_path else nullcontext() as writer:
+            self._writer = writer
+            try:
+                # inside the try: every source opened so far is released whatever happens next
+                for stream in self.streams:
+                    self._initialize(stream)
+                for thread in threads:
+                    thread.start()
+                while not self.stop_event.is_set():
+                    self.stop_event.wait(0.5)
+            except KeyboardInterrupt:
+                logging.info("Stopping streams")
+            finally:
+                self.stop_event.set()
+                for thread in threads:
+                    thread.join(timeout=2.0)
+                for stream in self.streams:
+                    stream.source.release()
+                self._writer = None
+
+        elapsed = time.perf_counter() - start
+        logging.info(self.stats(elapsed))
+
+    def stats(self, elapsed: float) -> str:
+        frames = sum(stream.state.frames for stream in self.streams)
+        classifier = "micro-batcher" if self.batcher is not None else f"{self.engine_count} interpreter/s"
+        lines = [f"{len(self.streams)} stream/s, {classifier}, {self.hands_count} Hands graph/s "
+                 f"({'pinned' if self.pinned else 'shared, static image mode'}), {self.workers} worker/s: "
+                 f"{frames} frames in {elapsed:.2f} second/s ({frames / max(elapsed, 1e-9):.1f} frames/s), "
+                 f"pool wait: hands {self.hands_wait:.2f} s, engines {self.engine_wait:.2f} s"]
+        for stream in self.streams:
+            lines.append(f"  {stream.name}: {stream.state.frames} frames, {stream.state.predictions} prediction/s, "
+                         f"last label {stream.state.last_confirmed_label}")
+        return "\n".join(lines)
@@ -0,0 +1,77 @@
+import argparse
+import asyncio
+import logging
+import time
+
+from inference.batching import MicroBatcher
+from inference.engine import InterpreterEngine, load_engine_config
+from inference.offline import SEQUENCE_EXTENSIONS, expand_inputs, load_landmark_sequence
+from inference.server import LandmarkServer, LandmarkClient
+
+# landmark ingestion server (see inference/server.py for the wire format)
+# run from repo root:
+#   python src/landmark_server.py --port 8765
+#   python src/landmark_server.py --replay data/landmark_sequences/A --port 8765   (test client)
+
+
+def replay(paths, host, port, fps):
+    # sends .npy / raw .npz landmark sequences frame by frame like a thin client would, prints the labels pushed back
+    client = LandmarkClient(host, port)
+    frames = 0
+    start = time.perf_counter()
+    try:
+        for path in expand_inputs(paths):
+            if not path.lower().endswith(SEQUENCE_EXTENSIONS):
+                continue # videos need MediaPipe, the server only takes landmarks
+            client.reset()
+            for frame_features in load_landmark_sequence(path):
+                client.send_features(frame_features)
+                frames += 1
+                for label, confidence in client.poll_labels():
+                    logging.info(f"{path}: {label} ({confidence * 100:.1f}%)")
+                if fps > 0:
+                    time.sleep(1.0 / fps)
+            client.send_features(None) # end of sequence = hand gone
+        for label, confidence in client.poll_labels(timeout=0.5):
+            logging.info(f"{label} ({confidence * 100:.1f}%)")
+    finally:
+        client.close()
+    elapsed = time.perf_counter() - start
+    logging.info(f"Replayed {frames} frames in {elapsed:.2f} second/s ({frames / max(elapsed, 1e-9):.1f} frames/s)")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Recognize signs from landmarks sent over TCP by thin clients")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--idle-timeout', type=float, default=30.0, help="close sessions that sent nothing for this many seconds")
+    parser.add_argument('--config', default=None, help="JSON engine config (model_path, num_threads, xnnpack, warmup)")
+    parser.add_argument('--model', default=None, help="overrides model_path")
+    parser.add_argument('--threads', type=int, default=None, help="interpreter threads, overrides num_threads")
+    parser.add_argument('--max-batch', type=int, default=1, help="classify up to this many sessions' windows in one invoke, 1 = no batching")
+    parser.add_argument('--batch-deadline-ms', type=float, default=5.0, help="how long a window may wait for others to fill a batch")
+    parser.add_argument('--replay', nargs='+', metavar='PATH', default=None, help="client mode: send .npy / .npz landmark sequences to a running server")
+    parser.add_argument('--fps', type=float, default=0.0, help="client mode: frames per second to send, 0 = as fast as possible")
+    args = parser.parse_args()
+
+    if args.replay:
+        replay(args.replay, args.host, args.port, args.fps)
+    else:
+        engine = InterpreterEngine.from_config(load_engine_config(args.config, model_path=args.model, num_threads=args.threads),
+                                               batch_size=args.max_batch)
+        batcher = MicroBatcher(engine, args.max_batch, args.batch_deadline_ms) if args.max_batch > 1 else None
+        logging.info(f"Model: {engine.describe()}")
+        server = LandmarkServer(engine, args.host, args.port, args.idle_timeout, batcher=batcher)
+        try:
+            asyncio.run(server.serve())
+        except KeyboardInterrupt:
+            pass
+        logging.info(server.stats())
+        logging.info(engine.latency.format("invoke latency"))
+        if batcher is not None:
+            logging.info(batcher.stats())
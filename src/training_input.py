@@ -0,0 +1,45 @@
+import os
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
+
+import argparse
+
+from training_src.sequence_index import SequenceIndex
+from training_src.input_pipeline import build_dataset, measure_throughput
+
+# builds the tf.data training pipeline over data/landmark_sequences and reports how fast it can feed the model
+# run from repo root:
+#   python src/training_input.py --epochs 2 --cache memory
+# in training code: train, val = SequenceIndex.from_directory(data).split(); model.fit(build_dataset(train), ...)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="tf.data input pipeline throughput over the collected sequences")
+    parser.add_argument('--data', default=os.path.join("data", "landmark_sequences"))
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--shuffle-buffer', type=int, default=2048, help="sequences held in the shuffle buffer (with a file --cache)")
+    parser.add_argument('--no-shuffle', action='store_true')
+    parser.add_argument('--cache', default=None, help="'memory', or a file prefix for tf.data's on-disk cache")
+    parser.add_argument('--readers', type=int, default=None, help="parallel file reads (default: autotune)")
+    parser.add_argument('--skip-flipped', action='store_true', help="leave out *_flipped augmentation outputs")
+    parser.add_argument('--weights', default=None, help="per-file weights CSV from data_augmentation/dedup.py --weights")
+    parser.add_argument('--val-fraction', type=float, default=0.2, help="validation share, per label (0 = no split)")
+    parser.add_argument('--epochs', type=int, default=2, help="epochs to time (the second one shows the effect of --cache)")
+    args = parser.parse_args()
+
+    index = SequenceIndex.from_directory(args.data, include_flipped=not args.skip_flipped, weights_path=args.weights)
+    print("===== LABELS =====")
+    for label, count in index.counts().items():
+        print(f"\"{label}\": {count}")
+    for reason, count in index.skipped.items():
+        print(f"Skipped {count} file/s: {reason}")
+    print("===== END =====")
+
+    train = index
+    if args.val_fraction > 0:
+        train, val = index.split(args.val_fraction)
+        print(f"Train: {len(train)} sequence/s, validation: {len(val)} sequence/s")
+
+    kwargs = {} if args.readers is None else {'num_parallel_calls': args.readers}
+    dataset = build_dataset(train, batch_size=args.batch_size, shuffle=not args.no_shuffle, shuffle_buffer=args.shuffle_buffer,
+                            cache='' if args.cache == 'memory' else args.cache, sample_weights=args.weights is not None, **kwargs)
+    print(f"Element spec: {dataset.element_spec}")
+    measure_throughput(dataset, args.epochs)
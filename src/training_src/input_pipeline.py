@@ -0,0 +1,100 @@
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from data_collection_src.sequence_store import CURRENT_SCHEMA, FeatureCache
+from training_src.sequence_index import SequenceIndex
+
+# tf.data input pipeline over a SequenceIndex, (batch, 20, 146) float32 batches for the LSTM
+#
+#   file indices -> parallel reads (num_parallel_calls threads, raw .npz go through sequence_store's FeatureCache)
+#   -> batch -> prefetch
+#
+# shuffling depends on the cache ('' = memory, a path prefix = files; later epochs skip the reads entirely).
+# the cache replays the order of the first epoch, so anything shuffled before it would be frozen:
+#   no cache     indices shuffled before the reads, a new full permutation every epoch (8 bytes per file)
+#   memory cache elements cached in index order, then a full shuffle every epoch (the shuffle buffer
+#                shares the cached tensors, no second copy)
+#   file cache   indices permuted once (seeded, the same every epoch) so one label doesn't fill the buffer,
+#                then a bounded shuffle_buffer reshuffle every epoch (memory = shuffle_buffer sequences)
+#
+# labels are one-hot like the training notebook (categorical_crossentropy), sparse with one_hot=False
+# with sample_weights (e.g. dedup.py --weights) the elements are (x, y, weight) for model.fit
+
+
+def build_dataset(index: SequenceIndex, batch_size: int = 32, shuffle: bool = True, shuffle_buffer: int = 2048,
+                  cache: str | None = None, num_parallel_calls: int = tf.data.AUTOTUNE, one_hot: bool = True,
+                  sample_weights: bool = False, feature_cache: FeatureCache | None = None,
+                  sequence_length: int = 20, drop_remainder: bool = False, seed: int | None = None) -> tf.data.Dataset:
+    if len(index) == 0:
+        raise ValueError("No sequences to build a dataset from")
+    feature_cache = feature_cache or FeatureCache(index.data_dir, schema=CURRENT_SCHEMA)
+    paths = list(index.paths)
+    n_labels = len(index.label_names)
+
+    def load(i):
+        sequence = feature_cache.load(paths[int(i)])
+        return np.asarray(sequence, dtype=np.float32)
+
+    features = load(0).shape[-1] # 146 for schema 1, read once so the LSTM gets a static shape
+
+    def to_element(i):
+        x = tf.numpy_function(load, [i], tf.float32, stateful=False)
+        x.set_shape((sequence_length, features))
+        y = tf.gather(labels, i)
+        if one_hot:
+            y = tf.one_hot(y, n_labels)
+        if sample_weights:
+            return x, y, tf.gather(weights, i)
+        return x, y
+
+    labels = tf.constant(index.labels, dtype=tf.int64)
+    weights = tf.constant(index.weights, dtype=tf.float32)
+
+    dataset = tf.data.Dataset.range(len(index))
+    if shuffle and cache != '':
+        # a file cache keeps this order, so it is fixed rather than reshuffled
+        dataset = dataset.shuffle(len(index), seed=seed, reshuffle_each_iteration=cache is None)
+    # deterministic whenever a cache records the order
+    dataset = dataset.map(to_element, num_parallel_calls=num_parallel_calls, deterministic=not shuffle or cache is not None)
+    if cache is not None:
+        dataset = dataset.cache(cache)
+        if shuffle:
+            dataset = dataset.shuffle(len(index) if cache == '' else shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size, drop_remainder=drop_remainder, num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def measure_throughput(dataset: tf.data.Dataset, epochs: int = 1, steps: int | None = None) -> list[dict]:
+    # iterates the pipeline without a model: what it can feed at most, per epoch
+    # (compare samples/s with the model's training step rate, lower = the model waits for input)
+    reports = []
+    for epoch in range(epochs):
+        samples = batches = 0
+        first_batch_s = None
+        start = time.perf_counter()
+        for element in dataset.take(steps) if steps else dataset:
+            if first_batch_s is None:
+                first_batch_s = time.perf_counter() - start
+            samples += int(element[0].shape[0])
+            batches += 1
+        elapsed = time.perf_counter() - start
+        report = {
+            'epoch': epoch + 1,
+            'samples': samples,
+            'batches': batches,
+            'elapsed_s': elapsed,
+            'samples_per_s': samples / max(elapsed, 1e-9),
+            'batches_per_s': batches / max(elapsed, 1e-9),
+            'first_batch_s': first_batch_s or 0.0,
+        }
+        reports.append(report)
+
+        out_text = (f"Epoch {report['epoch']}: {samples} samples in {batches} batches, {elapsed:.2f} second/s "
+                    f"({report['samples_per_s']:.0f} samples/s, {report['batches_per_s']:.1f} batches/s, "
+                    f"first batch {report['first_batch_s'] * 1000:.0f} ms)")
+        print("-" * (len(out_text) + 4))
+        print(f"| {out_text} |")
+        print("-" * (len(out_text) + 4))
+    return reports
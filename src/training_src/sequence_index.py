@@ -0,0 +1,93 @@
+import csv
+import os
+
+import numpy as np
+
+from data_augmentation.manifest import DatasetManifest
+
+# what the training pipeline reads: every usable sequence in data/landmark_sequences with its label index
+#
+# labels are the sorted folder names, the same order as the LabelEncoder in ASL_Model_Training.ipynb
+# (and inference/labels.py), unless label_names is given. files come from the dataset manifest, and
+# sequences of the wrong length are dropped using the shapes it recorded, so no file is opened here.
+# no TensorFlow needed, input_pipeline.py builds the tf.data pipeline on top
+
+FEATURE_SHAPE = 146
+RAW_SHAPE = [2, 21, 3]
+
+
+def source_name(path: str) -> str:
+    # <name>_flipped.* and <name>.* come from the same recording
+    name = os.path.splitext(path)[0]
+    return name[:-len("_flipped")] if name.endswith("_flipped") else name
+
+
+class SequenceIndex:
+    def __init__(self, paths: list[str], labels: np.ndarray, label_names: list[str], weights: np.ndarray | None = None,
+                 data_dir: str = os.path.join("data", "landmark_sequences")):
+        self.data_dir = data_dir
+        self.paths = paths
+        self.labels = labels
+        self.label_names = label_names
+        self.weights = weights if weights is not None else np.ones(len(paths), dtype=np.float32)
+        self.skipped: dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.paths)
+
+    @classmethod
+    def from_directory(cls, data_dir: str, label_names: list[str] | None = None, include_flipped: bool = True,
+                       sequence_length: int = 20, weights_path: str | None = None) -> 'SequenceIndex':
+        # weights_path: path,label,weight CSV from data_augmentation/dedup.py --weights, missing files weigh 1
+        manifest = DatasetManifest(data_dir)
+        manifest.check()
+        if label_names is None:
+            label_names = sorted(manifest.counts())
+        label_index = {label: idx for idx, label in enumerate(label_names)}
+
+        weight_of: dict[str, float] = {}
+        if weights_path:
+            with open(weights_path, 'r', newline='', encoding='utf-8') as f:
+                weight_of = {os.path.abspath(row['path']): float(row['weight']) for row in csv.DictReader(f)}
+
+        paths, labels, weights = [], [], []
+        skipped: dict[str, int] = {}
+        for path in manifest.paths(augmented=None if include_flipped else False):
+            entry = manifest.get(path)
+            shape = entry['shape'] # type: ignore
+            if entry['label'] not in label_index: # type: ignore
+                key = f"unknown label '{entry['label']}'" # type: ignore
+            elif not shape or shape[0] != sequence_length or shape[1:] not in ([FEATURE_SHAPE], RAW_SHAPE):
+                key = f"shape {tuple(shape)}"
+            else:
+                paths.append(path)
+                labels.append(label_index[entry['label']]) # type: ignore
+                weights.append(weight_of.get(os.path.abspath(path), 1.0))
+                continue
+            skipped[key] = skipped.get(key, 0) + 1
+
+        index = cls(paths, np.array(labels, dtype=np.int64), list(label_names), np.array(weights, dtype=np.float32), data_dir)
+        index.skipped = skipped
+        return index
+
+    def subset(self, rows: np.ndarray) -> 'SequenceIndex':
+        return SequenceIndex([self.paths[row] for row in rows], self.labels[rows], self.label_names, self.weights[rows], self.data_dir)
+
+    def split(self, val_fraction: float = 0.2, seed: int = 42) -> tuple['SequenceIndex', 'SequenceIndex']:
+        # (train, validation), per label; a recording and its _flipped copy always land on the same side
+        rng = np.random.default_rng(seed)
+        sources = [source_name(path) for path in self.paths]
+        val_rows = []
+        for label in range(len(self.label_names)):
+            rows = np.flatnonzero(self.labels == label)
+            groups = sorted({sources[row] for row in rows})
+            picked = set(rng.permutation(len(groups))[:int(round(len(groups) * val_fraction))].tolist())
+            val_sources = {groups[idx] for idx in picked}
+            val_rows.extend(row for row in rows if sources[row] in val_sources)
+        val_mask = np.zeros(len(self), dtype=bool)
+        val_mask[val_rows] = True
+        return self.subset(np.flatnonzero(~val_mask)), self.subset(np.flatnonzero(val_mask))
+
+    def counts(self) -> dict[str, int]:
+        bincount = np.bincount(self.labels, minlength=len(self.label_names))
+        return {label: int(n) for label, n in zip(self.label_names, bincount)}